@@ -0,0 +1,617 @@
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import instrumentation
+from applog import DEBUG, fields, get_logger
+
+log = get_logger(__name__)
+
+# ==========================================================
+#  HTTP JSON API: METRICS, VERDICTS AND PDF REPORTS
+# ==========================================================
+#
+# For programmatic callers (the CRM) instead of the Streamlit UI:
+#
+#   GET  /health                  status, pool size, jobs in flight
+#   GET  /metrics                 stage timers (Prometheus text)
+#   POST /v1/metrics              {"inputs": ...}            -> metrics JSON
+#   POST /v1/metrics/batch        {"scenarios": [...]}       -> NDJSON stream,
+#                                                               one line each
+#   POST /v1/verdict              {"inputs": ...}            -> summary, grade
+#                                 {"inputs_a", "inputs_b"}   -> summary, winner,
+#                                                               grade_a, grade_b
+#   POST /v1/reports/investor     {"inputs", "property"}     -> PDF stream
+#   POST /v1/reports/agent        {"inputs", "property", "agent_name",
+#                                  "brokerage_name", "client_name",
+#                                  "agent_notes", "improvements"}
+#   POST /v1/reports/comparison   {"inputs_a", "inputs_b", "address_a",
+#                                  "zip_a", "address_b", "zip_b"}
+#
+# "inputs" are calculate_metrics() arguments, either a list in argument
+# order or an object keyed by calc_engine.INPUT_FIELDS. Errors come back as
+# {"error": ...} with a 4xx/5xx status.
+#
+# An asyncio front end parses requests and streams responses; every
+# CPU-bound step runs in a process pool, so one slow PDF never stalls the
+# event loop or other clients.
+#   - Admission control: at most MAX_IN_FLIGHT jobs may be running or
+#     queued in the pool. A request arriving when it is full gets 503 with
+#     Retry-After right away instead of queueing behind minutes of work.
+#   - Backpressure: a batch is computed BATCH_CHUNK scenarios per job with
+#     at most PIPELINE jobs ahead of what has been written, and every write
+#     waits for the socket to drain, so a slow reader slows its own batch
+#     down rather than piling results up in memory.
+#   - Timeouts: each request has REQUEST_TIMEOUT seconds (504 after that;
+#     a batch stream already under way ends with an {"error"} line), and
+#     HEADER_TIMEOUT to send its headers and body; keep-alive connections
+#     idle for that long are closed.
+#
+#     API_WORKERS=4           pool processes (default: CPU count)
+#     API_MAX_IN_FLIGHT=16    default: 4 x workers
+#     API_TIMEOUT=30          seconds per request
+#     API_MAX_BODY_KB=2048
+#     API_MAX_BATCH=10000     scenarios per batch request
+#
+#     python api_server.py --port 8600
+#     curl -s localhost:8600/v1/metrics -d '{"inputs": [300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10]}'
+
+WORKERS = int(os.getenv("API_WORKERS", "0")) or os.cpu_count() or 1
+MAX_IN_FLIGHT = int(os.getenv("API_MAX_IN_FLIGHT", "0")) or 4 * WORKERS
+REQUEST_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+HEADER_TIMEOUT = 10.0
+MAX_BODY = int(os.getenv("API_MAX_BODY_KB", "2048")) * 1024
+MAX_BATCH = int(os.getenv("API_MAX_BATCH", "10000"))
+BATCH_CHUNK = 100
+PIPELINE = 2
+STREAM_CHUNK = 64 * 1024
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = tuple(headers)
+
+
+# ==========================================================
+#  REQUEST VALIDATION
+# ==========================================================
+
+def _number(name, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a finite number")
+    return value
+
+
+def parse_inputs(value, name="inputs"):
+    """calculate_metrics() arguments from a list or an object."""
+    from calc_engine import INPUT_FIELDS
+
+    if isinstance(value, dict):
+        missing = [f for f in INPUT_FIELDS if f not in value]
+        if missing:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} is missing {', '.join(missing)}")
+        value = [value[f] for f in INPUT_FIELDS]
+    if not isinstance(value, list) or len(value) != len(INPUT_FIELDS):
+        raise ApiError(HTTPStatus.BAD_REQUEST,
+                       f"{name} must be an object or a list of {len(INPUT_FIELDS)} numbers")
+    inputs = [_number(f"{name}.{f}", v) for f, v in zip(INPUT_FIELDS, value)]
+    for field in ("mortgage_term", "time_horizon"):
+        i = INPUT_FIELDS.index(field)
+        if inputs[i] != int(inputs[i]) or not 1 <= inputs[i] <= 100:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name}.{field} must be a whole number from 1 to 100")
+        inputs[i] = int(inputs[i])
+    if inputs[0] <= 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name}.purchase_price must be positive")
+    return tuple(inputs)
+
+
+def _text(body, key, default=""):
+    value = body.get(key, default)
+    if not isinstance(value, str):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{key} must be a string")
+    return value
+
+
+def _improvements(value):
+    if not isinstance(value, list):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "improvements must be a list")
+    rows = []
+    for row in value:
+        if not isinstance(row, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "each improvement must be an object")
+        rows.append({"Description": str(row.get("Description", row.get("description", ""))),
+                     "Amount ($)": _number("improvement amount", row.get("Amount ($)", row.get("amount", 0)))})
+    return rows
+
+
+# ==========================================================
+#  POOL JOBS (RUN IN WORKER PROCESSES)
+# ==========================================================
+#
+# Jobs return encoded bytes, so JSON encoding is done off the event loop too.
+
+def _json_default(value):
+    if hasattr(value, "tolist"):   # numpy scalars and arrays
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    return json.dumps(value, default=_json_default).encode()
+
+
+def _worker_init():
+    # Pay for the heavy imports once per worker, not on its first request
+    import calc_engine, pdf_dual, pdf_single, pdf_single_agent  # noqa: F401,E401
+
+
+def _warm():
+    return os.getpid()
+
+
+def job_metrics(inputs):
+    from calc_engine import calculate_metrics
+    return dumps(calculate_metrics(*inputs))
+
+
+def job_metrics_lines(scenarios):
+    from calc_engine import calculate_metrics_batch
+    return b"".join(dumps(m) + b"\n" for m in calculate_metrics_batch(scenarios))
+
+
+def job_verdict(inputs, inputs_b=None):
+    from calc_engine import calculate_metrics
+    if inputs_b is None:
+        from pdf_single import generate_ai_verdict
+        summary, grade = generate_ai_verdict(calculate_metrics(*inputs))
+        return dumps({"summary": summary, "grade": grade})
+    from pdf_dual import generate_ai_verdict
+    metrics_a, metrics_b = calculate_metrics(*inputs), calculate_metrics(*inputs_b)
+    summary, winner = generate_ai_verdict(metrics_a, metrics_b)
+    return dumps({"summary": summary, "winner": winner, "grade_a": metrics_a["Grade"], "grade_b": metrics_b["Grade"]})
+
+
+def _pdf_bytes(pdf):
+    return pdf if isinstance(pdf, bytes) else pdf.getvalue()
+
+
+def job_investor_pdf(inputs, property_data):
+    from calc_engine import calculate_metrics
+    from pdf_single import generate_ai_verdict, generate_pdf
+    metrics = calculate_metrics(*inputs)
+    summary, _ = generate_ai_verdict(metrics)
+    return _pdf_bytes(generate_pdf(property_data, metrics, summary, compact=True))
+
+
+def job_agent_pdf(inputs, property_data, agent):
+    from calc_engine import calculate_metrics
+    from pdf_single import generate_ai_verdict
+    from pdf_single_agent import generate_pdf
+    metrics = calculate_metrics(*inputs)
+    summary, _ = generate_ai_verdict(metrics)
+    return _pdf_bytes(generate_pdf(property_data=property_data, metrics=metrics, summary_text=summary,
+                                   compact=True, **agent))
+
+
+def job_comparison_pdf(inputs_a, inputs_b, addresses):
+    from calc_engine import calculate_metrics
+    from pdf_dual import generate_comparison_pdf_table_style
+    return _pdf_bytes(generate_comparison_pdf_table_style(
+        calculate_metrics(*inputs_a), calculate_metrics(*inputs_b), compact=True, **addresses))
+
+
+def _property_data(body, inputs):
+    from calc_engine import INPUT_FIELDS
+    extra = body.get("property", {})
+    if not isinstance(extra, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "property must be an object")
+    data = dict(zip(INPUT_FIELDS, inputs))
+    data.update({"street_address": _text(extra, "street_address"), "zip_code": _text(extra, "zip_code")})
+    return data
+
+
+# ==========================================================
+#  HTTP FRONT END
+# ==========================================================
+
+class Request:
+    def __init__(self, method, path, headers, body):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.started = time.perf_counter()
+
+    @property
+    def keep_alive(self):
+        return self.headers.get("connection", "").lower() != "close"
+
+    def json(self):
+        try:
+            body = json.loads(self.body or b"{}")
+        except ValueError as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}")
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+        return body
+
+
+class Response:
+    """Writes one response, whole (send) or chunked (stream/write/end)."""
+
+    def __init__(self, writer, keep_alive):
+        self.writer = writer
+        self.keep_alive = keep_alive
+        self.status = None
+
+    def _head(self, status, headers):
+        self.status = status
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines += [f"{k}: {v}" for k, v in headers]
+        lines.append(f"Connection: {'keep-alive' if self.keep_alive else 'close'}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def send(self, status, body, content_type="application/json", headers=()):
+        self._head(status, [("Content-Type", content_type), ("Content-Length", len(body)), *headers])
+        self.writer.write(body)
+        await self.writer.drain()
+
+    async def stream(self, status, content_type):
+        self._head(status, [("Content-Type", content_type), ("Transfer-Encoding", "chunked")])
+        await self.writer.drain()
+
+    async def write(self, data):
+        for i in range(0, len(data), STREAM_CHUNK):
+            piece = data[i:i + STREAM_CHUNK]
+            self.writer.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            await self.writer.drain()
+
+    async def end(self):
+        self.writer.write(b"0\r\n\r\n")
+        await self.writer.drain()
+
+
+async def read_request(reader):
+    """Next request on the connection, or None once the client is done."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise ApiError(HTTPStatus.LENGTH_REQUIRED, "send a Content-Length")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "bad Content-Length")
+    if length > MAX_BODY:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {MAX_BODY // 1024} KB")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target.split("?", 1)[0], headers, body)
+
+
+class ApiServer:
+    """asyncio HTTP server handing CPU-bound work to a bounded process pool."""
+
+    def __init__(self, host="127.0.0.1", port=8600, workers=WORKERS, max_in_flight=MAX_IN_FLIGHT,
+                 timeout=REQUEST_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.in_flight = 0
+        self.rejected = 0
+        self.pool = None
+        self._server = None
+        self._slots = None
+        self._connections = set()
+        self._routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.stage_metrics,
+            ("POST", "/v1/metrics"): self.metrics,
+            ("POST", "/v1/metrics/batch"): self.metrics_batch,
+            ("POST", "/v1/verdict"): self.verdict,
+            ("POST", "/v1/reports/investor"): self.investor_report,
+            ("POST", "/v1/reports/agent"): self.agent_report,
+            ("POST", "/v1/reports/comparison"): self.comparison_report,
+        }
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        # spawn: workers must not inherit the event loop or its threads
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_worker_init)
+        await asyncio.gather(*(self._loop.run_in_executor(self.pool, _warm) for _ in range(self.workers)))
+        self._server = await asyncio.start_server(self._connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("API listening on http://%s:%s (%s workers, %s jobs in flight max)",
+                 self.host, self.port, self.workers, self.max_in_flight)
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._connections):   # idle keep-alive clients
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    # ---- Pool jobs with admission control
+
+    def _release(self, _future):
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def _admit(self, deadline, wait):
+        if self._slots.locked() and not wait:
+            self.rejected += 1
+            instrumentation.count("api_rejected")
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry shortly", [("Retry-After", "1")])
+        try:
+            await asyncio.wait_for(self._slots.acquire(), max(deadline - time.perf_counter(), 0))
+        except asyncio.TimeoutError:
+            raise self._timed_out()
+
+    def _timed_out(self):
+        instrumentation.count("api_timeouts")
+        return ApiError(HTTPStatus.GATEWAY_TIMEOUT, f"not finished within {self.timeout:g}s")
+
+    async def submit(self, deadline, fn, *args, wait=False):
+        """Admit and start one pool job; returns an awaitable for its result.
+
+        The slot is held until the worker is done with the job, even if the
+        request gave up on it, so the pool is never oversubscribed.
+        """
+        await self._admit(deadline, wait)
+        self.in_flight += 1
+        future = self.pool.submit(fn, *args)
+        future.add_done_callback(lambda f: self._loop.call_soon_threadsafe(self._release, f))
+        return self._result(future, deadline)
+
+    async def _result(self, future, deadline):
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                          max(deadline - time.perf_counter(), 0))
+        except asyncio.TimeoutError:
+            future.cancel()   # only stops it if it hasn't started
+            raise self._timed_out()
+
+    async def run(self, deadline, fn, *args):
+        return await (await self.submit(deadline, fn, *args))
+
+    # ---- Connections
+
+    async def _connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), HEADER_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ApiError as e:
+                    await Response(writer, False).send(e.status, dumps({"error": e.message}))
+                    break
+                if request is None:
+                    break
+                response = Response(writer, request.keep_alive)
+                await self._dispatch(request, response)
+                if not response.keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass   # client gone, or close() ending an idle keep-alive connection
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request, response):
+        handler = self._routes.get((request.method, request.path))
+        route = f"api {request.path}"
+        error = False
+        try:
+            if handler is None:
+                known = any(path == request.path for _, path in self._routes)
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED if known else HTTPStatus.NOT_FOUND,
+                               f"no route for {request.method} {request.path}")
+            await handler(request, response, request.started + self.timeout)
+        except ApiError as e:
+            error = e.status >= 500
+            if response.status is None:
+                await response.send(e.status, dumps({"error": e.message}), headers=e.headers)
+            else:
+                # Headers are out: end the stream with the error as its last line
+                await response.write(dumps({"error": e.message}) + b"\n")
+                await response.end()
+        except ConnectionError:
+            response.keep_alive = False
+            error = True
+        except Exception as e:
+            log.exception("API request %s failed", request.path)
+            error = True
+            if response.status is None:
+                await response.send(HTTPStatus.INTERNAL_SERVER_ERROR, dumps({"error": f"internal error: {e}"}))
+            else:
+                response.keep_alive = False
+        finally:
+            seconds = time.perf_counter() - request.started
+            if handler is not None:
+                instrumentation.registry.observe(route, seconds, error)
+            if log.isEnabledFor(DEBUG):
+                log.debug("%s %s -> %s", request.method, request.path,
+                          response.status.value if response.status else "-",
+                          extra=fields(ms=round(seconds * 1000, 1), in_flight=self.in_flight))
+
+    # ---- Routes
+
+    async def health(self, request, response, deadline):
+        await response.send(HTTPStatus.OK, dumps({
+            "status": "ok", "workers": self.workers, "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight, "rejected": self.rejected,
+        }))
+
+    async def stage_metrics(self, request, response, deadline):
+        await response.send(HTTPStatus.OK, instrumentation.prometheus_text().encode(),
+                            "text/plain; version=0.0.4")
+
+    async def metrics(self, request, response, deadline):
+        inputs = parse_inputs(request.json().get("inputs"))
+        await response.send(HTTPStatus.OK, await self.run(deadline, job_metrics, inputs))
+
+    async def metrics_batch(self, request, response, deadline):
+        scenarios = request.json().get("scenarios")
+        if not isinstance(scenarios, list) or not scenarios:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "scenarios must be a non-empty list")
+        if len(scenarios) > MAX_BATCH:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"at most {MAX_BATCH} scenarios per request")
+        scenarios = [parse_inputs(s, f"scenarios[{i}]") for i, s in enumerate(scenarios)]
+        chunks = [scenarios[i:i + BATCH_CHUNK] for i in range(0, len(scenarios), BATCH_CHUNK)]
+
+        # First chunk is admitted or refused like any request; later ones
+        # wait for a slot, at most PIPELINE ahead of what has been sent.
+        pending = [await self.submit(deadline, job_metrics_lines, chunks[0])]
+        await response.stream(HTTPStatus.OK, "application/x-ndjson")
+        try:
+            for chunk in chunks[1:]:
+                if len(pending) >= PIPELINE:
+                    await response.write(await pending.pop(0))
+                pending.append(await self.submit(deadline, job_metrics_lines, chunk, wait=True))
+            while pending:
+                await response.write(await pending.pop(0))
+        finally:
+            for waiting in pending:
+                waiting.close()
+        await response.end()
+
+    async def verdict(self, request, response, deadline):
+        body = request.json()
+        if "inputs_a" in body or "inputs_b" in body:
+            args = (parse_inputs(body.get("inputs_a"), "inputs_a"), parse_inputs(body.get("inputs_b"), "inputs_b"))
+        else:
+            args = (parse_inputs(body.get("inputs")),)
+        await response.send(HTTPStatus.OK, await self.run(deadline, job_verdict, *args))
+
+    async def _send_pdf(self, response, deadline, fn, *args):
+        pdf = await self.run(deadline, fn, *args)
+        await response.stream(HTTPStatus.OK, "application/pdf")
+        await response.write(pdf)
+        await response.end()
+
+    async def investor_report(self, request, response, deadline):
+        body = request.json()
+        inputs = parse_inputs(body.get("inputs"))
+        await self._send_pdf(response, deadline, job_investor_pdf, inputs, _property_data(body, inputs))
+
+    async def agent_report(self, request, response, deadline):
+        body = request.json()
+        inputs = parse_inputs(body.get("inputs"))
+        agent = {
+            "agent_name": _text(body, "agent_name") or "Agent",
+            "brokerage_name": _text(body, "brokerage_name") or "Your Brokerage",
+            "client_name": _text(body, "client_name") or "Client",
+            "agent_notes": _text(body, "agent_notes"),
+            "improvements_list": _improvements(body.get("improvements", [])),
+        }
+        await self._send_pdf(response, deadline, job_agent_pdf, inputs, _property_data(body, inputs), agent)
+
+    async def comparison_report(self, request, response, deadline):
+        body = request.json()
+        inputs_a = parse_inputs(body.get("inputs_a"), "inputs_a")
+        inputs_b = parse_inputs(body.get("inputs_b"), "inputs_b")
+        addresses = {key: _text(body, key) for key in ("address_a", "zip_a", "address_b", "zip_b")}
+        await self._send_pdf(response, deadline, job_comparison_pdf, inputs_a, inputs_b, addresses)
+
+
+def serve_in_thread(**options):
+    """ApiServer on its own event loop in a daemon thread (tests, benchmarks).
+
+    Returns (server, stop); stop() closes the server and its pool.
+    """
+    loop = asyncio.new_event_loop()
+    server = ApiServer(**options)
+    ready = threading.Event()
+    failed = []
+
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(server.start())
+        except BaseException as e:
+            failed.append(e)
+            return
+        finally:
+            ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="api-server", daemon=True)
+    thread.start()
+    ready.wait()
+    if failed:
+        raise failed[0]
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    return server, stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP JSON API for metrics, verdicts and PDF reports.")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8600")))
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--max-in-flight", type=int, default=None, help="default: 4 x workers")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT)
+    args = parser.parse_args()
+
+    async def serve():
+        server = ApiServer(args.host, args.port, args.workers, args.max_in_flight or 4 * args.workers,
+                           args.timeout)
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port}", flush=True)
+        # SIGTERM must also reach close(), or the pool workers outlive us
+        stopping = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(sig, stopping.set)
+        try:
+            await stopping.wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from logging import DEBUG, INFO, WARNING, ERROR  # noqa: F401  (re-exported for callers)
+
+# ==========================================================
+#  STRUCTURED, LEVELED LOGGING
+# ==========================================================
+#
+# Every module logs through get_logger(__name__), a stdlib logger under the
+# "app" namespace. Messages use %-style args, so nothing is formatted unless
+# a handler actually takes the record; hot paths that would build extra
+# fields first guard with log.isEnabledFor(DEBUG). With the defaults
+# (WARNING, no ring buffer) a debug call is one cached level check.
+#
+#     LOG_LEVEL=WARNING                     app-wide level for stderr
+#     LOG_LEVELS=calc_engine=DEBUG,...      per-module levels
+#     LOG_SAMPLE=calc_engine=0.01,...       keep this share of a module's
+#                                           records below WARNING
+#     LOG_FORMAT=text|json                  one line per record on stderr
+#     LOG_RING=500                          keep the last N records in
+#                                           memory (admin page), from
+#     LOG_RING_LEVEL=DEBUG                  this level up, even when stderr
+#                                           only shows warnings
+#
+# Structured fields go in extra=fields(key=value, ...); the text format
+# appends them as key=value, the JSON format as keys of the object.
+
+ROOT_LOGGER = "app"
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def fields(**values):
+    """extra= payload for structured fields: log.debug("msg", extra=fields(a=1))."""
+    return {"fields": values}
+
+
+def _fields_of(record):
+    return getattr(record, "fields", None) or {}
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        extra = _fields_of(record)
+        if extra:
+            line += " " + " ".join(f"{k}={v!r}" for k, v in extra.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        out = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        out.update(_fields_of(record))
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Pass every record at WARNING and up, and 1 in 1/rate of the rest."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen = itertools.count()
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= WARNING:
+            return True
+        if self.every and next(self._seen) % self.every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+class RingBuffer(logging.Handler):
+    """Keeps the last `capacity` records as dicts, newest last."""
+
+    def __init__(self, capacity, level=DEBUG):
+        super().__init__(level)
+        self.events = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.events.append({
+                "time": time.strftime("%H:%M:%S", time.localtime(record.created)),
+                "level": record.levelname,
+                "levelno": record.levelno,
+                "logger": record.name[len(ROOT_LOGGER) + 1:] or record.name,
+                "message": record.getMessage(),
+                "fields": dict(_fields_of(record)),
+            })
+        except Exception:
+            self.handleError(record)
+
+    def recent(self, limit=None, level=DEBUG):
+        events = [e for e in list(self.events) if e["levelno"] >= level]
+        return events[-limit:] if limit else events
+
+    def clear(self):
+        self.events.clear()
+
+
+# ==========================================================
+#  CONFIGURATION
+# ==========================================================
+
+ring = None
+_installed = []
+_configured_loggers = []
+_config_lock = threading.Lock()
+
+
+def _level(value, default=WARNING):
+    if isinstance(value, int):
+        return value
+    value = (value or "").strip().upper()
+    if value.isdigit():
+        return int(value)
+    named = logging.getLevelName(value)
+    return named if isinstance(named, int) else default
+
+
+def _pairs(spec):
+    """'a=1,b=2' -> {"a": "1", "b": "2"}; dicts pass through."""
+    if isinstance(spec, dict):
+        return spec
+    out = {}
+    for part in (spec or "").split(","):
+        name, sep, value = part.partition("=")
+        if sep and name.strip():
+            out[name.strip()] = value.strip()
+    return out
+
+
+def configure(level=None, levels=None, sample=None, fmt=None, ring_size=None, ring_level=None, stream=None):
+    """(Re)configure app logging; unset arguments come from the LOG_* env vars."""
+    global ring
+    level = _level(level if level is not None else os.getenv("LOG_LEVEL"))
+    levels = {name: _level(v, level) for name, v in _pairs(levels if levels is not None else os.getenv("LOG_LEVELS")).items()}
+    sample = _pairs(sample if sample is not None else os.getenv("LOG_SAMPLE"))
+    fmt = fmt or os.getenv("LOG_FORMAT", "text")
+    ring_size = int(ring_size if ring_size is not None else os.getenv("LOG_RING", "0") or 0)
+    ring_level = _level(ring_level if ring_level is not None else os.getenv("LOG_RING_LEVEL"), DEBUG)
+
+    with _config_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in _installed:
+            root.removeHandler(handler)
+        _installed.clear()
+        for logger in _configured_loggers:
+            logger.setLevel(logging.NOTSET)
+            logger.filters = [f for f in logger.filters if not isinstance(f, SampleFilter)]
+        _configured_loggers.clear()
+
+        console = logging.StreamHandler(stream or sys.stderr)
+        console.setLevel(level)
+        console.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+        _installed.append(console)
+
+        ring = RingBuffer(ring_size, ring_level) if ring_size > 0 else None
+        if ring is not None:
+            _installed.append(ring)
+
+        # The logger level is the lowest any handler wants, so a disabled
+        # level is rejected before a record is even created
+        root.setLevel(min([level] + ([ring_level] if ring is not None else [])))
+        root.propagate = False
+        for handler in _installed:
+            root.addHandler(handler)
+
+        for name, module_level in levels.items():
+            logger = get_logger(name)
+            logger.setLevel(module_level)
+            _configured_loggers.append(logger)
+            # Module-level overrides reach stderr too
+            console.setLevel(min(console.level, module_level))
+        if levels:
+            # ...but only for the modules that asked for them
+            console.addFilter(_ModuleLevelFilter(level, levels))
+        for name, rate in sample.items():
+            logger = get_logger(name)
+            logger.addFilter(SampleFilter(float(rate)))
+            _configured_loggers.append(logger)
+    return ring
+
+
+class _ModuleLevelFilter(logging.Filter):
+    def __init__(self, default, levels):
+        super().__init__()
+        self.default = default
+        self.levels = {f"{ROOT_LOGGER}.{name}": lvl for name, lvl in levels.items()}
+
+    def filter(self, record):
+        return record.levelno >= self.levels.get(record.name, self.default)
+
+
+def recent_events(limit=None, level=DEBUG):
+    """Newest-last events from the ring buffer ([] when LOG_RING is off)."""
+    return ring.recent(limit, level) if ring is not None else []
+
+
+configure()
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from io import BytesIO
+
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Flowable
+
+from applog import get_logger
+from pdf_compact import DEFAULT_IMAGE_DPI
+
+log = get_logger(__name__)
+
+# ==========================================================
+#  BRANDING ASSET CACHE (LOGOS / HEADSHOTS)
+# ==========================================================
+#
+# Uploaded images are decoded once, flattened onto white, scaled down to
+# the size they are printed at and re-encoded as JPEG. Entries are keyed by
+# a content hash + print size and kept in an LRU bounded by bytes, so 500
+# reports with the same logo decode it exactly once. Concurrent misses for
+# the same image wait for the one decode in flight instead of repeating it.
+#
+# ReportLab embeds JPEG data without decoding it, but canvas.drawImage()
+# fingerprints an ImageReader via getRGBData(), which normally decodes the
+# whole image. PreparedImageReader answers that from the cached pixels.
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+JPEG_QUALITY = 90
+
+PreparedImage = namedtuple("PreparedImage", "digest jpeg rgb width_px height_px width_pt height_pt")
+
+
+class PreparedImageReader(ImageReader):
+    """ImageReader over cached JPEG bytes that never re-decodes pixels."""
+
+    def __init__(self, prepared):
+        super().__init__(BytesIO(prepared.jpeg))
+        self._prepared = prepared
+        self._dataA = None  # flattened onto white, so there is no alpha mask
+
+    def getRGBData(self):
+        return self._prepared.rgb
+
+
+class BrandImage(Flowable):
+    """Platypus flowable drawing a PreparedImage at its print size."""
+
+    def __init__(self, prepared, hAlign="CENTER"):
+        super().__init__()
+        self.prepared = prepared
+        self.width = prepared.width_pt
+        self.height = prepared.height_pt
+        self.hAlign = hAlign
+
+    def draw(self):
+        self.canv.drawImage(PreparedImageReader(self.prepared), 0, 0, self.width, self.height)
+
+
+def _prepare(data, digest, width_pt, height_pt, dpi):
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as img:
+        img.load()
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            rgba = img.convert("RGBA")
+            flat = Image.new("RGB", rgba.size, (255, 255, 255))
+            flat.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            flat = img.convert("RGB")
+
+    max_px = (max(1, int(width_pt / 72.0 * dpi)), max(1, int(height_pt / 72.0 * dpi)))
+    if flat.width > max_px[0] or flat.height > max_px[1]:
+        flat.thumbnail(max_px, Image.LANCZOS)
+
+    out = BytesIO()
+    flat.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+
+    # Fit inside the requested box, keeping the aspect ratio
+    scale = min(width_pt / flat.width, height_pt / flat.height)
+    return PreparedImage(
+        digest=digest,
+        jpeg=out.getvalue(),
+        rgb=flat.tobytes(),
+        width_px=flat.width,
+        height_px=flat.height,
+        width_pt=flat.width * scale,
+        height_pt=flat.height * scale,
+    )
+
+
+class AssetCache:
+    """Thread-safe LRU of PreparedImage entries, bounded by total bytes."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._inflight = {}   # key -> Event set when its decode finishes
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.decodes = 0
+        self.evictions = 0
+
+    def get(self, data, width_pt, height_pt, dpi=DEFAULT_IMAGE_DPI):
+        """Return a PreparedImage for raw image bytes at the given print box."""
+        digest = hashlib.sha256(data).hexdigest()
+        key = (digest, round(width_pt, 2), round(height_pt, 2), dpi)
+        waited = False
+        while True:
+            with self._lock:
+                prepared = self._entries.get(key)
+                if prepared is not None:
+                    self._entries.move_to_end(key)
+                    if not waited:
+                        self.hits += 1
+                    return prepared
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    if not waited:
+                        self.misses += 1
+                    break
+                if not waited:
+                    self.coalesced += 1
+                waited = True
+            # Another render is decoding this image; use its entry (or take
+            # over if it failed)
+            event.wait()
+
+        # Decode outside the lock, once per key
+        try:
+            prepared = _prepare(data, digest, width_pt, height_pt, dpi)
+            size = len(prepared.jpeg) + len(prepared.rgb)
+            with self._lock:
+                self.decodes += 1
+                self._entries[key] = prepared
+                self.bytes += size
+                while self.bytes > self.max_bytes and len(self._entries) > 1:
+                    _, old = self._entries.popitem(last=False)
+                    self.bytes -= len(old.jpeg) + len(old.rgb)
+                    self.evictions += 1
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+        return prepared
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "decodes": self.decodes,
+                "evictions": self.evictions,
+            }
+
+
+# Process-wide cache shared by every report render
+branding_cache = AssetCache()
+
+
+def brand_image(data, width_pt, height_pt, hAlign="CENTER", cache=None):
+    """Flowable for uploaded image bytes (or a file-like object), or None."""
+    if data is None:
+        return None
+    if hasattr(data, "getvalue"):
+        data = data.getvalue()
+    elif hasattr(data, "read"):
+        data = data.read()
+    if not data:
+        return None
+    prepared = (cache or branding_cache).get(data, width_pt, height_pt)
+    return BrandImage(prepared, hAlign=hAlign)
+
+
+# ==========================================================
+#  USER GUIDE PDF (READ ONCE PER PROCESS)
+# ==========================================================
+#
+# The guide is read from next to this module (not the working directory)
+# on first use and kept as immutable bytes, so reruns do no disk I/O.
+# Streamlit serves download data under a URL derived from its content hash,
+# which stays the same across reruns and sessions. A missing file is
+# reported once, when it is first looked up (`python startup.py serve` does
+# that at boot), and the pages then just leave the button out.
+
+USER_GUIDE_NAME = "Investment_Metrics_User_Guide.pdf"
+USER_GUIDE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), USER_GUIDE_NAME)
+
+StaticFile = namedtuple("StaticFile", "name data sha256")
+
+_user_guide = None
+_user_guide_loaded = False
+_user_guide_lock = threading.Lock()
+
+
+def load_static_file(path):
+    """StaticFile for `path`, or None (reported) if it can't be read."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        log.warning("%s unavailable: %s", os.path.basename(path), e)
+        return None
+    return StaticFile(os.path.basename(path), data, hashlib.sha256(data).hexdigest())
+
+
+def user_guide():
+    """The user guide PDF as a StaticFile, or None if it is missing."""
+    global _user_guide, _user_guide_loaded
+    if not _user_guide_loaded:
+        with _user_guide_lock:
+            if not _user_guide_loaded:
+                _user_guide = load_static_file(USER_GUIDE_PATH)
+                _user_guide_loaded = True
+    return _user_guide
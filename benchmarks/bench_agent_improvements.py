@@ -0,0 +1,79 @@
+"""Render-time benchmark for the agent PDF improvements section.
+
+Renders the agent report with growing capital plans and checks that the
+time per improvement row stays roughly flat (i.e. total render time grows
+linearly with the number of rows).
+
+    python benchmarks/bench_agent_improvements.py
+    python benchmarks/bench_agent_improvements.py --sizes 50 500 5000 --max-ratio 2.5
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from calc_engine import calculate_metrics
+from pdf_single_agent import generate_pdf
+
+
+def make_improvements(n):
+    return [
+        {"Description": f"Upgrade {i + 1}", "Amount ($)": 1500 + (i * 137) % 40000}
+        for i in range(n)
+    ]
+
+
+def render_seconds(metrics, improvements, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pdf(
+                property_data={"street_address": "123 Main St", "zip_code": "94566"},
+                metrics=metrics,
+                summary_text="",
+                agent_name="Agent X",
+                brokerage_name="Brokerage",
+                client_name="Client",
+                improvements_list=improvements,
+            )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000, 3000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ratio", type=float, default=3.0,
+                        help="fail if per-row cost at the largest size exceeds the smallest by this factor")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        metrics = calculate_metrics(300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+    baseline = render_seconds(metrics, [], args.repeat)
+
+    print(f"{'rows':>8} {'seconds':>10} {'ms/row':>10}")
+    per_row = []
+    for n in args.sizes:
+        seconds = render_seconds(metrics, make_improvements(n), args.repeat)
+        cost = (seconds - baseline) / n * 1000
+        per_row.append(cost)
+        print(f"{n:>8} {seconds:>10.3f} {cost:>10.3f}")
+
+    ratio = per_row[-1] / per_row[0] if per_row[0] > 0 else 0.0
+    print(f"per-row cost ratio (largest/smallest): {ratio:.2f} (limit {args.max_ratio:.2f})")
+    if ratio > args.max_ratio:
+        print("❌ Render time is growing faster than linear.")
+        return 1
+    print("✅ Render time grows linearly with improvement rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
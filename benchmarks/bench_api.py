@@ -0,0 +1,156 @@
+"""Throughput of the HTTP JSON API under concurrent clients.
+
+Starts `api_server.py` in a subprocess on a free port, then for each
+--clients level runs that many keep-alive clients (threads) for
+--duration seconds. Each client sends requests drawn from a mix of the
+endpoints with no think time. Reported per level:
+  - completed requests per second;
+  - latency percentiles per endpoint;
+  - how many requests were shed with 503 (admission control) or timed
+    out with 504.
+
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --clients 1 8 32 --duration 20 --workers 4
+    python benchmarks/bench_api.py --mix metrics=1 --clients 64 --max-in-flight 8
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+INPUTS = [300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10]
+OTHER = [425000, 2650, 25, 6.5, 30, 420, 5, 3.5, 2.5, 10]
+
+
+def _vary(rng, inputs):
+    # A different rate per request, so nothing is served from a cache
+    return inputs[:3] + [round(rng.uniform(3.0, 9.0), 2)] + inputs[4:]
+
+
+REQUESTS = {
+    "metrics": lambda rng: ("/v1/metrics", {"inputs": _vary(rng, INPUTS)}),
+    "batch": lambda rng: ("/v1/metrics/batch", {"scenarios": [_vary(rng, INPUTS) for _ in range(200)]}),
+    "verdict": lambda rng: ("/v1/verdict", {"inputs_a": _vary(rng, INPUTS), "inputs_b": _vary(rng, OTHER)}),
+    "investor": lambda rng: ("/v1/reports/investor", {"inputs": _vary(rng, INPUTS)}),
+    "agent": lambda rng: ("/v1/reports/agent", {
+        "inputs": _vary(rng, INPUTS), "agent_name": "Dana Reyes", "client_name": "J. Chen",
+        "improvements": [{"Description": "Roof", "Amount ($)": 9000}, {"Description": "Kitchen", "Amount ($)": 22000}],
+    }),
+    "comparison": lambda rng: ("/v1/reports/comparison", {
+        "inputs_a": _vary(rng, INPUTS), "inputs_b": _vary(rng, OTHER), "address_a": "12 Elm St", "address_b": "7 Summit Way",
+    }),
+}
+DEFAULT_MIX = "metrics=4,batch=1,verdict=2,investor=2,agent=1,comparison=1"
+
+
+def start_server(args):
+    command = [sys.executable, os.path.join(ROOT, "api_server.py"), "--port", "0",
+               "--workers", str(args.workers), "--timeout", str(args.timeout)]
+    if args.max_in_flight:
+        command += ["--max-in-flight", str(args.max_in_flight)]
+    env = dict(os.environ, LOG_LEVEL="ERROR")   # IRR fallback warnings on varied inputs
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, env=env)
+    line = proc.stdout.readline()
+    if not line.startswith("Serving on "):
+        proc.kill()
+        raise SystemExit(f"api_server.py did not start: {line!r}")
+    return proc, int(line.strip().rsplit(":", 1)[1])
+
+
+def client(port, mix, rng, stop_at, results):
+    names, weights = zip(*mix.items())
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    while time.perf_counter() < stop_at:
+        name = rng.choices(names, weights)[0]
+        path, body = REQUESTS[name](rng)
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            size = len(response.read())
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+            status, size = "error", 0
+        results.append((name, status, time.perf_counter() - start, size))
+        if status == 503:
+            time.sleep(0.05)   # a polite client backs off a little
+    conn.close()
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def run_level(port, clients, mix, duration, seed):
+    results = []
+    stop_at = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(port, mix, random.Random(seed + i), stop_at, results))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r[1] == 200]
+    print(f"\n=== {clients} client(s): {len(ok)} ok in {wall:.1f}s = {len(ok) / wall:.1f} req/s   "
+          f"503 {sum(r[1] == 503 for r in results)}   504 {sum(r[1] == 504 for r in results)}   "
+          f"other {sum(r[1] not in (200, 503, 504) for r in results)}")
+    summary = {"clients": clients, "wall_s": wall, "ok": len(ok), "req_per_s": len(ok) / wall,
+               "shed_503": sum(r[1] == 503 for r in results), "timeouts_504": sum(r[1] == 504 for r in results),
+               "endpoints": {}}
+    for name in mix:
+        times = sorted(r[2] * 1000 for r in ok if r[0] == name)
+        if not times:
+            continue
+        stats = {p: percentile(times, int(p[1:])) for p in ("p50", "p95", "p99")}
+        stats.update(n=len(times), max=times[-1])
+        summary["endpoints"][name] = stats
+        print(f"  {name:<11} n={len(times):<5} p50 {stats['p50']:>7.1f}  p95 {stats['p95']:>7.1f}  "
+              f"p99 {stats['p99']:>7.1f}  max {stats['max']:>7.1f} ms")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-in-flight", type=int, help="server admission limit (default: 4 x workers)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="server request timeout (s)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--json", help="write the results here")
+    args = parser.parse_args()
+
+    mix = {}
+    for part in args.mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in REQUESTS:
+            parser.error(f"unknown endpoint {name!r} (choose from {', '.join(REQUESTS)})")
+        mix[name] = float(weight or 1)
+
+    proc, port = start_server(args)
+    try:
+        print(f"api_server.py on port {port}: {args.workers} worker(s), mix {args.mix}")
+        levels = [run_level(port, n, mix, args.duration, args.seed + n) for n in args.clients]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"workers": args.workers, "mix": mix, "levels": levels}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
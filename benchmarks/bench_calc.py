@@ -0,0 +1,142 @@
+"""Calc-engine benchmark suite, compared against benchmarks/baselines/calc.json.
+
+Cases, each at sizes 1 / 100 / 10k / 1M scenarios (1M is opt-in: it takes
+minutes for the scalar paths):
+  calculate_metrics         one call per scenario
+  calculate_metrics_batch   the same scenarios in one batch call
+  safe_irr / robust_irr     the IRR paths on each scenario's cash flows
+  batched_irr               the batch solver on the same flows
+  amortization              mortgage_payment + remaining_balance per loan
+  grade / grade_batch       grading.grade_of per deal vs grading.grade on arrays
+
+Scenarios are drawn from a seeded generator over realistic ranges, so
+every run (and the baseline) times the same inputs.
+
+    python benchmarks/bench_calc.py                       run <= 10k, compare
+    python benchmarks/bench_calc.py --max-size 0          every size, incl. 1M
+    python benchmarks/bench_calc.py --only irr --threshold 0.1
+    python benchmarks/bench_calc.py --update-baseline
+"""
+import os
+import random
+import sys
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import suite  # noqa: E402  (puts the repo root on sys.path)
+
+import applog  # noqa: E402
+import grading  # noqa: E402
+from calc_engine import (batched_irr, calculate_metrics, calculate_metrics_batch, mortgage_payment,  # noqa: E402
+                         remaining_balance, robust_irr, safe_irr)
+
+SIZES = (1, 100, 10_000, 1_000_000)
+DEFAULT_MAX_SIZE = 10_000
+SEED = 2024
+
+
+def scenarios(size):
+    rng = random.Random(SEED)
+    rows = []
+    for _ in range(size):
+        price = rng.randrange(150_000, 900_000, 5_000)
+        rows.append((
+            price,
+            round(price * rng.uniform(0.005, 0.011)),      # monthly rent
+            rng.choice((10, 20, 25, 30)),                  # down payment %
+            round(rng.uniform(3.0, 9.0), 2),               # mortgage rate
+            rng.choice((15, 20, 30)),                      # term
+            round(price * rng.uniform(0.0008, 0.002)),     # monthly expenses
+            rng.choice((3, 5, 8)),                         # vacancy
+            round(rng.uniform(1.0, 5.0), 1),               # appreciation
+            round(rng.uniform(1.0, 4.0), 1),               # rent growth
+            rng.choice((5, 10, 15, 20, 30)),               # horizon
+        ))
+    return rows
+
+
+def cash_flows(size):
+    """Equity cash flows with sale proceeds, as calculate_metrics builds them."""
+    flows = []
+    for (price, rent, down, rate, term, expenses, vacancy, appreciation, growth, horizon) in scenarios(size):
+        payment = mortgage_payment(price * (1 - down / 100), rate / 1200, term * 12)
+        yearly = [round(rent * (1 + growth / 100) ** y * (1 - vacancy / 100) * 12 - expenses * 12 - payment * 12, 2)
+                  for y in range(horizon)]
+        yearly[-1] += price * (1 + appreciation / 100) ** horizon
+        flows.append([-price * down / 100] + yearly)
+    return flows
+
+
+def loans(size):
+    return [(price * (1 - down / 100), rate / 1200, term * 12, horizon * 12)
+            for (price, _, down, rate, term, *_, horizon) in scenarios(size)]
+
+
+def grade_columns(size):
+    """ROI (%), summed cash flow ($) and CoC (%) spread across every grade row."""
+    rng = random.Random(SEED)
+    rows = [(rng.uniform(-50, 400), rng.uniform(-40_000, 60_000), rng.uniform(-15, 25)) for _ in range(size)]
+    return [list(column) for column in zip(*rows)] if rows else [[], [], []]
+
+
+def run_metrics(rows):
+    for row in rows:
+        calculate_metrics(*row)
+
+
+def run_batch(rows):
+    calculate_metrics_batch(rows)
+
+
+def run_safe_irr(flows):
+    for f in flows:
+        safe_irr(f)
+
+
+def run_robust_irr(flows):
+    for f in flows:
+        robust_irr(f)
+
+
+def run_batched_irr(flows):
+    # batched_irr takes one horizon (row length) at a time
+    groups = {}
+    for f in flows:
+        groups.setdefault(len(f), []).append(f)
+    for group in groups.values():
+        batched_irr(group)
+
+
+def run_amortization(rows):
+    for loan, monthly_rate, n_payments, elapsed in rows:
+        payment = mortgage_payment(loan, monthly_rate, n_payments)
+        remaining_balance(loan, monthly_rate, n_payments, payment, elapsed)
+
+
+def run_grade(columns):
+    for roi, cash_flow, coc in zip(*columns):
+        grading.grade_of(roi, cash_flow, coc)
+
+
+def run_grade_batch(columns):
+    grading.grade(*columns)
+
+
+CASES = [
+    suite.Case("calculate_metrics", run_metrics, SIZES, scenarios, unit="scenario"),
+    suite.Case("calculate_metrics_batch", run_batch, SIZES, scenarios, unit="scenario"),
+    suite.Case("safe_irr", run_safe_irr, SIZES, cash_flows, unit="flow"),
+    suite.Case("robust_irr", run_robust_irr, SIZES, cash_flows, unit="flow"),
+    suite.Case("batched_irr", run_batched_irr, SIZES, cash_flows, unit="flow"),
+    suite.Case("amortization", run_amortization, SIZES, loans, unit="loan"),
+    suite.Case("grade", run_grade, SIZES, grade_columns, unit="deal"),
+    suite.Case("grade_batch", run_grade_batch, SIZES, grade_columns, unit="deal"),
+]
+
+
+if __name__ == "__main__":
+    applog.configure(level="ERROR")   # IRR fallback warnings on unusual flows
+    warnings.simplefilter("ignore", RuntimeWarning)   # Newton overflow on the same flows
+    import scipy.optimize  # noqa: F401  robust_irr's lazy import is not what we time
+    sys.exit(suite.main("calc", CASES, __doc__.splitlines()[0], max_size=DEFAULT_MAX_SIZE))
@@ -0,0 +1,103 @@
+"""Server CPU per rerun: server-rendered chart images vs browser-drawn Vega-Lite.
+
+Each rerun nudges the mortgage-rate slider to a value not seen before, so
+metrics, PDFs and (in image mode) the projection chart are recomputed, as
+they are when an agent drags a slider. CPU is process time of the whole
+rerun (AppTest runs the script in this process), so the difference between
+the two columns is what the browser mode takes off the server. The second
+table isolates the chart itself: matplotlib render vs building + JSON
+encoding the Vega-Lite spec, and the bytes sent to the browser.
+
+    python benchmarks/bench_chart_modes.py
+    python benchmarks/bench_chart_modes.py --repeat 10
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import charts
+from calc_engine import calculate_metrics
+
+PAGES = {
+    "Single Property": ("1_Main_Single_Property.py", "Mortgage Rate (%)"),
+    "Dual Property": ("2_Main_Dual_Property.py", "📈 Mortgage Rate (%)"),
+}
+
+
+def cpu_run(at):
+    start = time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return (time.process_time() - start) * 1000
+
+
+def page_cpu(page, slider_label, mode, repeat, offset):
+    at = AppTest.from_file(os.path.join(ROOT, "pages", page), default_timeout=120)
+    at.session_state["authenticated"] = True
+    cpu_run(at)
+    next(r for r in at.radio if r.label == "📊 Projection Chart").set_value(mode)
+    cpu_run(at)
+
+    samples = []
+    for i in range(repeat):
+        slider = next(s for s in at.slider if s.label == slider_label)
+        slider.set_value(round(3.0 + offset + i * 0.1, 1))
+        samples.append(cpu_run(at))
+    return statistics.median(samples)
+
+
+def chart_cost(repeat):
+    m = calculate_metrics(300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 30)
+    args = (list(range(1, 31)), m["Multi-Year Cash Flow"], m["Annual Rents $ (by year)"], m["Annual ROI % (by year)"])
+    results = {}
+    for fmt in ("png", "svg"):
+        times = []
+        for _ in range(repeat):
+            start = time.process_time()
+            data = charts.render_chart(charts._draw_projection, fmt=fmt, **dict(zip(
+                ("years", "cash_flow", "rents", "roi"), args)))
+            times.append((time.process_time() - start) * 1000)
+        results[f"image ({fmt})"] = (statistics.median(times), len(data))
+    times = []
+    for _ in range(repeat):
+        start = time.process_time()
+        payload = json.dumps(charts.projection_spec(*args))
+        times.append((time.process_time() - start) * 1000)
+    results["vega-lite spec"] = (statistics.median(times), len(payload))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    print(f"{'page':<16} {'image (server)':>15} {'interactive':>12} {'saved':>8}")
+    for n, (label, (page, slider_label)) in enumerate(PAGES.items()):
+        image = page_cpu(page, slider_label, "image", args.repeat, offset=4 * n)
+        interactive = page_cpu(page, slider_label, "interactive", args.repeat, offset=4 * n + 2)
+        print(f"{label:<16} {image:>9.0f} ms CPU {interactive:>6.0f} ms CPU {1 - interactive / image:>7.0%}")
+
+    print(f"\n{'30-year projection':<20} {'CPU':>9} {'payload':>10}")
+    for label, (ms, size) in chart_cost(args.repeat).items():
+        print(f"{label:<20} {ms:>6.1f} ms {size / 1024:>7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Table-style (platypus) vs direct-canvas comparison report benchmark.
+
+Renders the two-property comparison both ways, checks that the two PDFs
+carry the same text content, then times single reports, a batch run and
+an N-way comparison (canvas only — the table style is fixed at two).
+
+    python benchmarks/bench_comparison_pdf.py
+    python benchmarks/bench_comparison_pdf.py --batch 500 --ways 6
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PyPDF2 import PdfReader
+
+from calc_engine import calculate_metrics
+from pdf_dual import (
+    generate_comparison_pdf,
+    generate_comparison_pdf_table_style,
+    generate_comparison_pdfs_batch,
+    render_comparison_canvas,
+)
+
+
+def make_metrics(i):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return calculate_metrics(300000 + i * 5000, 2000 + i * 25, 20, 6.5, 30, 300, 5, 3, 2 + (i % 3), 10 + (i % 6))
+
+
+def pdf_words(pdf_bytes):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return Counter(" ".join(page.extract_text() for page in reader.pages).split())
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--ways", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    a, b = make_metrics(0), make_metrics(1)
+    addr = dict(address_a="123 Main St", zip_a="94566", address_b="456 Oak Ave", zip_b="94567")
+
+    table_pdf = generate_comparison_pdf_table_style(a, b, **addr)
+    canvas_pdf = generate_comparison_pdf(a, b, **addr).getvalue()
+    same = pdf_words(table_pdf) == pdf_words(canvas_pdf)
+    print(f"content match (table vs canvas): {'yes' if same else 'NO'}")
+    print(f"size: table {len(table_pdf):,} B, canvas {len(canvas_pdf):,} B")
+
+    pairs = [(make_metrics(i), make_metrics(i + 1)) for i in range(args.batch)]
+    many = [make_metrics(i) for i in range(args.ways)]
+
+    for include_chart in (False, True):
+        label = "with chart" if include_chart else "grid only"
+        print(f"\n--- {label} ---")
+
+        t_table = best_of(lambda: generate_comparison_pdf_table_style(
+            a, b, include_chart=include_chart, **addr), args.repeat)
+        t_canvas = best_of(lambda: generate_comparison_pdf(
+            a, b, include_chart=include_chart, **addr), args.repeat)
+        print(f"single report: table {t_table * 1000:.1f} ms, canvas {t_canvas * 1000:.1f} ms "
+              f"({t_table / t_canvas:.1f}x)")
+
+        start = time.perf_counter()
+        for ma, mb in pairs:
+            generate_comparison_pdf_table_style(ma, mb, include_chart=include_chart)
+        t_table_batch = time.perf_counter() - start
+        start = time.perf_counter()
+        batch = ({"metrics_list": [ma, mb]} for ma, mb in pairs)
+        for _ in generate_comparison_pdfs_batch(batch, include_chart=include_chart):
+            pass
+        t_canvas_batch = time.perf_counter() - start
+        print(f"batch of {args.batch}: table {t_table_batch:.2f} s ({args.batch / t_table_batch:.0f}/s), "
+              f"canvas {t_canvas_batch:.2f} s ({args.batch / t_canvas_batch:.0f}/s)")
+
+        t_nway = best_of(lambda: render_comparison_canvas(
+            io.BytesIO(), many, include_chart=include_chart), args.repeat)
+        print(f"{args.ways}-way canvas report: {t_nway * 1000:.1f} ms")
+
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Cost of logging on the metrics + verdict hot path, per configuration.
+
+Runs calculate_metrics() and both verdicts for --iterations scenarios under
+each logging setup, writing stderr output to /dev/null, and reports the
+time per scenario and how many records were formatted.
+
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --iterations 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import applog
+from calc_engine import calculate_metrics
+from pdf_dual import generate_ai_verdict as dual_verdict
+from pdf_single import generate_ai_verdict as single_verdict
+
+CONFIGS = [
+    ("default (WARNING)", dict(level="WARNING")),
+    ("ring buffer, DEBUG", dict(level="WARNING", ring_size=500, ring_level="DEBUG")),
+    ("DEBUG, sampled 1%", dict(level="DEBUG", sample="calc_engine=0.01,pdf_single=0.01,pdf_dual=0.01")),
+    ("DEBUG, text", dict(level="DEBUG")),
+    ("DEBUG, json", dict(level="DEBUG", fmt="json")),
+]
+
+
+class CountingNull:
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def run(iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        metrics = calculate_metrics(300000 + i, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+        single_verdict(metrics)
+        dual_verdict(metrics, metrics)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    applog.configure(level="WARNING")
+    run(200)  # warm-up
+
+    print(f"{'config':<22} {'µs / scenario':>14} {'lines out':>10} {'ring':>6}")
+    for name, config in CONFIGS:
+        out = CountingNull()
+        applog.configure(stream=out, **config)
+        per_scenario = run(args.iterations)
+        print(f"{name:<22} {per_scenario * 1e6:>14.0f} {out.lines:>10} {len(applog.recent_events()):>6}")
+    applog.configure()
+
+
+if __name__ == "__main__":
+    main()
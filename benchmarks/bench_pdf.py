@@ -0,0 +1,132 @@
+"""PDF rendering benchmark suite, compared against benchmarks/baselines/pdf.json.
+
+One case per report, rendered the way the pages serve it (compact, with
+charts). Each result records best wall time, peak traced memory of one
+render, page count and output size; any of them growing past the
+threshold fails the run, so ReportLab layout changes can't quietly cost
+throughput or bloat the files.
+  pdf_single          investor report (pdf_single.generate_pdf)
+  pdf_agent[n]        agent report with n = 0 / 10 / 500 improvements
+  pdf_dual            dual-property report (pdf_dual.generate_pdf)
+  pdf_comparison      generate_comparison_pdf_table_style
+  narratives[n]       agent-report executive summary + agent perspective
+                      for n deals in one batch (generate_narratives)
+
+    python benchmarks/bench_pdf.py
+    python benchmarks/bench_pdf.py --only agent --threshold 0.1
+    python benchmarks/bench_pdf.py --update-baseline
+"""
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import suite  # noqa: E402  (puts the repo root on sys.path)
+
+from PyPDF2 import PdfReader  # noqa: E402
+
+import applog  # noqa: E402
+import pdf_dual  # noqa: E402
+import pdf_single  # noqa: E402
+import pdf_single_agent  # noqa: E402
+from calc_engine import calculate_metrics  # noqa: E402
+
+PROPERTY_A = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+PROPERTY_B = (425000, 2650, 25, 6.5, 30, 420, 5, 3.5, 2.5, 10)
+
+
+def report_metrics(inputs):
+    metrics = calculate_metrics(*inputs)
+    summary, _ = pdf_single.generate_ai_verdict(metrics)
+    return metrics, summary
+
+
+def output_metrics(pdf):
+    if not isinstance(pdf, bytes):   # most generators return the BytesIO
+        pdf = pdf.getvalue()
+    return {"pages": len(PdfReader(io.BytesIO(pdf)).pages), "kb": len(pdf) / 1024}
+
+
+def setup_single(size):
+    metrics, summary = report_metrics(PROPERTY_A)
+    return {"street_address": "123 Main St", "zip_code": "94566"}, metrics, summary
+
+
+def run_single(args):
+    property_data, metrics, summary = args
+    return pdf_single.generate_pdf(property_data, metrics, summary, compact=True)
+
+
+def setup_agent(improvements):
+    metrics, summary = report_metrics(PROPERTY_A)
+    plan = [{"Description": f"Upgrade {i + 1}", "Amount ($)": 1500 + (i * 137) % 40000}
+            for i in range(improvements)]
+    return metrics, summary, plan
+
+
+def run_agent(args):
+    metrics, summary, plan = args
+    return pdf_single_agent.generate_pdf(
+        property_data={"street_address": "123 Main St", "zip_code": "94566"},
+        metrics=metrics,
+        summary_text=summary,
+        agent_name="Agent X",
+        brokerage_name="Brokerage",
+        client_name="Client",
+        agent_notes="Walkable, close to transit.",
+        improvements_list=plan,
+        compact=True,
+    )
+
+
+def setup_pair(size):
+    metrics_a, metrics_b = calculate_metrics(*PROPERTY_A), calculate_metrics(*PROPERTY_B)
+    summary, _ = pdf_dual.generate_ai_verdict(metrics_a, metrics_b)
+    return metrics_a, metrics_b, summary
+
+
+def run_dual(args):
+    metrics_a, metrics_b, summary = args
+    return pdf_dual.generate_pdf(
+        {"Address A": "123 Main St", "ZIP Code A": "94566"},
+        {"Address B": "456 Oak Ave", "ZIP Code B": "94567"},
+        metrics_a, metrics_b, summary, compact=True,
+    )
+
+
+def run_comparison(args):
+    metrics_a, metrics_b, _ = args
+    return pdf_dual.generate_comparison_pdf_table_style(
+        metrics_a, metrics_b, "123 Main St", "94566", "456 Oak Ave", "94567", compact=True,
+    )
+
+
+def setup_narratives(size):
+    rng = random.Random(2024)
+    return [{"First Year Cash Flow ($)": rng.uniform(-3000, 3000), "Final Year ROI (%)": rng.uniform(-5, 30),
+             "Grade": rng.choice("ABCDF")} for _ in range(size)]
+
+
+def run_narratives(metrics_list):
+    pdf_single_agent.generate_narratives("executive_summary", metrics_list)
+    pdf_single_agent.generate_narratives("agent_perspective", metrics_list)
+
+
+def report(name, run, sizes, setup):
+    return suite.Case(name, run, sizes, setup, unit=None, trace_memory=True, describe=output_metrics)
+
+
+CASES = [
+    report("pdf_single", run_single, (1,), setup_single),
+    report("pdf_agent", run_agent, (0, 10, 500), setup_agent),
+    report("pdf_dual", run_dual, (1,), setup_pair),
+    report("pdf_comparison", run_comparison, (1,), setup_pair),
+    suite.Case("narratives", run_narratives, (1, 100, 100_000), setup_narratives, unit="deal"),
+]
+
+
+if __name__ == "__main__":
+    applog.configure(level="ERROR")
+    sys.exit(suite.main("pdf", CASES, __doc__.splitlines()[0]))
@@ -0,0 +1,112 @@
+"""Per-interaction latency on the Single Property page, before/after fragments.
+
+Before: the page as it was right before it was split into fragments
+(frozen in benchmarks/single_page_before_fragments.py), where every widget
+change reran the whole script. The same interaction is applied and the
+full run is timed with the result caches warm, as they would be in a live
+session.
+Chart mode had no "before" on that page (it arrived later as a sidebar
+radio, which also reran everything), so its before is a full run of the
+current page.
+After: widgets inside a fragment only rerun that fragment; its cost is the
+section time the page records in session state (AppTest itself always
+performs full runs, so the fragment's own timer is what we report).
+"Before" numbers include AppTest's own per-run overhead (a few ms).
+
+    python benchmarks/bench_single_page_fragments.py
+    python benchmarks/bench_single_page_fragments.py --repeat 10
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+from charts import CHART_MODES
+
+PAGE = os.path.join(ROOT, "pages", "1_Main_Single_Property.py")
+BEFORE_PAGE = os.path.join(ROOT, "benchmarks", "single_page_before_fragments.py")
+EMAIL_LABEL = "Enter email address to send the report"
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return (time.perf_counter() - start) * 1000
+
+
+def last_section(at, name):
+    return at.session_state["_section_timings"][name][-1]
+
+
+def load(at):
+    at.session_state["authenticated"] = True
+    timed_run(at)
+    return at
+
+
+def agent_name(at, i):
+    next(w for w in at.text_input if w.label == "Agent Name").input(f"Agent {i}")
+
+
+def investor_email(at, i):
+    # The old page had no widget keys: the investor box comes first
+    next(w for w in at.text_input if w.label == EMAIL_LABEL).input(f"i{i}@example.com")
+
+
+def client_email(at, i):
+    [*_, box] = (w for w in at.text_input if w.label == EMAIL_LABEL)
+    box.input(f"c{i}@example.com")
+
+
+def chart_mode(at, i):
+    modes = list(CHART_MODES)
+    next(r for r in at.radio if r.label == "📊 Projection Chart").set_value(modes[i % len(modes)])
+
+
+# label -> (interaction, fragment section, measure "before" on the old page)
+INTERACTIONS = {
+    "Agent Name": (agent_name, "agent_report", True),
+    "Client email": (client_email, "agent_email", True),
+    "Investor email": (investor_email, "investor_email", True),
+    "Chart mode": (chart_mode, "charts", False),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    old = load(AppTest.from_file(BEFORE_PAGE, default_timeout=120))
+    at = load(AppTest.from_file(PAGE, default_timeout=120))
+
+    print(f"{'interaction':<16} {'before (full run)':>18} {'after (fragment)':>17} {'speedup':>8}")
+    for label, (interact, section, on_old_page) in INTERACTIONS.items():
+        before_page = old if on_old_page else at
+        before, after = [], []
+        for i in range(args.repeat):
+            interact(before_page, i)
+            before.append(timed_run(before_page))
+            interact(at, i + 1)
+            timed_run(at)
+            after.append(last_section(at, section))
+        b, a = statistics.median(before), statistics.median(after)
+        print(f"{label:<16} {b:>15.1f} ms {a:>14.1f} ms {b / a:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Next-step metrics latency with and without speculative precompute.
+
+Replays a random walk of single-slider steps (rate ±0.1, horizon ±1, down
+payment ±1, ...) like an agent exploring a listing. Without speculation
+every step is a cache miss and computes its metrics; with it, the
+neighbors of each position are computed in the background (capped CPU
+share) while the "user" pauses, and the next step is looked up.
+
+    python benchmarks/bench_speculation.py
+    python benchmarks/bench_speculation.py --steps 500 --cpu-share 0.1
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from result_cache import metrics_cache, shared_metrics
+from speculate import Speculator, neighbor_inputs
+
+START = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+STEPS = [
+    ("mortgage_rate", 0.1, 0.0, 15.0),
+    ("time_horizon", 1, 1, 30),
+    ("down_payment_pct", 1, 0, 100),
+    ("vacancy_rate", 1, 0, 100),
+    ("appreciation_rate", 1, 0, 10),
+    ("rent_growth_rate", 1, 0, 10),
+]
+# Agents mostly touch the first three sliders
+WEIGHTS = [5, 3, 3, 1, 1, 1]
+
+
+def walk(n, seed=7):
+    rng = random.Random(seed)
+    position, path = START, []
+    for _ in range(n):
+        field, step, lo, hi = rng.choices(STEPS, WEIGHTS)[0]
+        position = rng.choice(neighbor_inputs(position, [(field, step, lo, hi)]))
+        path.append(position)
+    return path
+
+
+def replay(path, speculator):
+    metrics_cache.clear()
+    latencies, hits = [], 0
+    owner = "bench"
+    with contextlib.redirect_stdout(io.StringIO()):
+        for position in path:
+            before = metrics_cache.hits
+            start = time.perf_counter()
+            shared_metrics(*position)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += metrics_cache.hits - before
+            if speculator is not None:
+                speculator.submit(owner, neighbor_inputs(position, STEPS)).done.wait()
+    return latencies, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--cpu-share", type=float, default=0.25)
+    args = parser.parse_args()
+
+    path = walk(args.steps)
+    speculator = Speculator(cpu_share=args.cpu_share)
+    for label, spec in (("no speculation", None), ("speculation", speculator)):
+        latencies, hits = replay(path, spec)
+        print(f"{label:<16} next-step hit rate {hits / len(path):>4.0%}   "
+              f"median {statistics.median(latencies):.3f} ms   p95 {sorted(latencies)[int(len(latencies) * .95)]:.3f} ms")
+
+    stats = speculator.stats()
+    print(f"background: {stats['computed']} scenarios, {stats['skipped']} already cached, "
+          f"{stats['cpu_seconds'] * 1000 / args.steps:.2f} ms CPU per step "
+          f"(cap {stats['cpu_share']:.0%} of a core, {speculator.throttle_seconds:.1f}s throttled)")
+
+
+if __name__ == "__main__":
+    main()
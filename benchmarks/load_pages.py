@@ -0,0 +1,320 @@
+"""Load test: N concurrent agent sessions on the Single and Dual pages.
+
+Every session is a headless AppTest of pages/1_Main_Single_Property.py or
+pages/2_Main_Dual_Property.py, driven from its own thread with think time
+between actions, as agents on one server would (a Streamlit server also
+runs each session's reruns on its own thread in one process). Actions:
+  slider     nudge a random slider a few steps
+  text       type an address / ZIP, or agent / brokerage / client names
+  email      enter an address and press "Send Email Report"
+  download   check the rendered download buttons carry a file (download
+             buttons don't rerun the page; the PDF they serve was built by
+             the preceding rerun, which is timed)
+Email goes through the app's queue to an in-process SMTP stub, so
+everything runs offline.
+
+Reported per concurrency level: rerun latency percentiles (overall, per
+page and per action), reruns over --target-ms, CPU per rerun and per
+session (the script thread's own CPU, from memory.tracker), the result
+cache share of each session, RSS growth per session, and emails
+delivered. With several --sessions levels, the highest one whose p95
+stays within --target-ms is named.
+
+    python benchmarks/load_pages.py
+    python benchmarks/load_pages.py --sessions 1 2 4 8 --actions 15 --think 0.5
+    python benchmarks/load_pages.py --sessions 4 --json load.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from streamlit.runtime import Runtime
+from streamlit.testing.v1 import AppTest
+
+import applog
+import memory
+from email_queue import get_email_queue
+from result_cache import session_budget
+from smtp_stub import SMTPStubServer
+
+PAGES = {
+    "single": "1_Main_Single_Property.py",
+    "dual": "2_Main_Dual_Property.py",
+}
+TEXT_INPUTS = {
+    "single": {
+        "Street Address (optional)": ["12 Elm St", "400 Pine Ave", "88 Harbor Rd"],
+        "ZIP Code (optional)": ["94566", "10001", "60614"],
+        "Agent Name": ["Dana Reyes", "Sam Patel"],
+        "Brokerage Name": ["Bay Realty", "Keystone Homes"],
+        "Client Name": ["J. Chen", "M. Okafor"],
+    },
+    "dual": {
+        "Address (Property A)": ["12 Elm St", "400 Pine Ave"],
+        "ZIP Code (Property A)": ["94566", "10001"],
+        "Address (Property B)": ["88 Harbor Rd", "7 Summit Way"],
+        "ZIP Code (Property B)": ["60614", "73301"],
+    },
+}
+EMAIL_LABEL = "Enter email address to send the report"
+ACTIONS = [("slider", 0.55), ("text", 0.25), ("download", 0.12), ("email", 0.08)]
+
+
+def share_apptest_runtime():
+    """Let AppTests run concurrently in one process.
+
+    Each AppTest run installs a mock Runtime as the process singleton and
+    clears it when it finishes, which pulls it out from under any other
+    run still in progress. Keep handing out the last one installed: they
+    are interchangeable, and one shared runtime is what a real server has.
+    """
+    last = []
+
+    def instance(cls):
+        runtime = cls._instance
+        if runtime is not None:
+            last[:] = [runtime]
+            return runtime
+        if last:
+            return last[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {"n": len(ordered), "p50": pct(50), "p90": pct(90), "p95": pct(95), "p99": pct(99), "max": ordered[-1]}
+
+
+class Session:
+    def __init__(self, n, page, rng, actions, think, timeout):
+        self.n = n
+        self.page = page
+        self.rng = rng
+        self.actions = actions
+        self.think = think
+        self.at = AppTest.from_file(os.path.join(ROOT, "pages", PAGES[page]), default_timeout=timeout)
+        self.at.session_state["authenticated"] = True
+        self.reruns = []       # (action, seconds)
+        self.downloads = 0
+        self.emails = 0
+        self.errors = []
+
+    @property
+    def session_id(self):
+        try:
+            return self.at.session_state["_session_id"]
+        except KeyError:
+            return None
+
+    def rerun(self, action):
+        start = time.perf_counter()
+        self.at.run()
+        self.reruns.append((action, time.perf_counter() - start))
+        if self.at.exception:
+            self.errors.append(f"{action}: {self.at.exception[0].value}")
+
+    def slider(self):
+        slider = self.rng.choice(list(self.at.slider))
+        step = slider.step or 1
+        value = slider.value + self.rng.choice((-3, -2, -1, 1, 2, 3)) * step
+        value = min(max(value, slider.min), slider.max)
+        slider.set_value(round(value, 4) if isinstance(step, float) else int(value))
+
+    def text(self):
+        label, choices = self.rng.choice(list(TEXT_INPUTS[self.page].items()))
+        box = next((t for t in self.at.text_input if t.label == label), None)
+        if box is not None:
+            box.input(self.rng.choice(choices))
+
+    def email(self):
+        box = next((t for t in self.at.text_input if t.label == EMAIL_LABEL), None)
+        button = next((b for b in self.at.button if b.label == "Send Email Report"), None)
+        if box is None or button is None:
+            return False
+        box.input(f"agent{self.n}@example.com")
+        button.click()
+        self.emails += 1
+        return True
+
+    def download(self):
+        files = [d for d in self.at.get("download_button") if d.proto.url]
+        self.downloads += len(files) > 0
+
+    def run(self, barrier):
+        barrier.wait()
+        try:
+            self.rerun("open")
+            for _ in range(self.actions):
+                time.sleep(self.rng.expovariate(1 / self.think) if self.think else 0)
+                action = self.rng.choices([a for a, _ in ACTIONS], [w for _, w in ACTIONS])[0]
+                if action == "download":
+                    self.download()
+                    continue
+                if action == "email" and not self.email():
+                    continue
+                if action != "email":
+                    getattr(self, action)()
+                self.rerun(action)
+        except Exception as e:   # a broken session must not hang the run
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+
+def run_level(n_sessions, args, seed):
+    rng = random.Random(seed)
+    pages = args.pages
+    memory.tracker = memory.RerunTracker(history=1_000_000)
+    session_budget.clear()
+    rss_before = memory.rss_mb()
+    cpu_before = os.times()
+    sent_before = len(args.stub.messages)
+
+    sessions = [Session(n, pages[n % len(pages)], random.Random(rng.random()), args.actions, args.think,
+                        args.timeout)
+                for n in range(n_sessions)]
+    barrier = threading.Barrier(n_sessions)
+    threads = [threading.Thread(target=s.run, args=(barrier,), name=f"load-session-{s.n}") for s in sessions]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    cpu = os.times()
+    delivered = get_email_queue().wait(timeout=30)
+
+    latencies = [sec * 1000 for s in sessions for _, sec in s.reruns]
+    by_page, by_action = {}, {}
+    for s in sessions:
+        for action, sec in s.reruns:
+            by_page.setdefault(s.page, []).append(sec * 1000)
+            by_action.setdefault(action, []).append(sec * 1000)
+
+    cpu_by_session = {}
+    for record in memory.tracker.recent(limit=1_000_000):
+        cpu_by_session.setdefault(record["session"], []).append(record["cpu_ms"])
+    cpu_per_rerun = [ms for values in cpu_by_session.values() for ms in values]
+    cache_by_session = {row["session"]: row["bytes"] for row in session_budget.usage()}
+    ids = [s.session_id for s in sessions]
+
+    return {
+        "sessions": n_sessions,
+        "wall_s": wall,
+        "reruns": len(latencies),
+        "reruns_per_s": len(latencies) / wall if wall else 0.0,
+        "over_target": sum(ms > args.target_ms for ms in latencies),
+        "latency_ms": percentiles(latencies),
+        "latency_ms_by_page": {page: percentiles(v) for page, v in by_page.items()},
+        "latency_ms_by_action": {action: percentiles(v) for action, v in by_action.items()},
+        "cpu_ms_per_rerun": percentiles(cpu_per_rerun),
+        "cpu_s_per_session": percentiles([sum(cpu_by_session.get(i, ())) / 1000 for i in ids]),
+        "process_cpu_utilization": ((cpu.user + cpu.system) - (cpu_before.user + cpu_before.system)) / wall,
+        "cache_kb_per_session": percentiles([cache_by_session.get(i, 0) / 1024 for i in ids]),
+        "rss_growth_mb_per_session": (memory.rss_mb() - rss_before) / n_sessions,
+        "downloads": sum(s.downloads for s in sessions),
+        "emails_submitted": sum(s.emails for s in sessions),
+        "emails_delivered": len(args.stub.messages) - sent_before,
+        "email_queue_drained": delivered,
+        "errors": [e for s in sessions for e in s.errors],
+    }
+
+
+def fmt(stats, keys=("p50", "p90", "p95", "p99", "max"), digits=0):
+    if not stats:
+        return "-"
+    return "  ".join(f"{k} {stats[k]:,.{digits}f}" for k in keys)
+
+
+def print_level(result, target_ms):
+    lat = result["latency_ms"]
+    print(f"\n=== {result['sessions']} concurrent session(s): {result['reruns']} reruns in "
+          f"{result['wall_s']:.1f}s ({result['reruns_per_s']:.2f}/s)")
+    print(f"  rerun latency ms      {fmt(lat)}")
+    for page, stats in result["latency_ms_by_page"].items():
+        print(f"    {page:<19} {fmt(stats)}")
+    for action, stats in sorted(result["latency_ms_by_action"].items()):
+        print(f"    {action:<19} {fmt(stats)}  (n={stats['n']})")
+    print(f"  over {target_ms:.0f} ms           {result['over_target']} of {result['reruns']}")
+    print(f"  CPU ms per rerun      {fmt(result['cpu_ms_per_rerun'], ('p50', 'p95', 'max'))}")
+    print(f"  CPU s per session     {fmt(result['cpu_s_per_session'], ('p50', 'max'), 2)}"
+          f"   process CPU {result['process_cpu_utilization']:.0%} of one core")
+    print(f"  cache KB per session  {fmt(result['cache_kb_per_session'], ('p50', 'max'))}"
+          f"   RSS growth {result['rss_growth_mb_per_session']:+.1f} MB per session")
+    print(f"  downloads {result['downloads']}   emails {result['emails_delivered']}/"
+          f"{result['emails_submitted']} delivered"
+          f"{'' if result['email_queue_drained'] else ' (queue not drained after 30s)'}")
+    for error in result["errors"][:5]:
+        print(f"  ❌ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4],
+                        help="concurrency levels to run, one after another")
+    parser.add_argument("--actions", type=int, default=10, help="actions per session after opening the page")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds between a session's actions")
+    parser.add_argument("--pages", nargs="+", choices=sorted(PAGES), default=["single", "dual"],
+                        help="sessions alternate between these pages")
+    parser.add_argument("--target-ms", type=float, default=1000.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="AppTest timeout per rerun (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write all results here")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    # "missing ScriptRunContext" whenever the driver thread touches session state
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    share_apptest_runtime()
+    applog.configure(level="ERROR")   # IRR fallback warnings on extreme slider values
+
+    args.stub = SMTPStubServer().start()
+    settings = args.stub.settings()
+    os.environ.update(EMAIL_HOST=settings["host"], EMAIL_PORT=str(settings["port"]), EMAIL_STARTTLS="0",
+                      EMAIL_USER=settings["user"], EMAIL_PASSWORD=settings["password"])
+
+    # One untimed session first, so imports and cold caches don't count
+    print("warming up ...", flush=True)
+    warm = Session(-1, args.pages[0], random.Random(0), 0, 0, args.timeout)
+    warm.run(threading.Barrier(1))
+
+    results = []
+    try:
+        for level, n in enumerate(args.sessions):
+            result = run_level(n, args, args.seed + level)
+            print_level(result, args.target_ms)
+            results.append(result)
+    finally:
+        get_email_queue().stop(wait=False)
+        args.stub.stop()
+
+    within = [r["sessions"] for r in results if r["latency_ms"] and r["latency_ms"]["p95"] <= args.target_ms]
+    print()
+    if within:
+        print(f"✅ up to {max(within)} concurrent session(s) keep p95 rerun latency within {args.target_ms:.0f} ms")
+    else:
+        print(f"❌ no tested level keeps p95 rerun latency within {args.target_ms:.0f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target_ms": args.target_ms, "actions": args.actions, "think_s": args.think,
+                       "pages": args.pages, "levels": results}, f, indent=2)
+    sys.exit(1 if any(r["errors"] for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Soak test for charts.py: memory must stay flat over thousands of renders.
+
+Renders every page chart with fresh data each iteration (so nothing comes
+from the cache), then checks that
+  - no matplotlib Figure objects survive,
+  - pyplot's global figure registry was never used,
+  - process RSS after warm-up does not grow by more than --max-growth-mb.
+Renders use a low DPI by default (--dpi) so thousands of iterations finish
+in minutes; the figure lifecycle doesn't depend on resolution. A second
+phase goes through the cached path with distinct data to show the chart
+cache stays within its byte limit.
+
+    python benchmarks/soak_charts.py
+    python benchmarks/soak_charts.py --iterations 5000 --format svg
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matplotlib.figure import Figure
+
+import charts
+from memory import rss_mb
+from result_cache import chart_cache
+
+WARMUP = 50
+
+
+def chart_args(i):
+    years = list(range(1, 11 + i % 20))
+    cf = [1000 + i + y * 250 for y in years]
+    rent = [24000 + i + y * 700 for y in years]
+    roi = [5 + (i % 7) + y * 2.5 for y in years]
+    return years, cf, rent, roi
+
+
+def render_all(i, fmt, cached, dpi=charts.PNG_DPI):
+    years, cf, rent, roi = chart_args(i)
+    values = [3600 + i, 16000, max(0, 9000 - i % 500)]
+    labels = ["Operating Expenses", "Mortgage", "Cash Flow"]
+    value_labels = [f"${v:,.0f}" for v in values]
+    jobs = [
+        (charts._draw_projection, None, dict(years=years, cash_flow=cf, rents=rent, roi=roi)),
+        (charts._draw_cost_breakdown, (6, 6), dict(values=values, value_labels=value_labels, labels=labels)),
+        (charts._draw_cap_rate_donut, (6, 6), dict(values=[12000 + i, 288000], net_cap_rate=4 + i % 10 / 10)),
+        (charts._draw_dual_projection, None, dict(years_a=years, years_b=years, cf_a=cf, cf_b=cf[::-1],
+                                                   rent_a=rent, rent_b=rent[::-1], roi_a=roi, roi_b=roi[::-1])),
+    ]
+    for draw, figsize, data in jobs:
+        if cached:
+            charts.cached_chart(draw.__name__, draw, figsize=figsize, fmt=fmt, **data)
+        else:
+            charts.render_chart(draw, figsize=figsize, fmt=fmt, dpi=dpi, **data)
+
+
+def live_figures():
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def soak(iterations, fmt, dpi, max_growth_mb):
+    for i in range(WARMUP):
+        render_all(i, fmt, cached=False, dpi=dpi)
+    gc.collect()
+    baseline = rss_mb()
+
+    start = time.perf_counter()
+    samples = []
+    for i in range(WARMUP, WARMUP + iterations):
+        render_all(i, fmt, cached=False, dpi=dpi)
+        if (i - WARMUP) % max(1, iterations // 10) == 0:
+            gc.collect()
+            samples.append(rss_mb() - baseline)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    growth_mb = rss_mb() - baseline
+
+    figures = live_figures()
+    print(f"{iterations * 4} {fmt} renders in {elapsed:.1f}s ({iterations * 4 / elapsed:.0f}/s)")
+    print("RSS growth over run (MB): " + ", ".join(f"{s:+.1f}" for s in samples) + f", end {growth_mb:+.1f}")
+    print(f"live Figure objects: {figures}, pyplot imported: {'matplotlib.pyplot' in sys.modules}")
+
+    return figures == 0 and growth_mb <= max_growth_mb and "matplotlib.pyplot" not in sys.modules
+
+
+def cache_bound(iterations, fmt):
+    chart_cache.clear()
+    limit = chart_cache.max_bytes
+    chart_cache.max_bytes = 2 * 1024 * 1024
+    try:
+        for i in range(iterations):
+            render_all(100000 + i, fmt, cached=True)
+        stats = chart_cache.stats()
+    finally:
+        chart_cache.max_bytes = limit
+        chart_cache.clear()
+    print(f"cached phase: {stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.2f} MB "
+          f"(limit 2 MB), {stats['evictions']} evictions")
+    return stats["bytes"] <= 2 * 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000, help="rounds of the 4 page charts")
+    parser.add_argument("--format", default="png", choices=["png", "svg"])
+    parser.add_argument("--dpi", type=int, default=30)
+    parser.add_argument("--max-growth-mb", type=float, default=10.0)
+    args = parser.parse_args()
+
+    ok = soak(args.iterations, args.format, args.dpi, args.max_growth_mb)
+    ok = cache_bound(max(50, args.iterations // 10), args.format) and ok
+    print("✅ memory flat" if ok else "❌ memory grew or figures leaked")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Soak test: a day of agent sessions, memory must stay bounded.
+
+Each simulated session opens the Single or Dual page (AppTest, in this
+process), then reruns it --reruns times with a random mortgage rate and
+horizon, as an agent exploring listings does; every rerun recomputes
+metrics, verdicts, charts and PDFs for positions it hasn't seen. Sessions
+end (their AppTest is dropped) and new ones start. At the end it checks
+  - every result cache is within its byte limit,
+  - no session holds more than its budget (--session-mb),
+  - over the second half of the day, RSS grew by at most --max-growth-mb
+    more than the result caches did (they may still be filling up to
+    their limits; anything beyond that is memory nobody bounds),
+  - no matplotlib Figure objects are alive.
+
+    python benchmarks/soak_sessions.py
+    python benchmarks/soak_sessions.py --sessions 60 --reruns 20 --trace
+"""
+import argparse
+import contextlib
+import gc
+import io
+import logging
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from matplotlib.figure import Figure
+from streamlit.testing.v1 import AppTest
+
+import applog
+import memory
+from result_cache import CACHES, session_budget
+
+PAGES = [
+    ("1_Main_Single_Property.py", "Mortgage Rate (%)", "🏁 Investment Time Horizon (Years)"),
+    ("2_Main_Dual_Property.py", "📈 Mortgage Rate (%)", "🏁 Investment Time Horizon A (Years)"),
+]
+
+
+def rerun(at):
+    with contextlib.redirect_stdout(io.StringIO()):
+        at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+def set_slider(at, label, value):
+    slider = next((s for s in at.slider if s.label == label), None)
+    if slider is not None:
+        slider.set_value(value)
+
+
+def session(rng, reruns):
+    page, rate_label, horizon_label = rng.choice(PAGES)
+    at = AppTest.from_file(os.path.join(ROOT, "pages", page), default_timeout=300)
+    at.session_state["authenticated"] = True
+    rerun(at)
+    for _ in range(reruns):
+        set_slider(at, rate_label, round(rng.uniform(3.0, 12.0), 1))
+        if rng.random() < 0.3:
+            set_slider(at, horizon_label, rng.randint(5, 30))
+        rerun(at)
+
+
+def live_figures():
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=24)
+    parser.add_argument("--reruns", type=int, default=12, help="reruns per session")
+    parser.add_argument("--session-mb", type=float, default=2.0, help="per-session cache budget")
+    parser.add_argument("--max-growth-mb", type=float, default=25.0)
+    parser.add_argument("--trace", action="store_true", help="tracemalloc: print the top growing lines")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    applog.configure(level="ERROR")   # IRR fallback warnings on extreme inputs
+    session_budget.max_bytes = int(args.session_mb * 1024 * 1024)
+    if args.trace:
+        memory.start_tracing()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    rss, cached = [], []
+    halfway = args.sessions // 2
+    for n in range(args.sessions):
+        session(rng, args.reruns)
+        gc.collect()
+        rss.append(memory.rss_mb())
+        cached.append(sum(cache.stats()["bytes"] for cache in CACHES) / 1024 / 1024)
+        if n == halfway and args.trace:
+            memory.tracker.reset_snapshots()
+            memory.tracker.snapshot()
+        print(f"session {n + 1:>3}/{args.sessions}: RSS {rss[-1]:.0f} MB", end="\r")
+    elapsed = time.perf_counter() - start
+    reruns = args.sessions * (args.reruns + 1)
+    print(f"{args.sessions} sessions, {reruns} reruns in {elapsed:.0f}s "
+          f"({elapsed / reruns * 1000:.0f} ms per rerun)")
+    print("RSS after each session (MB): " + ", ".join(f"{mb:.0f}" for mb in rss))
+
+    ok = True
+    for cache in CACHES:
+        stats = cache.stats()
+        within = stats["bytes"] <= stats["max_bytes"]
+        ok &= within
+        print(f"{'✅' if within else '❌'} cache {stats['cache']:<9} {stats['bytes'] / 1024 / 1024:>7.2f} MB "
+              f"of {stats['max_bytes'] / 1024 / 1024:.0f} MB, {stats['evictions']} evictions")
+
+    largest = max((row["bytes"] for row in session_budget.usage()), default=0)
+    within = largest <= session_budget.max_bytes
+    ok &= within
+    print(f"{'✅' if within else '❌'} largest session share {largest / 1024 / 1024:.2f} MB "
+          f"(budget {args.session_mb:.0f} MB, {session_budget.evictions} budget evictions)")
+
+    growth = rss[-1] - rss[halfway]
+    cache_growth = cached[-1] - cached[halfway]
+    within = growth - cache_growth <= args.max_growth_mb
+    ok &= within
+    print(f"{'✅' if within else '❌'} RSS growth over the second half {growth:+.1f} MB, "
+          f"{cache_growth:+.1f} MB of it cached results (limit {args.max_growth_mb:.0f} MB beyond caches)")
+
+    figures = live_figures()
+    ok &= figures == 0
+    print(f"{'✅' if figures == 0 else '❌'} live Figure objects: {figures}")
+
+    if args.trace:
+        memory.tracker.snapshot()
+        print("\nTop traced growth over the second half:")
+        for row in memory.tracker.top_growth(10):
+            print(f"  {row['growth_kb']:>+9.0f} KB  {row['location']}")
+
+    print("✅ memory bounded" if ok else "❌ memory grew past its bounds")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Shared runner for the benchmark suites (bench_calc.py, bench_pdf.py).
+
+A suite is a list of Case objects. Each case runs at one or more sizes;
+every (case, size) result carries metrics where lower is better (time per
+item or per run, peak memory, output bytes, ...). Results are written as
+JSON together with machine info and compared metric by metric against a
+stored baseline:
+
+    python benchmarks/bench_calc.py                      run + compare
+    python benchmarks/bench_calc.py --threshold 0.10     fail above +10%
+    python benchmarks/bench_calc.py --update-baseline    store this run
+
+Each case is measured in several interleaved rounds (--rounds) and the
+best kept, which steadies numbers on shared machines. Exit status is 1
+when any metric regressed past the threshold. Baselines are
+machine-specific; a mismatch is reported so numbers from a laptop aren't
+read against a server's.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+ROOT = os.path.dirname(HERE)
+BASELINE_DIR = os.path.join(HERE, "baselines")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class Case:
+    """One benchmark: setup(size) builds inputs, run(inputs) is timed.
+
+    run() may return a dict of extra metrics (e.g. {"bytes": ...}); they
+    are recorded and compared like the timing. If describe is given it
+    turns run()'s return value into that dict, outside the timed region.
+    With unit=None the size is a parameter rather than an item count and
+    the metric is total ms per run. trace_memory adds one more run under
+    tracemalloc for its peak (KB).
+    """
+
+    def __init__(self, name, run, sizes=(1,), setup=None, unit="item", min_time=0.2, max_repeat=200,
+                 trace_memory=False, describe=None):
+        self.name = name
+        self.run = run
+        self.sizes = sizes
+        self.setup = setup or (lambda size: size)
+        self.unit = unit
+        self.min_time = min_time
+        self.max_repeat = max_repeat
+        self.trace_memory = trace_memory
+        self.describe = describe
+
+    def measure(self, size):
+        """Best-of-N wall time (N >= 1, until min_time is spent)."""
+        inputs = self.setup(size)
+        best, extra, spent, repeats = None, {}, 0.0, 0
+        while repeats < self.max_repeat and (repeats == 0 or spent < self.min_time):
+            start = time.perf_counter()
+            out = self.run(inputs)
+            elapsed = time.perf_counter() - start
+            extra = self.describe(out) if self.describe else out or {}
+            spent += elapsed
+            repeats += 1
+            best = elapsed if best is None else min(best, elapsed)
+        if self.unit:
+            metrics = {f"us_per_{self.unit}": best / size * 1e6}
+        else:
+            metrics = {"ms": best * 1000}
+        metrics.update(extra)
+        if self.trace_memory:
+            metrics["peak_kb"] = peak_kb(self.run, inputs)
+        return {"case": self.name, "size": size, "seconds": best, "repeats": repeats, "metrics": metrics}
+
+
+def peak_kb(fn, *args):
+    """Peak traced Python memory while fn(*args) runs."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        fn(*args)
+        return (tracemalloc.get_traced_memory()[1] - base) / 1024
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+def machine_info():
+    import numpy
+
+    info = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+    }
+    try:
+        import reportlab
+        info["reportlab"] = reportlab.Version
+    except ImportError:
+        pass
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    info["cpu"] = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return info
+
+
+def result_key(result):
+    return f"{result['case']}[{result['size']}]"
+
+
+def run_suite(suite, cases, max_size=None, only=None, rounds=3):
+    """Measure every (case, size) `rounds` times, interleaved, keeping the
+    fastest: a slow stretch on a shared machine then hits one round of a
+    case rather than all of its repeats."""
+    todo = [(case, size) for case in cases
+            if not only or any(pattern in case.name for pattern in only)
+            for size in case.sizes
+            if max_size is None or size <= max_size]
+    results = {}
+    for n in range(rounds):
+        for case, size in todo:
+            result = case.measure(size)
+            key = result_key(result)
+            previous = results.get(key)
+            if previous is not None:
+                result["repeats"] += previous["repeats"]
+                if previous["seconds"] <= result["seconds"]:
+                    result = dict(previous, repeats=result["repeats"])
+            results[key] = result
+            if n == rounds - 1:
+                metrics = "  ".join(f"{name} {value:,.2f}" for name, value in result["metrics"].items())
+                print(f"  {key:<44} {result['seconds'] * 1000:>10.2f} ms  {metrics}", flush=True)
+    return {
+        "suite": suite,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "rounds": rounds,
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print metric changes vs baseline; returns the regressed keys."""
+    if baseline["machine"] != current["machine"]:
+        changed = sorted(k for k in set(baseline["machine"]) | set(current["machine"])
+                         if baseline["machine"].get(k) != current["machine"].get(k))
+        print(f"⚠️ baseline was recorded on a different machine / stack ({', '.join(changed)})")
+
+    regressions = []
+    print(f"\n{'result':<44} {'metric':<16} {'baseline':>12} {'now':>12} {'change':>8}")
+    for key, result in current["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            print(f"{key:<44} (new, no baseline)")
+            continue
+        for name, value in result["metrics"].items():
+            before = old["metrics"].get(name)
+            if not before:
+                continue
+            change = value / before - 1
+            regressed = change > threshold
+            if regressed:
+                regressions.append(f"{key} {name}")
+            print(f"{key:<44} {name:<16} {before:>12,.2f} {value:>12,.2f} {change:>+7.0%}"
+                  f"{'  ❌' if regressed else ''}")
+    return regressions
+
+
+def main(suite, cases, description, max_size=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--baseline", default=os.path.join(BASELINE_DIR, f"{suite}.json"))
+    parser.add_argument("--out", help="also write this run's results here")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown / growth per metric before failing (0.25 = +25%%)")
+    parser.add_argument("--max-size", type=int, default=max_size,
+                        help=f"skip sizes above this (default: {max_size or 'none'}; 0 = run every size)")
+    parser.add_argument("--rounds", type=int, default=3, help="interleaved passes over all cases; best is kept")
+    parser.add_argument("--only", nargs="*", help="run cases whose name contains any of these")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    print(f"{suite} benchmarks")
+    current = run_suite(suite, cases, args.max_size or None, args.only, args.rounds)
+
+    if args.out:
+        write(current, args.out)
+    if args.update_baseline:
+        write(current, args.baseline)
+        print(f"\n📌 baseline written: {os.path.relpath(args.baseline)}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {os.path.relpath(args.baseline)}; run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(current, json.load(f), args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} metric(s) regressed more than {args.threshold:.0%}:")
+        for name in regressions:
+            print(f"   {name}")
+        return 1
+    print(f"\n✅ no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def write(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
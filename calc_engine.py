@@ -1,20 +1,81 @@
-from scipy.optimize import newton
 import numpy as np
 import numpy_financial as npf
 
+from applog import DEBUG, fields, get_logger
+import grading
+from instrumentation import count, instrumented
+
+log = get_logger(__name__)
+# Zero-rent / high-vacancy sweeps can fail the IRR fallback for thousands of
+# scenarios: each failure is counted, only the first one is a warning.
+_irr_failure_warned = False
+
+# Inputs of calculate_metrics(), in argument order
+INPUT_FIELDS = [
+    "purchase_price", "monthly_rent", "down_payment_pct", "mortgage_rate", "mortgage_term",
+    "monthly_expenses", "vacancy_rate", "appreciation_rate", "rent_growth_rate", "time_horizon",
+]
+
+
 def robust_irr(cash_flows, guess=0.1):
+    # scipy is slow to import and only needed when npf.irr finds no root
+    from scipy.optimize import newton
+
     def npv(rate):
         return sum(cf / (1 + rate) ** i for i, cf in enumerate(cash_flows))
     try:
         irr_solution = newton(npv, guess)
         return round(irr_solution * 100, 2)
     except Exception as e:
-        print(f"IRR calculation failed: {e}")
+        global _irr_failure_warned
+        count("irr_fallback_failed")
+        if _irr_failure_warned:
+            log.debug("IRR calculation failed: %s", e)
+        else:
+            _irr_failure_warned = True
+            log.warning("IRR calculation failed: %s (further failures: irr_fallback_failed counter)", e)
         return 0
 
 
+def safe_irr(cashflows):
+    """Try npf.irr first; fallback to Newton if it fails."""
+    try:
+        val = npf.irr(cashflows)
+        if val is None or np.isnan(val):
+            raise ValueError("npf.irr failed")
+        return round(val * 100.0, 2)
+    except Exception:
+        return robust_irr(cashflows)
+
+
+def mortgage_payment(loan_amount, monthly_rate, n_payments):
+    """Monthly payment in positive dollars."""
+    if n_payments <= 0:
+        return 0.0
+    if monthly_rate > 0:
+        # numpy_financial.pmt returns a negative number (cash outflow); take abs for display/math
+        return abs(npf.pmt(monthly_rate, n_payments, loan_amount))
+    return loan_amount / n_payments
+
+
+def remaining_balance(loan_amount, monthly_rate, n_payments, payment, months_elapsed):
+    """Loan balance left after `months_elapsed` payments."""
+    if n_payments <= 0:
+        balance = 0.0
+    elif monthly_rate > 0:
+        # Standard amortization formula for remaining balance
+        factor = (1 + monthly_rate) ** months_elapsed
+        balance = loan_amount * factor - payment * (factor - 1) / monthly_rate
+    else:
+        # Zero-interest loan: just reduce principal linearly
+        balance = max(loan_amount - payment * months_elapsed, 0.0)
+    return max(balance, 0.0)
+
+
+@instrumented("calculate_metrics")
 def calculate_metrics(purchase_price, monthly_rent, down_payment_pct, mortgage_rate, mortgage_term,
-                      monthly_expenses, vacancy_rate, appreciation_rate, rent_growth_rate, time_horizon):
+                      monthly_expenses, vacancy_rate, appreciation_rate, rent_growth_rate, time_horizon,
+                      irr=safe_irr, grader=grading.grade_of):
 
     # ---- Loan basics
     down_payment_amount = purchase_price * (down_payment_pct / 100.0)
@@ -23,13 +84,7 @@ def calculate_metrics(purchase_price, monthly_rent, down_payment_pct, mortgage_r
     n_payments = int(mortgage_term * 12)
 
     # ---- Monthly mortgage payment (always positive dollars)
-    if n_payments <= 0:
-        monthly_mortgage_payment = 0.0
-    elif monthly_rate > 0:
-        # numpy_financial.pmt returns a negative number (cash outflow); take abs for display/math
-        monthly_mortgage_payment = abs(npf.pmt(monthly_rate, n_payments, loan_amount))
-    else:
-        monthly_mortgage_payment = loan_amount / n_payments
+    monthly_mortgage_payment = mortgage_payment(loan_amount, monthly_rate, n_payments)
 
     # ---- Year-1 flows (for cap rate / CoC / first-year cash flow)
     effective_monthly_rent = monthly_rent * (1 - vacancy_rate / 100.0)
@@ -71,28 +126,21 @@ def calculate_metrics(purchase_price, monthly_rent, down_payment_pct, mortgage_r
 
         current_monthly_rent *= (1 + rent_growth_rate / 100.0)
 
-    print(f"[DEBUG] appreciation_rate={appreciation_rate}, time_horizon={time_horizon}, cash_flows={cash_flows[:3]} ...")
+    if log.isEnabledFor(DEBUG):
+        log.debug("projected cash flows", extra=fields(
+            appreciation_rate=appreciation_rate, time_horizon=time_horizon,
+            first_cash_flows=[float(cf) for cf in cash_flows[:3]]))
 
     # ---- IRR & Equity Multiple (dual-solver, operational + total) ----
-    def safe_irr(cashflows):
-        """Try npf.irr first; fallback to Newton if it fails."""
-        try:
-            val = npf.irr(cashflows)
-            if val is None or np.isnan(val):
-                raise ValueError("npf.irr failed")
-            return round(val * 100.0, 2)
-        except Exception:
-            return robust_irr(cashflows)
-
     # --- Operational IRR (based on annual cash flows only) ---
-    irr_operational = safe_irr([-down_payment_amount] + cash_flows)
+    irr_operational = irr([-down_payment_amount] + cash_flows)
 
     # --- Total IRR (adds terminal sale / appreciation value) ---
     sale_value = purchase_price * ((1 + appreciation_rate / 100.0) ** time_horizon)
     cash_flows_total = cash_flows.copy()
     if cash_flows_total:
         cash_flows_total[-1] += sale_value
-    irr_total = safe_irr([-down_payment_amount] + cash_flows_total)
+    irr_total = irr([-down_payment_amount] + cash_flows_total)
 
     # --- Equity Multiple (total case) ---
     total_cash_received = sum(cash_flows_total)
@@ -120,45 +168,26 @@ def calculate_metrics(purchase_price, monthly_rent, down_payment_pct, mortgage_r
     months_elapsed = int(years_elapsed * 12)
 
     # Remaining balance after `months_elapsed` payments
-    if n_payments <= 0:
-        remaining_balance = 0.0
-    elif monthly_rate > 0:
-        # Standard amortization formula for remaining balance
-        factor = (1 + monthly_rate) ** months_elapsed
-        remaining_balance = (
-            loan_amount * factor
-            - monthly_mortgage_payment * (factor - 1) / monthly_rate
-        )
-    else:
-        # Zero-interest loan: just reduce principal linearly
-        remaining_balance = max(loan_amount - monthly_mortgage_payment * months_elapsed, 0.0)
-
-    remaining_balance = max(remaining_balance, 0.0)
+    balance = remaining_balance(loan_amount, monthly_rate, n_payments, monthly_mortgage_payment, months_elapsed)
 
     # Current property value after the same elapsed years
     current_property_value = purchase_price * ((1 + appreciation_rate / 100.0) ** years_elapsed)
 
-    # ---- Grade (unchanged)
-    if coc_return >= 15:
-        grade = "A"
-    elif coc_return >= 12:
-        grade = "B"
-    elif coc_return >= 9:
-        grade = "C"
-    elif coc_return >= 6:
-        grade = "D"
-    else:
-        grade = "F"
+    # ---- Grade (same table the verdicts and batch screening use)
+    final_roi = round(roi_list[-1], 2) if roi_list else 0
+    rounded_cash_flows = [round(x, 2) for x in cash_flows]
+    # grader=None leaves "Grade" to the caller (calculate_metrics_batch grades all at once)
+    grade = grader(final_roi, sum(rounded_cash_flows), round(coc_return, 2)) if grader else None
 
     return {
         "Cap Rate (%)": round(cap_rate, 2),
         "Cash-on-Cash Return (%)": round(coc_return, 2),
-        "Final Year ROI (%)": round(roi_list[-1], 2) if roi_list else 0,
+        "Final Year ROI (%)": final_roi,
         "First Year Cash Flow ($)": round(cash_flows[0], 2) if cash_flows else 0,
         "Monthly Mortgage ($)": round(monthly_mortgage_payment, 2),
         "Grade": grade,
         "10yr Cash Flow": cash_flows,  # kept for back-compat
-        "Multi-Year Cash Flow": [round(x, 2) for x in cash_flows],
+        "Multi-Year Cash Flow": rounded_cash_flows,
         "Annual ROI % (by year)": roi_list,
         "Annual Rents $ (by year)": rents,
         "irr (%)": irr_total,  # backward compatibility
@@ -170,5 +199,206 @@ def calculate_metrics(purchase_price, monthly_rent, down_payment_pct, mortgage_r
         "Vacancy Loss by year": vacancy_loss_list,
         # 🔹 NEW keys for Equity Ownership Breakdown:
         "Current Property Value ($)": round(current_property_value, 2),
-        "Remaining Loan Balance ($)": round(remaining_balance, 2),
+        "Remaining Loan Balance ($)": round(balance, 2),
     }
+
+
+# ==========================================================
+#  BATCHED ENGINE (MANY SCENARIOS AT ONCE)
+# ==========================================================
+#
+# calculate_metrics() over numpy arrays: scenarios sharing a time horizon
+# form one group, and every step of the projection (mortgage, yearly rent,
+# NOI, cash flow, ROI, equity, remaining balance) is one array operation
+# across the group instead of one Python loop per scenario. Every IRR of
+# the group comes from one stacked eigenvalue solve (npf.irr is an
+# eigenvalue problem per call); any IRR the batch can't decide is solved
+# the scalar way. Sums run left to right (cumsum), powers use Python's pow
+# and each value is rounded the way the scalar path rounds it, so results
+# are identical to calling calculate_metrics() one scenario at a time.
+# Grades are stamped by one grading.grade() call over the whole batch.
+
+
+def batched_irr(flows):
+    """npf.irr() for each row of a 2-D array (None where undecided)."""
+    flows = np.asarray(flows, dtype=float)
+    n, m = flows.shape
+    rates = [None] * n
+    if m < 2:
+        return rates
+
+    # Same companion matrix np.roots() builds, highest power first
+    coeffs = flows[:, ::-1]
+    usable = np.flatnonzero((coeffs[:, 0] != 0) & (coeffs[:, -1] != 0) & np.isfinite(coeffs).all(axis=1))
+    if usable.size == 0:
+        return rates
+    size = m - 1
+    companion = np.zeros((usable.size, size, size))
+    companion[:, np.arange(1, size), np.arange(size - 1)] = 1.0
+    companion[:, 0, :] = -coeffs[usable, 1:] / coeffs[usable, :1]
+
+    for row, roots in zip(usable, np.linalg.eigvals(companion)):
+        mask = (roots.imag == 0) & (roots.real > 0)
+        if mask.any():
+            rate = 1 / roots[mask].real - 1
+            rates[row] = rate.item(np.argmin(np.abs(rate)))
+    return rates
+
+
+def _rounded(values, numpy_rows=None):
+    """round(x, 2) of every element, the way calculate_metrics() rounds it.
+
+    Values derived from an npf.pmt() payment are np.float64 there, which
+    round() rounds the numpy way (scale, rint, unscale); the rest are
+    Python floats, rounded exactly. `numpy_rows` marks the first kind.
+    """
+    values = np.asarray(values, dtype=float)
+    exact = np.ones(len(values), dtype=bool) if numpy_rows is None else ~numpy_rows
+    out = np.round(values, 2)
+    for i in np.flatnonzero(exact):
+        out[i] = [round(x, 2) for x in values[i].tolist()] if values.ndim > 1 else round(values[i].item(), 2)
+    return out
+
+
+def _power(base, exponent):
+    """base ** exponent per scenario (Python's pow; numpy's may differ in the last bit)."""
+    exponent = np.broadcast_to(exponent, np.shape(base))
+    return np.array([b ** e for b, e in zip(base.tolist(), exponent.tolist())], dtype=float)
+
+
+def _irr_column(flows):
+    """safe_irr() of every row of `flows`, one batched solve."""
+    # round() of npf.irr's np.float64, as safe_irr() does it
+    return [safe_irr(row) if rate is None else float(np.round(rate * 100.0, 2))
+            for row, rate in zip(flows.tolist(), batched_irr(flows))]
+
+
+def _metrics_group(rows, time_horizon):
+    """calculate_metrics(*row, grader=None) for rows sharing one time horizon."""
+    (purchase_price, monthly_rent, down_payment_pct, mortgage_rate, mortgage_term,
+     monthly_expenses, vacancy_rate, appreciation_rate, rent_growth_rate) = np.array(
+        [r[:9] for r in rows], dtype=float).T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # ---- Loan basics
+        down_payment_amount = purchase_price * (down_payment_pct / 100.0)
+        loan_amount = purchase_price - down_payment_amount
+        monthly_rate = (mortgage_rate / 100.0) / 12.0
+        n_payments = (mortgage_term * 12).astype(int)
+
+        payment = np.where(monthly_rate > 0, np.abs(npf.pmt(monthly_rate, n_payments, loan_amount)),
+                           loan_amount / n_payments)
+        payment = np.where(n_payments <= 0, 0.0, payment)
+        # Scenarios whose payment (and everything derived from it) is np.float64
+        from_pmt = (monthly_rate > 0) & (n_payments > 0)
+
+        # ---- Year-1 flows
+        annual_rent = monthly_rent * (1 - vacancy_rate / 100.0) * 12.0
+        annual_expenses = monthly_expenses * 12.0
+        annual_mortgage = payment * 12.0
+        annual_cash_flow = annual_rent - annual_expenses - annual_mortgage
+
+        cap_rate = np.where(purchase_price != 0, ((annual_rent - annual_expenses) / purchase_price) * 100.0, 0.0)
+        has_down = down_payment_amount != 0
+        coc_return = np.where(has_down, (annual_cash_flow / down_payment_amount) * 100.0, 0.0)
+
+        # ---- Multi-year projections, (scenarios, years)
+        shape = (len(rows), time_horizon)
+        year_rent, gross_rent = np.empty(shape), np.empty(shape)
+        current_monthly_rent = monthly_rent
+        for year in range(time_horizon):
+            year_rent[:, year] = current_monthly_rent * (1 - vacancy_rate / 100.0) * 12.0
+            gross_rent[:, year] = current_monthly_rent * 12.0
+            current_monthly_rent = current_monthly_rent * (1 + rent_growth_rate / 100.0)
+        noi = year_rent - annual_expenses[:, None]
+        vacancy_loss = gross_rent - year_rent
+        cash_flows = _rounded(year_rent - annual_expenses[:, None] - annual_mortgage[:, None], from_pmt)
+        cumulative_cash_flow = np.cumsum(cash_flows, axis=1)
+
+        # ---- IRR & Equity Multiple
+        growth = 1 + appreciation_rate / 100.0
+        appreciation = _power(growth, time_horizon)
+        sale_value = purchase_price * appreciation
+        flows = np.column_stack([-down_payment_amount, cash_flows])
+        irr_operational = _irr_column(flows)
+        flows[:, -1] += sale_value
+        irr_total = _irr_column(flows)
+        total_cash_received = np.cumsum(flows[:, 1:], axis=1)[:, -1]
+        equity_multiple = np.where(has_down, total_cash_received / down_payment_amount, 0.0)
+
+        # ---- ROI by year
+        appreciation_value_total = purchase_price * (appreciation - 1)
+        linearized_app = appreciation_value_total[:, None] * (np.arange(1, time_horizon + 1) / time_horizon)
+        roi = np.where(has_down[:, None],
+                       ((cumulative_cash_flow + linearized_app) / down_payment_amount[:, None]) * 100.0, 0.0)
+
+        # ---- Current Property Value & Remaining Loan Balance
+        years_elapsed = np.minimum(time_horizon, mortgage_term)
+        months_elapsed = (years_elapsed * 12).astype(int)
+        factor = _power(1 + monthly_rate, months_elapsed)
+        balance = np.where(monthly_rate > 0, loan_amount * factor - payment * (factor - 1) / monthly_rate,
+                           np.maximum(loan_amount - payment * months_elapsed, 0.0))
+        balance = np.maximum(np.where(n_payments <= 0, 0.0, balance), 0.0)
+        current_property_value = purchase_price * _power(growth, years_elapsed)
+
+    if log.isEnabledFor(DEBUG):
+        log.debug("projected cash flows", extra=fields(
+            scenarios=len(rows), time_horizon=time_horizon,
+            first_cash_flows=[float(cf) for cf in cash_flows[0, :3]]))
+
+    # ---- Assemble the same dicts calculate_metrics() returns
+    cash_flow_lists = cash_flows.tolist()
+    multi_year_lists = _rounded(cash_flows, from_pmt).tolist()
+    roi = _rounded(roi, from_pmt)
+    columns = zip(
+        _rounded(cap_rate).tolist(), _rounded(coc_return, from_pmt).tolist(),
+        _rounded(roi[:, -1], from_pmt).tolist(), _rounded(cash_flows[:, 0], from_pmt).tolist(),
+        _rounded(payment, from_pmt).tolist(), cash_flow_lists, multi_year_lists, roi.tolist(),
+        _rounded(gross_rent).tolist(), irr_operational, irr_total, _rounded(equity_multiple, from_pmt).tolist(),
+        _rounded(noi).tolist(), _rounded(vacancy_loss).tolist(),
+        _rounded(current_property_value).tolist(), _rounded(balance, from_pmt).tolist(),
+    )
+    return [{
+        "Cap Rate (%)": cap,
+        "Cash-on-Cash Return (%)": coc,
+        "Final Year ROI (%)": final_roi,
+        "First Year Cash Flow ($)": first_cash_flow,
+        "Monthly Mortgage ($)": mortgage,
+        "Grade": None,
+        "10yr Cash Flow": cash_flow_list,
+        "Multi-Year Cash Flow": multi_year,
+        "Annual ROI % (by year)": roi_list,
+        "Annual Rents $ (by year)": rents,
+        "irr (%)": irr_tot,
+        "IRR (Operational) (%)": irr_op,
+        "IRR (Total incl. Sale) (%)": irr_tot,
+        "equity_multiple": multiple,
+        "NOI by year": noi_list,
+        "Vacancy Loss by year": vacancy_loss_list,
+        "Current Property Value ($)": value,
+        "Remaining Loan Balance ($)": loan_left,
+    } for (cap, coc, final_roi, first_cash_flow, mortgage, cash_flow_list, multi_year, roi_list, rents,
+           irr_op, irr_tot, multiple, noi_list, vacancy_loss_list, value, loan_left) in columns]
+
+
+@instrumented("calculate_metrics_batch")
+def calculate_metrics_batch(scenarios):
+    """[calculate_metrics(*s) for s in scenarios], computed as arrays per time horizon."""
+    scenarios = [tuple(s) for s in scenarios]
+    groups = {}
+    for i, s in enumerate(scenarios):
+        groups.setdefault(s[9], []).append(i)
+
+    results = [None] * len(scenarios)
+    for time_horizon, idx in groups.items():
+        if isinstance(time_horizon, (int, np.integer)) and time_horizon >= 1:
+            group = _metrics_group([scenarios[i] for i in idx], time_horizon)
+        else:
+            group = [calculate_metrics(*scenarios[i], grader=None) for i in idx]
+        for i, metrics in zip(idx, group):
+            results[i] = metrics
+
+    # One vectorized grading pass over the whole batch
+    for metrics, grade in zip(results, grading.grade(*grading.metric_columns(results)).tolist()):
+        metrics["Grade"] = grade
+    return results
@@ -0,0 +1,272 @@
+import os
+from io import BytesIO
+
+import numpy as np
+
+from instrumentation import instrumented
+from result_cache import chart_cache, make_key
+
+# ==========================================================
+#  CHART IMAGES FOR THE STREAMLIT PAGES
+# ==========================================================
+#
+# Figures are built with matplotlib's object-oriented API (Figure, not
+# pyplot), so nothing is registered in pyplot's global figure list and no
+# GUI backend is involved: PNG goes through Agg, SVG through the SVG
+# backend. Every figure is cleared as soon as its image has been written,
+# even if drawing fails, so long-running servers don't accumulate figures.
+#
+# Rendered images are cached in result_cache.chart_cache, keyed by a hash
+# of the plotted data + format, so identical charts are drawn once.
+#
+# matplotlib is imported on the first image render, so pages using only
+# Vega-Lite charts never load it.
+#
+# Soak test: python benchmarks/soak_charts.py
+#
+# The projection charts can also be drawn client-side (CHART_MODE=interactive
+# or the sidebar toggle): see the Vega-Lite section at the bottom.
+
+# Same output st.pyplot() produced by default
+PNG_DPI = 200
+DEFAULT_FORMAT = "png"
+
+
+def figure_bytes(fig, fmt=DEFAULT_FORMAT, dpi=PNG_DPI):
+    buf = BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+
+@instrumented("chart_render")
+def render_chart(draw, figsize=None, fmt=DEFAULT_FORMAT, dpi=PNG_DPI, **data):
+    """Draw onto a fresh Figure and return its image bytes (uncached)."""
+    from matplotlib.figure import Figure   # lazy: not needed for Vega-Lite charts
+
+    fig = Figure(figsize=figsize)
+    try:
+        draw(fig, **data)
+        return figure_bytes(fig, fmt, dpi)
+    finally:
+        fig.clear()
+
+
+def cached_chart(kind, draw, figsize=None, fmt=DEFAULT_FORMAT, **data):
+    """render_chart() through the shared chart cache."""
+    key = make_key("chart", kind, fmt, figsize, data)
+    return chart_cache.get_or_compute(key, lambda: render_chart(draw, figsize, fmt, **data))
+
+
+# ==========================================================
+#  SINGLE PROPERTY PAGE
+# ==========================================================
+
+def _draw_projection(fig, years, cash_flow, rents, roi):
+    ax = fig.subplots()
+    ax.plot(years, cash_flow, marker='o', label="Multi-Year Cash Flow ($)")
+    ax.plot(years, rents, marker='s', linestyle='--', label="Projected Rent ($)")
+
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Projected Cash Flow / Rent ($)")
+    ax.grid(True)
+
+    ax2 = ax.twinx()
+    ax2.plot(years, roi, color='green', marker='^', label="ROI (%)")
+    ax2.set_ylabel("ROI (%)", color='green')
+
+    lines, labels = ax.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax.legend(lines + lines2, labels + labels2, loc="upper left")
+
+    ax.set_title("Multi - Year Projected Cash Flow & ROI")
+
+
+def projection_chart(years, cash_flow, rents, roi, fmt=DEFAULT_FORMAT):
+    """Cash flow + rent (left axis) and ROI (right axis) by year."""
+    return cached_chart("single_projection", _draw_projection, fmt=fmt,
+                        years=list(years), cash_flow=list(cash_flow), rents=list(rents), roi=list(roi))
+
+
+def _draw_cost_breakdown(fig, values, value_labels, labels):
+    ax = fig.subplots()
+    wedges, texts, autotexts = ax.pie(
+        values,
+        labels=None,
+        autopct="%1.1f%%",
+        pctdistance=0.75,
+        startangle=90
+    )
+
+    for i, w in enumerate(wedges):
+        ang = (w.theta2 + w.theta1) / 2
+        x = 1.25 * np.cos(np.deg2rad(ang))
+        y = 1.25 * np.sin(np.deg2rad(ang))
+        ax.text(
+            x, y,
+            f"{value_labels[i]}\n{labels[i]}",
+            ha="center",
+            va="center",
+            fontsize=11,
+            fontweight="bold"
+        )
+
+    ax.legend(
+        wedges,
+        labels,
+        loc="lower center",
+        bbox_to_anchor=(0.5, -0.1),
+        frameon=False,
+        ncol=3
+    )
+    ax.axis("equal")
+
+
+def cost_breakdown_chart(values, value_labels, labels, fmt=DEFAULT_FORMAT):
+    """Pie of where the annual rent goes."""
+    return cached_chart("cost_breakdown", _draw_cost_breakdown, figsize=(6, 6), fmt=fmt,
+                        values=list(values), value_labels=list(value_labels), labels=list(labels))
+
+
+def _draw_cap_rate_donut(fig, values, net_cap_rate):
+    ax = fig.subplots()
+    ax.pie(values, wedgeprops=dict(width=0.35), startangle=90)
+
+    # CENTER TEXT — 2 lines
+    ax.text(0, 0.05, f"{net_cap_rate:.2f}%", ha="center", va="center", fontsize=20, fontweight="bold")
+    ax.text(0, -0.12, "earned from your property", ha="center", va="center", fontsize=11, color="gray")
+    ax.axis("equal")
+
+
+def cap_rate_donut_chart(values, net_cap_rate, fmt=DEFAULT_FORMAT):
+    """Donut of net NOI vs the non-income-producing part of the price."""
+    return cached_chart("cap_rate_donut", _draw_cap_rate_donut, figsize=(6, 6), fmt=fmt,
+                        values=list(values), net_cap_rate=net_cap_rate)
+
+
+# ==========================================================
+#  DUAL PROPERTY PAGE
+# ==========================================================
+
+def _draw_dual_projection(fig, years_a, years_b, cf_a, cf_b, rent_a, rent_b, roi_a, roi_b):
+    ax1 = fig.subplots()
+
+    # Primary Y-axis: Cash Flow & Rent
+    ax1.plot(years_a, cf_a, marker='o', label="Cash Flow A ($)", color='blue')
+    ax1.plot(years_b, cf_b, marker='o', label="Cash Flow B ($)", color='skyblue')
+    ax1.plot(years_a, rent_a, marker='s', linestyle='--', label="Rent A ($)", color='orange')
+    ax1.plot(years_b, rent_b, marker='s', linestyle='--', label="Rent B ($)", color='goldenrod')
+    ax1.set_xlabel("Year")
+    ax1.set_ylabel("Cash Flow / Rent ($)")
+    ax1.grid(True)
+
+    # Secondary Y-axis: ROI
+    ax2 = ax1.twinx()
+    ax2.plot(years_a, roi_a, marker='^', linestyle='-', label="ROI A (%)", color='green')
+    ax2.plot(years_b, roi_b, marker='^', linestyle='--', label="ROI B (%)", color='darkgreen')
+    ax2.set_ylabel("ROI (%)", color='green')
+    ax2.tick_params(axis='y', labelcolor='green')
+
+    # Merge legends from both y-axes
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+
+    ax1.set_title("Projected Cash Flow, Rent, and ROI Over Time")
+
+
+def dual_projection_chart(years_a, years_b, cf_a, cf_b, rent_a, rent_b, roi_a, roi_b, fmt=DEFAULT_FORMAT):
+    """Six-curve A vs B cash flow / rent / ROI chart."""
+    return cached_chart("dual_projection", _draw_dual_projection, fmt=fmt,
+                        years_a=list(years_a), years_b=list(years_b), cf_a=list(cf_a), cf_b=list(cf_b),
+                        rent_a=list(rent_a), rent_b=list(rent_b), roi_a=list(roi_a), roi_b=list(roi_b))
+
+
+# ==========================================================
+#  CLIENT-SIDE (VEGA-LITE) PROJECTION CHARTS
+# ==========================================================
+#
+# Instead of a server-rendered image, only the per-year series are sent to
+# the browser, which draws the chart with st.vega_lite_chart. A rerun then
+# costs the server a few KB of JSON instead of a matplotlib render.
+# ROI keeps its own right-hand axis (independent y scales on two layers).
+#
+# Server CPU per rerun, both modes: python benchmarks/bench_chart_modes.py
+
+CHART_MODES = {
+    "image": "🖼️ Image (rendered on server)",
+    "interactive": "📊 Interactive (drawn in browser)",
+}
+
+
+def default_chart_mode():
+    mode = os.getenv("CHART_MODE", "image").strip().lower()
+    return mode if mode in CHART_MODES else "image"
+
+
+def _series_rows(axis, name, years, values, dashed=False):
+    return [
+        {"Year": int(year), "Series": name, "Value": round(float(value), 2),
+         "Axis": axis, "Line": "dashed" if dashed else "solid"}
+        for year, value in zip(years, values)
+    ]
+
+
+def _dual_axis_spec(title, rows, colors, money_title):
+    """Two line layers ($ on the left axis, ROI % on the right)."""
+    names = list(colors)
+    x = {"field": "Year", "type": "quantitative", "axis": {"tickMinStep": 1, "format": "d"}}
+    color = {"field": "Series", "type": "nominal", "title": None,
+             "scale": {"domain": names, "range": [colors[n] for n in names]},
+             "legend": {"orient": "bottom", "columns": 3}}
+    dash = {"field": "Line", "type": "nominal", "legend": None,
+            "scale": {"domain": ["solid", "dashed"], "range": [[1, 0], [6, 4]]}}
+
+    def layer(axis, y):
+        return {
+            "transform": [{"filter": {"field": "Axis", "equal": axis}}],
+            "mark": {"type": "line", "point": True},
+            "encoding": {
+                "x": x, "y": y, "color": color, "strokeDash": dash,
+                "tooltip": [
+                    {"field": "Series", "type": "nominal"},
+                    {"field": "Year", "type": "quantitative"},
+                    {"field": "Value", "type": "quantitative", "format": ",.2f"},
+                ],
+            },
+        }
+
+    return {
+        "title": title,
+        "data": {"values": rows},
+        "layer": [
+            layer("money", {"field": "Value", "type": "quantitative", "title": money_title,
+                            "axis": {"format": "$,.0f"}}),
+            layer("roi", {"field": "Value", "type": "quantitative", "title": "ROI (%)",
+                          "axis": {"orient": "right", "titleColor": "green", "labelColor": "green"}}),
+        ],
+        "resolve": {"scale": {"y": "independent"}},
+    }
+
+
+def projection_spec(years, cash_flow, rents, roi):
+    """Vega-Lite version of projection_chart()."""
+    rows = (_series_rows("money", "Multi-Year Cash Flow ($)", years, cash_flow)
+            + _series_rows("money", "Projected Rent ($)", years, rents, dashed=True)
+            + _series_rows("roi", "ROI (%)", years, roi))
+    colors = {"Multi-Year Cash Flow ($)": "#1f77b4", "Projected Rent ($)": "#ff7f0e", "ROI (%)": "green"}
+    return _dual_axis_spec("Multi - Year Projected Cash Flow & ROI", rows, colors,
+                           "Projected Cash Flow / Rent ($)")
+
+
+def dual_projection_spec(years_a, years_b, cf_a, cf_b, rent_a, rent_b, roi_a, roi_b):
+    """Vega-Lite version of dual_projection_chart()."""
+    rows = (_series_rows("money", "Cash Flow A ($)", years_a, cf_a)
+            + _series_rows("money", "Cash Flow B ($)", years_b, cf_b)
+            + _series_rows("money", "Rent A ($)", years_a, rent_a, dashed=True)
+            + _series_rows("money", "Rent B ($)", years_b, rent_b, dashed=True)
+            + _series_rows("roi", "ROI A (%)", years_a, roi_a)
+            + _series_rows("roi", "ROI B (%)", years_b, roi_b, dashed=True))
+    colors = {"Cash Flow A ($)": "blue", "Cash Flow B ($)": "skyblue", "Rent A ($)": "orange",
+              "Rent B ($)": "goldenrod", "ROI A (%)": "green", "ROI B (%)": "darkgreen"}
+    return _dual_axis_spec("Projected Cash Flow, Rent, and ROI Over Time", rows, colors,
+                           "Cash Flow / Rent ($)")
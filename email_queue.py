@@ -0,0 +1,470 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from email.message import EmailMessage
+
+from applog import get_logger
+from instrumentation import count, instrumented
+
+log = get_logger(__name__)
+
+# ==========================================================
+#  BACKGROUND EMAIL DELIVERY (QUEUE + POOLED SMTP SESSIONS)
+# ==========================================================
+#
+# Pages build an EmailMessage and submit() it; worker threads deliver it
+# over a small pool of already-authenticated SMTP sessions, so the
+# Streamlit rerun never waits on STARTTLS/login/upload. Idle sessions get a
+# NOOP keepalive, dead ones are replaced on the next send, and transient
+# failures (4xx replies, dropped connections) are retried with exponential
+# backoff. Pages poll status(job_id) on later reruns.
+#
+# Server settings come from the environment:
+#   EMAIL_HOST (smtp.gmail.com), EMAIL_PORT (587), EMAIL_STARTTLS (1),
+#   EMAIL_USER, EMAIL_PASSWORD
+# Run `python smtp_stub.py` and set EMAIL_HOST/EMAIL_PORT/EMAIL_STARTTLS=0
+# to test against a local stand-in server.
+
+QUEUED = "queued"
+SENDING = "sending"
+RETRYING = "retrying"
+SENT = "sent"
+FAILED = "failed"
+
+STATUS_ICONS = {QUEUED: "⏳", SENDING: "📤", RETRYING: "🔁", SENT: "✅", FAILED: "❌"}
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF = 2.0        # seconds before the first retry, doubled each time
+KEEPALIVE_INTERVAL = 30.0    # NOOP sessions idle for longer than this
+MAX_IDLE = 240.0             # close sessions idle for longer than this
+JOB_HISTORY = 1000           # finished jobs kept for status lookups
+
+
+class SMTPSettings:
+
+    def __init__(self, host="smtp.gmail.com", port=587, user=None, password=None,
+                 starttls=True, timeout=30):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            host=os.getenv("EMAIL_HOST", "smtp.gmail.com"),
+            port=os.getenv("EMAIL_PORT", "587"),
+            user=os.getenv("EMAIL_USER"),
+            password=os.getenv("EMAIL_PASSWORD"),
+            starttls=os.getenv("EMAIL_STARTTLS", "1").lower() not in ("0", "false", "no"),
+        )
+
+
+# Agent Report tab email (also used by mail_merge.py)
+AGENT_REPORT_SUBJECT = "Your Personalized Real Estate Report"
+AGENT_REPORT_FILENAME = "client_real_estate_report.pdf"
+
+
+def agent_report_body(client_name, agent_name):
+    return (
+        f"Hi {client_name},\n\n"
+        "Please find attached your personalized real estate investment report.\n"
+        "Let me know if you'd like to walk through the numbers together.\n\n"
+        f"Best,\n{agent_name}"
+    )
+
+
+def report_message(to, subject, body, pdf_bytes, filename, sender=None):
+    """EmailMessage with a single PDF attachment (bytes or BytesIO)."""
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = sender or os.getenv("EMAIL_USER")
+    msg["To"] = to
+    msg.set_content(body)
+    data = pdf_bytes.getvalue() if hasattr(pdf_bytes, "getvalue") else bytes(pdf_bytes)
+    msg.add_attachment(data, maintype="application", subtype="pdf", filename=filename)
+    return msg
+
+
+def is_transient(exc):
+    """True for failures worth retrying (4xx replies, network trouble)."""
+    import smtplib
+
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(exc, smtplib.SMTPConnectError):
+        return True
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    # Every other SMTPException is an OSError too, but a permanent one
+    # (SMTPNotSupportedError, SMTPSenderRefused without a 4xx code, ...)
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    return isinstance(exc, OSError)
+
+
+class RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# ==========================================================
+#  CONNECTION POOL
+# ==========================================================
+
+class SMTPPool:
+    """Bounded pool of authenticated SMTP sessions, reused across sends."""
+
+    def __init__(self, settings=None, size=DEFAULT_WORKERS,
+                 keepalive=KEEPALIVE_INTERVAL, max_idle=MAX_IDLE):
+        self.settings = settings or SMTPSettings.from_env()
+        self.size = size
+        self.keepalive = keepalive
+        self.max_idle = max_idle
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []   # (smtp, last_used)
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.reuses = 0
+
+    def _connect(self):
+        import smtplib   # lazy: loaded with the first connection, not the page
+
+        s = self.settings
+        smtp = smtplib.SMTP(s.host, s.port, timeout=s.timeout)
+        try:
+            smtp.ehlo()
+            if s.starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if s.user and s.password:
+                smtp.login(s.user, s.password)
+        except Exception:
+            _close(smtp)
+            raise
+        with self._lock:
+            self.connects += 1
+        return smtp
+
+    def _take_idle(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                smtp, last_used = self._idle.pop()
+            idle = now - last_used
+            if idle > self.max_idle:
+                _close(smtp)
+                continue
+            if idle > self.keepalive and not _alive(smtp):
+                _close(smtp)
+                continue
+            with self._lock:
+                self.reuses += 1
+            return smtp
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._take_idle() or self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, smtp, healthy=True):
+        try:
+            if healthy:
+                with self._lock:
+                    self._idle.append((smtp, time.monotonic()))
+            else:
+                _close(smtp)
+        finally:
+            self._slots.release()
+
+    @instrumented("email_send")
+    def send(self, msg):
+        smtp = self.acquire()
+        try:
+            smtp.send_message(msg)
+        except Exception as exc:
+            # A rejected message leaves the session usable; anything else
+            # (dropped connection, timeouts) means start over with a new one.
+            import smtplib
+
+            healthy = isinstance(exc, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+            if healthy:
+                try:
+                    smtp.rset()
+                except Exception:
+                    healthy = False
+            self.release(smtp, healthy)
+            raise
+        self.release(smtp)
+
+    def ping_idle(self):
+        """NOOP idle sessions due a keepalive; drop the dead or stale ones."""
+        now = time.monotonic()
+        with self._lock:
+            due = [(s, t) for s, t in self._idle if now - t > self.keepalive]
+            self._idle = [(s, t) for s, t in self._idle if now - t <= self.keepalive]
+        for smtp, last_used in due:
+            if now - last_used > self.max_idle or not _alive(smtp):
+                _close(smtp)
+            else:
+                # Keep the last *use* time so unused sessions still expire
+                with self._lock:
+                    self._idle.append((smtp, last_used))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            _close(smtp)
+
+
+def _alive(smtp):
+    try:
+        return smtp.noop()[0] == 250
+    except Exception:
+        return False
+
+
+def _close(smtp):
+    try:
+        smtp.quit()
+    except Exception:
+        try:
+            smtp.close()
+        except Exception:
+            pass
+
+
+# ==========================================================
+#  DELIVERY QUEUE
+# ==========================================================
+
+class EmailJob:
+
+    def __init__(self, job_id, msg, on_sending=None, on_done=None):
+        self.id = job_id
+        self.msg = msg
+        self.on_sending = on_sending
+        self.on_done = on_done
+        self.to = msg["To"]
+        self.state = QUEUED
+        self.attempts = 0
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "to": self.to,
+            "state": self.state,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+
+class EmailQueue:
+    """Worker threads delivering submitted messages through an SMTPPool."""
+
+    def __init__(self, settings=None, workers=DEFAULT_WORKERS, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 backoff=DEFAULT_BACKOFF, pool=None, rate_limit=None):
+        self.pool = pool or SMTPPool(settings, size=workers)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.limiter = RateLimiter(rate_limit)
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = 0
+        self._idle = threading.Condition(self._lock)
+        self._stopping = False
+        self._timers = {}   # job id -> (job, retry Timer)
+        self._threads = [threading.Thread(target=self._worker, name=f"email-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, msg, on_sending=None, on_done=None):
+        """Queue an EmailMessage; returns a job id for status().
+
+        on_sending(job_id) runs in the worker right before each delivery
+        attempt; on_done(status) once the job is sent or has failed.
+        """
+        with self._lock:
+            job = EmailJob(next(self._ids), msg, on_sending, on_done)
+            self._jobs[job.id] = job
+            self._pending += 1
+            self._trim_history()
+        self._queue.put(job)
+        return job.id
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job else None
+
+    def wait(self, timeout=None):
+        """Block until every submitted job is sent or failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def stop(self, wait=True):
+        """Stop the workers; with wait=False, jobs waiting for a retry fail."""
+        if wait:
+            self.wait()
+        with self._lock:
+            self._stopping = True
+            retrying = list(self._timers.values())
+            self._timers.clear()
+        for job, timer in retrying:
+            timer.cancel()
+            count("email_failed")
+            self._finish(job, FAILED, "queue stopped")
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self.pool.close()
+
+    def _trim_history(self):
+        while len(self._jobs) > JOB_HISTORY:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.state not in (SENT, FAILED):
+                break
+            del self._jobs[oldest_id]
+
+    def _finish(self, job, state, error=None):
+        with self._lock:
+            job.state = state
+            job.error = error
+            job.finished = time.time()
+            job.msg = None   # drop the attachment once we are done with it
+            snapshot = job.snapshot()
+        try:
+            if job.on_done:
+                job.on_done(snapshot)
+        except Exception:
+            # A broken callback must not kill the worker or hang wait()
+            log.exception("email on_done callback failed for job %s", job.id)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._idle.notify_all()
+
+    def _schedule_retry(self, job, error):
+        """Requeue job after its backoff; False once the queue is stopping."""
+        delay = self.backoff * 2 ** (job.attempts - 1)
+        with self._lock:
+            if self._stopping:
+                return False
+            job.state = RETRYING
+            job.error = error
+            timer = threading.Timer(delay, self._retry, (job,))
+            timer.daemon = True
+            self._timers[job.id] = (job, timer)
+            timer.start()
+        return True
+
+    def _retry(self, job):
+        # Under the lock: stop() has either already failed this job, or
+        # it sees the job requeued ahead of the workers' stop sentinels
+        with self._lock:
+            if self._timers.pop(job.id, None) is not None:
+                self._queue.put(job)
+
+    def _worker(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=self.pool.keepalive)
+            except queue.Empty:
+                self.pool.ping_idle()
+                continue
+            if job is None:
+                return
+            with self._lock:
+                job.state = SENDING
+                job.attempts += 1
+            self.limiter.wait()
+            if job.on_sending:
+                try:
+                    job.on_sending(job.id)
+                except Exception as exc:
+                    # Not sent: the caller could not record the attempt
+                    log.exception("email on_sending callback failed for job %s", job.id)
+                    count("email_failed")
+                    self._finish(job, FAILED, f"on_sending: {type(exc).__name__}: {exc}")
+                    continue
+            try:
+                self.pool.send(job.msg)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                if is_transient(exc) and job.attempts < self.max_attempts and self._schedule_retry(job, error):
+                    count("email_retried")
+                else:
+                    count("email_failed")
+                    self._finish(job, FAILED, error)
+            else:
+                count("email_sent")
+                self._finish(job, SENT)
+
+
+def status_text(status):
+    """One-line, emoji-prefixed description of a status() snapshot."""
+    if status is None:
+        return "❔ Unknown email job"
+    icon = STATUS_ICONS.get(status["state"], "")
+    text = f"{icon} {status['to']}: {status['state']}"
+    if status["state"] in (RETRYING, FAILED) and status["error"]:
+        text += f" after {status['attempts']} attempt(s) — {status['error']}"
+    return text
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+def get_email_queue():
+    """Process-wide queue shared by every Streamlit session."""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = EmailQueue(SMTPSettings.from_env())
+        return _shared_queue
@@ -0,0 +1,87 @@
+import numpy as np
+
+# ==========================================================
+#  INVESTMENT GRADES (ONE TABLE FOR EVERY MODULE)
+# ==========================================================
+#
+# A deal gets the first grade whose row it clears: final-year ROI and the
+# summed multi-year cash flow must be strictly above the row's values, and
+# cash-on-cash return must be at least the row's value. Anything that
+# clears no row is an F. calc_engine stamps the grade into every metrics
+# dict, and the PDF verdicts, pages and batch screening all read it from
+# here, so a deal can never carry two different grades.
+#
+# grade() and grade_metrics_batch() grade whole arrays in one numpy pass;
+# grade_of() is the scalar path calculate_metrics() uses per deal.
+
+GRADE_TABLE = (
+    # grade, ROI (%) above, cash flow ($) above, CoC (%) at least, summary
+    ("A", 200, 20000, 5, "This is an A-grade investment with high returns and strong cash flow."),
+    ("B", 100, 10000, 0, "This is a B-grade investment with solid performance and good ROI."),
+    ("C", 50, 5000, -5, "This is a C-grade investment with modest returns."),
+    ("D", 0, 0, 6, "This is a D-grade investment with marginal upside potential."),
+)
+FAIL = ("F", "This is an F-grade rental with upside potential.")
+
+GRADES = [row[0] for row in GRADE_TABLE] + [FAIL[0]]
+_LETTERS = np.array(GRADES)
+SUMMARIES = {row[0]: row[4] for row in GRADE_TABLE}
+SUMMARIES[FAIL[0]] = FAIL[1]
+
+_ROI, _CASH_FLOW, _COC = (np.array([row[i] for row in GRADE_TABLE], dtype=float) for i in (1, 2, 3))
+
+
+def grade_of(roi, cash_flow, coc_return):
+    """Grade letter for one deal."""
+    for letter, min_roi, min_cash_flow, min_coc, _ in GRADE_TABLE:
+        if roi > min_roi and cash_flow > min_cash_flow and coc_return >= min_coc:
+            return letter
+    return FAIL[0]
+
+
+def grade_index(roi, cash_flow, coc_return):
+    """Position in GRADES (0 = best) for arrays of deals."""
+    roi, cash_flow, coc_return = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (roi, cash_flow, coc_return)))
+    # (deals, rows): which table rows each deal clears
+    clears = (roi[..., None] > _ROI) & (cash_flow[..., None] > _CASH_FLOW) & (coc_return[..., None] >= _COC)
+    # First cleared row; deals that clear none fall through to F
+    return np.where(clears.any(axis=-1), clears.argmax(axis=-1), len(GRADE_TABLE))
+
+
+def grade(roi, cash_flow, coc_return):
+    """Grade letters for arrays of deals (numpy array of str)."""
+    return _LETTERS[grade_index(roi, cash_flow, coc_return)]
+
+
+def grade_inputs(metrics):
+    """(ROI, summed cash flow, CoC) the grade of one metrics dict is based on."""
+    roi = metrics.get("Final Year ROI (%)") or metrics.get("ROI (%)", 0)
+    return (float(roi or 0), float(sum(metrics.get("Multi-Year Cash Flow") or ())),
+            float(metrics.get("Cash-on-Cash Return (%)", 0) or 0))
+
+
+def grade_metrics(metrics):
+    """Grade letter for a calculate_metrics() dict."""
+    return grade_of(*grade_inputs(metrics))
+
+
+def metric_columns(metrics_list):
+    """ROI, summed cash flow and CoC of many metrics dicts as three arrays."""
+    columns = np.array([grade_inputs(m) for m in metrics_list], dtype=float).reshape(-1, 3)
+    return columns[:, 0], columns[:, 1], columns[:, 2]
+
+
+def grade_metrics_batch(metrics_list):
+    """[grade_metrics(m) for m in metrics_list], graded in one pass."""
+    return grade(*metric_columns(metrics_list)).tolist()
+
+
+def rank(roi, cash_flow, coc_return):
+    """Indices best deal first: by grade, then by higher ROI (stable on ties)."""
+    roi = np.asarray(roi, dtype=float)
+    return np.lexsort((-roi, grade_index(roi, cash_flow, coc_return))).tolist()
+
+
+def rank_metrics(metrics_list):
+    """Indices of metrics_list best deal first."""
+    return rank(*metric_columns(metrics_list))
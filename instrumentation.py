@@ -0,0 +1,257 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from applog import get_logger
+
+log = get_logger(__name__)
+
+# ==========================================================
+#  STAGE TIMERS + COUNTERS (PROCESS-WIDE)
+# ==========================================================
+#
+# Timers wrap the expensive stages (metric calculation, verdicts, each PDF
+# build, chart renders, email sends, page sections); counters track events
+# such as emails sent or retried. Recording a sample is a perf_counter()
+# call plus a deque append under a lock; percentiles are only computed when
+# someone asks for a snapshot.
+#   - Each stage keeps a total count / sum / max and its last WINDOW
+#     samples, which p50/p95 are computed from.
+#   - Exports: Prometheus text format (a summary per stage + counters) or
+#     a JSON snapshot, via
+#       METRICS_FILE=/tmp/app_metrics.prom   written every METRICS_INTERVAL
+#                                            seconds (.json -> JSON)
+#       METRICS_PORT=9464                    http://METRICS_HOST:port/metrics
+#                                            and /metrics.json
+#     Both start with the first recorded sample. The admin page shows the
+#     same numbers.
+
+WINDOW = 1024
+QUANTILES = (0.5, 0.95)
+EXPORT_INTERVAL = float(os.getenv("METRICS_INTERVAL", "15"))
+
+
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=WINDOW)
+
+
+def _quantile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Registry:
+    """Thread-safe stage timers and event counters."""
+
+    def __init__(self):
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def observe(self, stage, seconds, error=False):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.count += 1
+            stats.total += seconds
+            stats.samples.append(seconds)
+            if seconds > stats.max:
+                stats.max = seconds
+            if error:
+                stats.errors += 1
+        _start_exporters()
+
+    def count(self, event, n=1):
+        with self._lock:
+            self._counters[event] = self._counters.get(event, 0) + n
+        _start_exporters()
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, error)
+
+    def snapshot(self):
+        """{"stages": {stage: {...}}, "counters": {...}}, times in ms."""
+        with self._lock:
+            stages = {name: (s.count, s.errors, s.total, s.max, sorted(s.samples))
+                      for name, s in self._stages.items()}
+            counters = dict(self._counters)
+        out = {}
+        for name, (count, errors, total, peak, ordered) in sorted(stages.items()):
+            out[name] = {
+                "count": count,
+                "errors": errors,
+                "total_ms": total * 1000,
+                "mean_ms": total / count * 1000 if count else 0.0,
+                "p50_ms": _quantile(ordered, 0.5) * 1000,
+                "p95_ms": _quantile(ordered, 0.95) * 1000,
+                "max_ms": peak * 1000,
+                "window": len(ordered),
+            }
+        return {"timestamp": time.time(), "uptime_s": time.time() - self.started,
+                "stages": out, "counters": dict(sorted(counters.items()))}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+
+registry = Registry()
+
+
+def timed(stage):
+    """Context manager timing one run of `stage`."""
+    return registry.timer(stage)
+
+
+def instrumented(stage):
+    """Decorator timing every call of the function as `stage`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with registry.timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(event, n=1):
+    registry.count(event, n)
+
+
+def snapshot():
+    return registry.snapshot()
+
+
+# ==========================================================
+#  EXPORT: PROMETHEUS TEXT / JSON
+# ==========================================================
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(snap=None):
+    snap = snap or registry.snapshot()
+    lines = [
+        "# HELP app_stage_duration_seconds Time spent per app stage (quantiles over the last "
+        f"{WINDOW} runs).",
+        "# TYPE app_stage_duration_seconds summary",
+    ]
+    for stage, s in snap["stages"].items():
+        label = f'stage="{_label(stage)}"'
+        for q in QUANTILES:
+            lines.append(f'app_stage_duration_seconds{{{label},quantile="{q}"}} '
+                         f'{s[f"p{int(q * 100)}_ms"] / 1000:.6f}')
+        lines.append(f"app_stage_duration_seconds_sum{{{label}}} {s['total_ms'] / 1000:.6f}")
+        lines.append(f"app_stage_duration_seconds_count{{{label}}} {s['count']}")
+    lines += [
+        "# HELP app_stage_errors_total Stage runs that raised.",
+        "# TYPE app_stage_errors_total counter",
+    ]
+    lines += [f'app_stage_errors_total{{stage="{_label(stage)}"}} {s["errors"]}'
+              for stage, s in snap["stages"].items()]
+    lines += [
+        "# HELP app_events_total Event counters.",
+        "# TYPE app_events_total counter",
+    ]
+    lines += [f'app_events_total{{event="{_label(event)}"}} {n}' for event, n in snap["counters"].items()]
+    return "\n".join(lines) + "\n"
+
+
+def json_text(snap=None):
+    return json.dumps(snap or registry.snapshot(), indent=2)
+
+
+def write_snapshot(path):
+    """Write a snapshot to `path` atomically (.json -> JSON, else Prometheus)."""
+    text = json_text() if path.endswith(".json") else prometheus_text()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Start the /metrics endpoint in a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, ctype = prometheus_text(), "text/plain; version=0.0.4"
+            elif path == "/metrics.json":
+                body, ctype = json_text(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _file_exporter(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_snapshot(path)
+        except OSError as e:
+            log.warning("Could not write metrics to %s: %s", path, e)
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def _start_exporters():
+    global _exporters_started
+    if _exporters_started:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        path = os.getenv("METRICS_FILE")
+        if path:
+            threading.Thread(target=_file_exporter, args=(path, EXPORT_INTERVAL),
+                             name="metrics-file", daemon=True).start()
+        port = os.getenv("METRICS_PORT")
+        if port:
+            try:
+                serve_metrics(int(port), os.getenv("METRICS_HOST", "127.0.0.1"))
+            except OSError as e:
+                log.warning("Metrics endpoint not started on port %s: %s", port, e)
@@ -0,0 +1,263 @@
+import argparse
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+from email_queue import (
+    EmailQueue, SMTPSettings, report_message, agent_report_body,
+    AGENT_REPORT_SUBJECT, AGENT_REPORT_FILENAME, SENT,
+)
+from pdf_portfolio import INPUT_FIELDS, iter_portfolio_metrics
+import profiling
+
+# ==========================================================
+#  MAIL MERGE: ONE AGENT REPORT PER CLIENT
+# ==========================================================
+#
+# python mail_merge.py clients.csv --agent-name "Jane Doe" --brokerage "Acme Realty"
+#
+# Manifest columns:
+#   email, client_name                       (required)
+#   agent_name, brokerage_name, agent_notes  (optional, override the CLI)
+#   pdf                                      path to an already rendered report, or
+#   street_address, zip_code + the calc inputs used by pdf_portfolio.py
+#                                            to render the agent report here.
+#
+# Messages go out through EmailQueue over `--concurrency` reused SMTP
+# sessions, at most `--rate` messages per second.
+#
+# Every send is recorded in an append-only JSON-lines log (fsync'd) keyed by
+# a hash of the manifest row: "sending" right before the SMTP transaction,
+# then "sent" / "failed". Re-running the same command skips rows already
+# sent. A row left at "sending" (crash mid-transaction) may or may not have
+# been delivered, so it is skipped and reported rather than risk a double
+# send; pass --resend-uncertain to send those again.
+
+SENDING_STATE = "sending"
+
+
+def row_key(row):
+    """Stable id for a manifest row (same row → same key across runs)."""
+    canonical = json.dumps({k: (v or "").strip() for k, v in row.items() if k}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:20]
+
+
+class SendLog:
+    """Append-only, crash-safe record of mail-merge deliveries."""
+
+    def __init__(self, path):
+        self.path = path
+        self.states = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    self.states[entry["key"]] = entry["state"]
+        self._file = open(path, "a")
+
+    def record(self, key, email, state, error=None):
+        entry = {"key": key, "email": email, "state": state, "ts": time.time()}
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.states[key] = state
+
+    def close(self):
+        self._file.close()
+
+
+def _render_agent_pdf(row, defaults):
+    from pdf_single import generate_ai_verdict
+    from pdf_single_agent import generate_pdf as generate_agent_pdf
+
+    property_data, metrics = next(iter_portfolio_metrics([row]))
+    summary_text, _ = generate_ai_verdict(metrics)
+    return generate_agent_pdf(
+        property_data=property_data,
+        metrics=metrics,
+        summary_text=summary_text,
+        agent_name=row.get("agent_name") or defaults["agent_name"],
+        brokerage_name=row.get("brokerage_name") or defaults["brokerage_name"],
+        client_name=row.get("client_name") or "Client",
+        agent_notes=row.get("agent_notes") or "",
+        compact=True,
+    ).getvalue()
+
+
+def load_pdf(row, defaults, base_dir="."):
+    """PDF bytes for a manifest row: read `pdf` if given, otherwise render."""
+    if row.get("pdf"):
+        with open(os.path.join(base_dir, row["pdf"]), "rb") as f:
+            return f.read()
+    missing = [k for k in INPUT_FIELDS if not (row.get(k) or "").strip()]
+    if missing:
+        raise ValueError(f"missing columns for rendering: {', '.join(missing)}")
+    # The PDF modules print debug output while rendering
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _render_agent_pdf(row, defaults)
+
+
+def run_merge(rows, settings, log_path, agent_name="Agent", brokerage_name="Your Brokerage",
+              concurrency=2, rate=None, resend_uncertain=False, base_dir=".", sender=None):
+    """Send one agent report per row; returns a summary dict."""
+    defaults = {"agent_name": agent_name, "brokerage_name": brokerage_name}
+    log = SendLog(log_path)
+    queue = EmailQueue(settings, workers=concurrency, rate_limit=rate)
+    # Bound how many rendered PDFs wait in the queue at once
+    in_flight = threading.BoundedSemaphore(concurrency * 4)
+    summary = {"sent": 0, "failed": 0, "skipped": 0, "uncertain": 0, "errors": [], "aborted": None}
+    summary_lock = threading.Lock()
+    # Rows submitted in this run; log.states lags behind the worker threads
+    seen = set()
+
+    def abort(e):
+        # Without a durable send log we can't promise "never double-sends"
+        with summary_lock:
+            if summary["aborted"] is None:
+                summary["aborted"] = f"send log write failed: {e}"
+
+    def record(key, email, state, error=None):
+        try:
+            log.record(key, email, state, error)
+        except OSError as e:
+            abort(e)
+            raise
+
+    def on_done(key, email, status):
+        state = status["state"]
+        try:
+            with summary_lock:
+                summary["sent" if state == SENT else "failed"] += 1
+                if state != SENT:
+                    summary["errors"].append(f"{email}: {status['error']}")
+            record(key, email, state, status["error"])
+        finally:
+            in_flight.release()
+
+    start = time.perf_counter()
+    try:
+        for row in rows:
+            if summary["aborted"]:
+                break
+            email = (row.get("email") or "").strip()
+            if not email:
+                continue
+            key = row_key(row)
+            previous = log.states.get(key)
+            if previous == SENT or key in seen:
+                summary["skipped"] += 1
+                continue
+            if previous == SENDING_STATE and not resend_uncertain:
+                summary["uncertain"] += 1
+                summary["errors"].append(f"{email}: outcome unknown (interrupted), not resent")
+                continue
+            seen.add(key)
+
+            try:
+                pdf = load_pdf(row, defaults, base_dir)
+            except Exception as e:
+                with summary_lock:
+                    summary["failed"] += 1
+                    summary["errors"].append(f"{email}: {e}")
+                try:
+                    record(key, email, "failed", f"render: {e}")
+                except OSError:
+                    break
+                continue
+
+            msg = report_message(
+                email,
+                AGENT_REPORT_SUBJECT,
+                agent_report_body(row.get("client_name") or "Client",
+                                  row.get("agent_name") or agent_name),
+                pdf,
+                AGENT_REPORT_FILENAME,
+                sender=sender,
+            )
+            # Deterministic Message-ID so receiving servers can dedupe too
+            msg["Message-ID"] = f"<{key}.mailmerge@{settings.host}>"
+
+            in_flight.acquire()
+            queue.submit(
+                msg,
+                # Raising here stops the queue from sending an unrecorded message
+                on_sending=lambda _id, key=key, email=email: record(key, email, SENDING_STATE),
+                on_done=lambda status, key=key, email=email: on_done(key, email, status),
+            )
+        queue.stop()
+    finally:
+        log.close()
+
+    summary["elapsed"] = time.perf_counter() - start
+    summary["rate"] = summary["sent"] / summary["elapsed"] if summary["elapsed"] else 0.0
+    summary["connections"] = queue.pool.connects
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Email each client their agent-branded report.")
+    parser.add_argument("manifest", help="CSV with one row per recipient")
+    parser.add_argument("--log", help="send log (default: <manifest>.sendlog.jsonl)")
+    parser.add_argument("--agent-name", default="Agent")
+    parser.add_argument("--brokerage", default="Your Brokerage")
+    parser.add_argument("--concurrency", type=int, default=2, help="SMTP sessions / worker threads")
+    parser.add_argument("--rate", type=float, default=None, help="max messages per second")
+    parser.add_argument("--resend-uncertain", action="store_true",
+                        help="resend rows interrupted mid-send (may duplicate)")
+    parser.add_argument("--stub", action="store_true",
+                        help="deliver to an in-process SMTP stand-in and report throughput")
+    args = parser.parse_args(argv)
+
+    with open(args.manifest, newline="") as f:
+        rows = list(csv.DictReader(f))
+    log_path = args.log or args.manifest + ".sendlog.jsonl"
+    base_dir = os.path.dirname(os.path.abspath(args.manifest))
+
+    stub = None
+    if args.stub:
+        from smtp_stub import SMTPStubServer
+        stub = SMTPStubServer().start()
+        settings = SMTPSettings(**stub.settings())
+    else:
+        settings = SMTPSettings.from_env()
+
+    try:
+        with profiling.profiled("mail_merge", rows):
+            summary = run_merge(
+                rows, settings, log_path,
+                agent_name=args.agent_name, brokerage_name=args.brokerage,
+                concurrency=args.concurrency, rate=args.rate,
+                resend_uncertain=args.resend_uncertain, base_dir=base_dir,
+                sender=os.getenv("EMAIL_USER") or "reports@localhost",
+            )
+    finally:
+        if stub:
+            stub.stop()
+
+    for error in summary["errors"]:
+        print(f"❌ {error}")
+    if summary["aborted"]:
+        print(f"🛑 merge aborted: {summary['aborted']}")
+    print(
+        f"✅ {summary['sent']} sent, {summary['failed']} failed, {summary['skipped']} already sent, "
+        f"{summary['uncertain']} uncertain in {summary['elapsed']:.2f}s "
+        f"({summary['rate']:.1f} msg/s over {summary['connections']} SMTP connection(s))"
+    )
+    return 1 if summary["failed"] or summary["uncertain"] or summary["aborted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
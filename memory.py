@@ -0,0 +1,147 @@
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# ==========================================================
+#  MEMORY TRACKING AROUND RERUNS
+# ==========================================================
+#
+# Every page rerun records its CPU time (the script thread's), wall time
+# and the process RSS when it ends. With tracing on, it also records how
+# much traced Python memory the rerun left behind (process-wide, so
+# concurrent reruns blur into each other) and every SNAPSHOT_EVERY reruns
+# a tracemalloc snapshot is taken; the admin page compares the latest one
+# to the first to show which lines keep growing.
+#
+#     MEMORY_TRACE=1              start tracemalloc at import (or from the
+#                                 admin page); slows allocations ~2x
+#     MEMORY_TRACE_FRAMES=1       stack depth kept per allocation
+#     MEMORY_SNAPSHOT_EVERY=50    reruns between snapshots
+#
+# The per-session cache budget lives in result_cache (SESSION_CACHE_MB).
+
+TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))
+SNAPSHOT_EVERY = int(os.getenv("MEMORY_SNAPSHOT_EVERY", "50"))
+HISTORY = 200
+
+# Allocations made by the tracer itself or the import system are noise
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def rss_mb():
+    """Current resident set size (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def tracing():
+    return tracemalloc.is_tracing()
+
+
+def start_tracing(frames=TRACE_FRAMES):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    tracker.reset_snapshots()
+
+
+def stop_tracing():
+    tracemalloc.stop()
+    tracker.reset_snapshots()
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+class RerunTracker:
+    """Last HISTORY reruns' memory, plus baseline / latest snapshots."""
+
+    def __init__(self, history=HISTORY, snapshot_every=SNAPSHOT_EVERY):
+        self.reruns = deque(maxlen=history)
+        self.snapshot_every = snapshot_every
+        self.count = 0
+        self.baseline = None
+        self.latest = None
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Token for end(): traced bytes, thread CPU and wall clock at the start."""
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        return traced, time.thread_time(), time.perf_counter()
+
+    def end(self, token, page, session=None):
+        start_traced, start_cpu, start_wall = token
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        record = {
+            "time": time.strftime("%H:%M:%S"),
+            "page": page,
+            "session": session,
+            # The script thread's own CPU, so concurrent sessions don't blur it
+            "cpu_ms": (time.thread_time() - start_cpu) * 1000,
+            "wall_ms": (time.perf_counter() - start_wall) * 1000,
+            "rss_mb": rss_mb(),
+            "traced_mb": traced / 1024 / 1024 if traced is not None else None,
+            "retained_kb": (traced - start_traced) / 1024
+            if traced is not None and start_traced is not None else None,
+        }
+        with self._lock:
+            self.reruns.append(record)
+            self.count += 1
+            due = traced is not None and (self.baseline is None or self.count % self.snapshot_every == 0)
+        if due:
+            self.snapshot()
+        return record
+
+    def snapshot(self):
+        """Take a snapshot now (the first one becomes the baseline)."""
+        snap = take_snapshot()
+        with self._lock:
+            if self.baseline is None:
+                self.baseline = snap
+            self.latest = snap
+        return snap
+
+    def reset_snapshots(self):
+        with self._lock:
+            self.baseline = self.latest = None
+
+    def top_growth(self, limit=15):
+        """Source lines whose traced memory grew most since the baseline."""
+        with self._lock:
+            baseline, latest = self.baseline, self.latest
+        if baseline is None or latest is None or baseline is latest:
+            return []
+        rows = []
+        for stat in latest.compare_to(baseline, "lineno")[:limit]:
+            frame = stat.traceback[0]
+            rows.append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_kb": stat.size / 1024,
+                "growth_kb": stat.size_diff / 1024,
+                "blocks": stat.count,
+                "new_blocks": stat.count_diff,
+            })
+        return rows
+
+    def recent(self, limit=50):
+        with self._lock:
+            return list(self.reruns)[-limit:]
+
+
+tracker = RerunTracker()
+
+if os.getenv("MEMORY_TRACE", "0") not in ("", "0"):
+    start_tracing()
@@ -0,0 +1,71 @@
+import time
+import uuid
+from contextlib import contextmanager
+
+import streamlit as st
+
+import memory
+from instrumentation import registry
+from result_cache import current_session
+
+# ==========================================================
+#  SECTION TIMINGS FOR STREAMLIT PAGES
+# ==========================================================
+#
+# Pages are split into fragments (@st.fragment), so a widget reruns only
+# the section it belongs to. Whatever a section needs from the full run is
+# passed in as fragment arguments; expensive results (metrics, PDFs,
+# charts) come from the server-wide result_cache. The timings recorded
+# here show what each full run / fragment rerun costs.
+#
+# Full runs (begin_rerun / end_rerun) and timed sections also tell
+# result_cache which session is at work, for its per-session budget, and
+# record the process's memory after each full run (memory.py).
+
+TIMING_HISTORY = 50
+
+
+def record_timing(name, elapsed_ms):
+    registry.observe(f"page_{name}", elapsed_ms / 1000)
+    history = st.session_state.setdefault("_section_timings", {}).setdefault(name, [])
+    history.append(elapsed_ms)
+    del history[:-TIMING_HISTORY]
+
+
+@contextmanager
+def timed_section(name):
+    """Record how long a page section took, per session."""
+    current_session.set(session_id())   # fragment reruns start without it
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, (time.perf_counter() - start) * 1000)
+
+
+def section_timings():
+    """{section: {"runs", "last_ms", "median_ms"}} for this session."""
+    out = {}
+    for name, history in st.session_state.get("_section_timings", {}).items():
+        ordered = sorted(history)
+        out[name] = {
+            "runs": len(history),
+            "last_ms": history[-1],
+            "median_ms": ordered[len(ordered) // 2],
+        }
+    return out
+
+
+def session_id():
+    """Stable id for this browser session (owner of background work)."""
+    return st.session_state.setdefault("_session_id", uuid.uuid4().hex)
+
+
+def begin_rerun():
+    """Start of a full page run; returns the token for end_rerun()."""
+    current_session.set(session_id())
+    return memory.tracker.begin()
+
+
+def end_rerun(page, token):
+    memory.tracker.end(token, page, session_id())
@@ -4,16 +4,8 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from dotenv import load_dotenv
-from calc_engine import calculate_metrics
-from pdf_single import generate_pdf, generate_ai_verdict
-from pdf_single_agent import generate_pdf as generate_agent_pdf  # 🔹 new import (agent PDF)
-
-import matplotlib.pyplot as plt
-from email.message import EmailMessage
-import smtplib
 import re
-import pandas as pd
-import numpy as np
+import time
 
 load_dotenv()
 
@@ -59,6 +51,230 @@ if not st.session_state.authenticated:
     # If still not authenticated after this run, stop the rest of the app
     st.stop()
 
+# ================================
+# 📦 APP MODULES (LOADED AFTER LOGIN)
+# ================================
+# Calc, PDF, chart and email code pull in numpy, reportlab, pandas & co.;
+# importing them past the password gate keeps the login screen fast on a
+# cold server. `python startup.py serve` preloads them at boot instead.
+from calc_engine import calculate_metrics
+from pdf_single import generate_pdf, generate_ai_verdict
+from pdf_single_agent import generate_pdf as generate_agent_pdf  # 🔹 new import (agent PDF)
+from pdf_compact import pdf_size_report, format_size_report
+from page_state import timed_section, record_timing, session_id, begin_rerun, end_rerun
+from asset_cache import user_guide
+from result_cache import shared_metrics, shared_verdict, shared_pdf
+from speculate import speculate
+import profiling
+from charts import projection_chart, cost_breakdown_chart, cap_rate_donut_chart
+from charts import projection_spec, CHART_MODES, default_chart_mode
+
+from email_queue import get_email_queue, report_message, status_text
+from email_queue import AGENT_REPORT_SUBJECT, AGENT_REPORT_FILENAME, agent_report_body
+import pandas as pd
+import numpy as np
+
+# ================================
+# ✉️ BACKGROUND EMAIL STATUS
+# ================================
+if "email_jobs" not in st.session_state:
+    st.session_state.email_jobs = []
+
+
+def show_email_status(key):
+    """Delivery status of this session's recent emails (refreshes on rerun)."""
+    jobs = st.session_state.email_jobs[-5:]
+    if not jobs:
+        return
+    email_queue = get_email_queue()
+    for job_id in jobs:
+        st.caption(status_text(email_queue.status(job_id)))
+    st.button("🔄 Refresh delivery status", key=key)
+
+
+# ================================
+# 🧩 FRAGMENTS
+# ================================
+# Each fragment reruns on its own when one of its widgets changes. Data from
+# the full run (metrics, verdict, improvements) comes in as arguments; a full
+# rerun (inputs -> metrics) only happens when a sidebar input or the
+# improvements table changes.
+
+@st.fragment
+def projection_section(time_horizon, metrics):
+    with timed_section("charts"):
+        st.subheader("📈 Multi-Year Cash Flow Projection")
+        # Switching chart modes redraws only this chart
+        chart_mode = st.radio(
+            "📊 Projection Chart",
+            list(CHART_MODES),
+            index=list(CHART_MODES).index(default_chart_mode()),
+            format_func=CHART_MODES.get,
+            horizontal=True,
+            help="Interactive charts are drawn by your browser, so sliders respond faster.",
+        )
+        years = list(range(1, time_horizon + 1))
+
+        projection = (years, metrics["Multi-Year Cash Flow"],
+                      metrics["Annual Rents $ (by year)"], metrics["Annual ROI % (by year)"])
+        if chart_mode == "interactive":
+            st.vega_lite_chart(projection_spec(*projection), width="stretch")
+        else:
+            st.image(projection_chart(*projection), width="stretch")
+
+
+@st.fragment
+def investor_report_section(property_data, metrics, summary_text):
+    # 🧾 Investor PDF (rebuilt only when the inputs or verdict change)
+    with timed_section("investor_pdf"):
+        pdf_bytes = shared_pdf(
+            "investor", (property_data, summary_text),
+            lambda: generate_pdf(property_data, metrics, summary_text, compact=True),
+        )
+
+    if pdf_bytes is not None:
+        st.download_button(
+            label="📄 Download PDF Report",
+            data=pdf_bytes,
+            file_name="real_estate_report.pdf",
+            mime="application/pdf",
+            key="download_pdf_unique",
+            on_click="ignore",
+        )
+    else:
+        st.error("⚠️ PDF generation failed. Please check your input or logs.")
+
+    investor_email_section(pdf_bytes)
+
+
+@st.fragment
+def investor_email_section(pdf_bytes):
+    with timed_section("investor_email"):
+        st.markdown("### 📨 Email This Report")
+        recipient_email = st.text_input(
+            "Enter email address to send the report",
+            placeholder="you@example.com",
+            key="investor_email",
+        )
+        if pdf_bytes is not None:
+            st.caption(f"📎 {format_size_report(pdf_size_report(pdf_bytes, 'Attachment'))}")
+
+        if st.button("Send Email Report") and recipient_email:
+            if not re.match(r"[^@]+@[^@]+\.[^@]+", recipient_email):
+                st.error("❌ Please enter a valid email address.")
+            else:
+                try:
+                    msg = report_message(
+                        recipient_email,
+                        "Your Real Estate Evaluation Report",
+                        "Please find attached your real estate evaluation report.",
+                        pdf_bytes,
+                        "real_estate_report.pdf",
+                    )
+                    # 📤 Delivered by the background worker; status shows below
+                    st.session_state.email_jobs.append(get_email_queue().submit(msg))
+                    st.info(f"📤 Report queued for {recipient_email}.")
+
+                except Exception as e:
+                    st.error(f"❌ Failed to send email: {e}")
+
+        show_email_status("refresh_email_status")
+
+
+@st.fragment
+def agent_report_section(property_data, metrics, summary_text, improvements_list):
+    with timed_section("agent_report"):
+        # 🔹 Agent inputs (now only visible in this tab)
+        st.markdown("### 👤 Agent Information")
+
+        agent_name = st.text_input("Agent Name")
+        brokerage_name = st.text_input("Brokerage Name")
+        client_name = st.text_input("Client Name")
+        agent_notes = st.text_area("Notes for Client")
+
+        # 🖼️ Optional branding (decoded + downscaled once, then reused from cache)
+        logo_col, headshot_col = st.columns(2)
+        with logo_col:
+            logo_file = st.file_uploader("Brokerage Logo", type=["png", "jpg", "jpeg"])
+        with headshot_col:
+            headshot_file = st.file_uploader("Agent Headshot", type=["png", "jpg", "jpeg"])
+        logo_image = logo_file.getvalue() if logo_file else None
+        headshot_image = headshot_file.getvalue() if headshot_file else None
+
+        # Generate Agent PDF using agent-specific fields (rebuilt only when they change,
+        # not when the email box below is edited)
+        agent_pdf_bytes = shared_pdf(
+            "agent",
+            (property_data, summary_text, agent_name, brokerage_name, client_name,
+             agent_notes, improvements_list, logo_image or b"", headshot_image or b""),
+            lambda: generate_agent_pdf(
+                property_data=property_data,
+                metrics=metrics,
+                summary_text=summary_text,
+                agent_name=agent_name or "Agent",
+                brokerage_name=brokerage_name or "Your Brokerage",
+                client_name=client_name or "Client",
+                agent_notes=agent_notes or "",
+                improvements_list=improvements_list,  # ⭐ NEW
+                compact=True,
+                logo_image=logo_image,
+                headshot_image=headshot_image,
+            ),
+        )
+
+        if agent_pdf_bytes is not None:
+            st.download_button(
+                label="📄 Download Agent PDF",
+                data=agent_pdf_bytes,
+                file_name="agent_property_report.pdf",
+                mime="application/pdf",
+                key="download_agent_pdf",
+                on_click="ignore",
+            )
+        else:
+            st.error("⚠️ Agent PDF generation failed. Please check your inputs or logs.")
+
+    agent_email_section(agent_pdf_bytes, client_name, agent_name)
+
+
+@st.fragment
+def agent_email_section(agent_pdf_bytes, client_name, agent_name):
+    with timed_section("agent_email"):
+        st.markdown("### 📨 Email This Client-Branded Report")
+        agent_email = st.text_input(
+            "Enter email address to send the report",
+            placeholder="client@example.com",
+            key="agent_email",
+        )
+        if agent_pdf_bytes is not None:
+            st.caption(f"📎 {format_size_report(pdf_size_report(agent_pdf_bytes, 'Attachment'))}")
+
+        if st.button("Send Agent-Branded PDF") and agent_email:
+            if not re.match(r"[^@]+@[^@]+\.[^@]+", agent_email):
+                st.error("❌ Please enter a valid email address.")
+            else:
+                try:
+                    msg = report_message(
+                        agent_email,
+                        AGENT_REPORT_SUBJECT,
+                        agent_report_body(client_name, agent_name),
+                        agent_pdf_bytes,
+                        AGENT_REPORT_FILENAME,
+                    )
+                    st.session_state.email_jobs.append(get_email_queue().submit(msg))
+                    st.info(f"📤 Client-Branded Report queued for {agent_email}.")
+
+                except Exception as e:
+                    st.error(f"❌ Failed to send email: {e}")
+
+        show_email_status("refresh_agent_email_status")
+
+# ⏱️ Full-run latency (fragment reruns record their own sections)
+_run_start = time.perf_counter()
+_memory_token = begin_rerun()
+# 🔬 Sampled cProfile of the full run when PROFILE_RATE is set
+_profile_run = profiling.start("single_page")
+
 # ================================
 # 📌 INPUT SIDEBAR
 # ================================
@@ -86,12 +302,14 @@ time_horizon = st.sidebar.slider("🏁 Investment Time Horizon (Years)", 1, 30,
 # ================================
 # 🔢 RUN CALCULATIONS
 # ================================
-metrics = calculate_metrics(
+calc_inputs = (
     purchase_price, monthly_rent, down_payment_pct,
     mortgage_rate, mortgage_term,
     monthly_expenses, vacancy_rate, appreciation_rate, rent_growth_rate,
     time_horizon
 )
+with timed_section("metrics"):
+    metrics = shared_metrics(*calc_inputs)
 
 # Build property_data once so both Investor & Agent PDFs can use it
 property_data = {
@@ -111,7 +329,7 @@ property_data = {
 improvements_list = []
 
 # AI verdict once, shared by all tabs
-summary_text, grade = generate_ai_verdict(metrics)
+summary_text, grade = shared_verdict(generate_ai_verdict, metrics)
 
 # ================================
 # 🧭 TABS
@@ -123,11 +341,6 @@ tab1, tab2, tab3 = st.tabs(["Deal Analyzer", "Insights", "Agent Report"])
 # ===================================================================
 with tab1:
 
-    # =============================
-    # 🧾 Generate Investor PDF (existing)
-    # =============================
-    pdf_bytes = generate_pdf(property_data, metrics, summary_text)
-
     # =============================
     # 📊 Long-Term Metrics
     # =============================
@@ -140,92 +353,28 @@ with tab1:
     # =============================
     # 📈 Multi-Year Cash Flow Projection
     # =============================
-    st.subheader("📈 Multi-Year Cash Flow Projection")
-    fig, ax = plt.subplots()
-    years = list(range(1, time_horizon + 1))
-
-    ax.plot(years, metrics["Multi-Year Cash Flow"], marker='o', label="Multi-Year Cash Flow ($)")
-    ax.plot(years, metrics["Annual Rents $ (by year)"], marker='s', linestyle='--', label="Projected Rent ($)")
-
-    ax.set_xlabel("Year")
-    ax.set_ylabel("Projected Cash Flow / Rent ($)")
-    ax.grid(True)
-
-    ax2 = ax.twinx()
-    ax2.plot(years, metrics["Annual ROI % (by year)"], color='green', marker='^', label="ROI (%)")
-    ax2.set_ylabel("ROI (%)", color='green')
-
-    lines, labels = ax.get_legend_handles_labels()
-    lines2, labels2 = ax2.get_legend_handles_labels()
-    ax.legend(lines + lines2, labels + labels2, loc="upper left")
-
-    ax.set_title("Multi - Year Projected Cash Flow & ROI")
-    st.pyplot(fig)
+    projection_section(time_horizon, metrics)
 
     # =============================
     # 📘 Download User Manual
     # =============================
     st.markdown("---")
-    try:
-        with open("Investment_Metrics_User_Guide.pdf", "rb") as f:
-            st.download_button(
-                label="📘 Download User Manual (PDF)",
-                data=f,
-                file_name="Investment_Metrics_User_Guide.pdf",
-                mime="application/pdf"
-            )
-    except FileNotFoundError:
-        st.error("📄 User Manual PDF is missing from directory.")
-
-    # =============================
-    # 📄 PDF Download (Investor version)
-    # =============================
-    if pdf_bytes is not None:
+    guide = user_guide()
+    if guide is not None:
         st.download_button(
-            label="📄 Download PDF Report",
-            data=pdf_bytes,
-            file_name="real_estate_report.pdf",
+            label="📘 Download User Manual (PDF)",
+            data=guide.data,
+            file_name=guide.name,
             mime="application/pdf",
-            key="download_pdf_unique"
+            on_click="ignore",
         )
     else:
-        st.error("⚠️ PDF generation failed. Please check your input or logs.")
+        st.caption("📄 User Manual is currently unavailable.")
 
     # =============================
-    # ✉️ Email This Report
+    # 📄 Investor PDF + ✉️ Email This Report
     # =============================
-    st.markdown("### 📨 Email This Report")
-    recipient_email = st.text_input("Enter email address to send the report", placeholder="you@example.com")
-
-    if st.button("Send Email Report") and recipient_email:
-        if not re.match(r"[^@]+@[^@]+\.[^@]+", recipient_email):
-            st.error("❌ Please enter a valid email address.")
-            st.stop()
-
-        try:
-            msg = EmailMessage()
-            msg["Subject"] = "Your Real Estate Evaluation Report"
-            msg["From"] = os.getenv("EMAIL_USER")
-            msg["To"] = recipient_email
-            msg.set_content("Please find attached your real estate evaluation report.")
-
-            pdf_bytes.seek(0)
-            msg.add_attachment(
-                pdf_bytes.read(),
-                maintype='application',
-                subtype='pdf',
-                filename="real_estate_report.pdf"
-            )
-
-            with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
-                smtp.starttls()
-                smtp.login(os.getenv("EMAIL_USER"), os.getenv("EMAIL_PASSWORD"))
-                smtp.send_message(msg)
-
-            st.success(f"✅ Report sent to {recipient_email}!")
-
-        except Exception as e:
-            st.error(f"❌ Failed to send email: {e}")
+    investor_report_section(property_data, metrics, summary_text)
 
     # =============================
     # 🔧 Optional Enhancements
@@ -347,40 +496,7 @@ with tab2:
         f"${annual_cash_flow:,.0f}"
     ]
 
-    fig_exp, ax_exp = plt.subplots(figsize=(6, 6))
-
-    wedges, texts, autotexts = ax_exp.pie(
-        values,
-        labels=None,
-        autopct="%1.1f%%",
-        pctdistance=0.75,
-        startangle=90
-    )
-
-    for i, w in enumerate(wedges):
-        ang = (w.theta2 + w.theta1) / 2
-        x = 1.25 * np.cos(np.deg2rad(ang))
-        y = 1.25 * np.sin(np.deg2rad(ang))
-        ax_exp.text(
-            x, y,
-            f"{value_labels[i]}\n{labels[i]}",
-            ha="center",
-            va="center",
-            fontsize=11,
-            fontweight="bold"
-        )
-
-    ax_exp.legend(
-        wedges,
-        labels,
-        loc="lower center",
-        bbox_to_anchor=(0.5, -0.1),
-        frameon=False,
-        ncol=3
-    )
-
-    ax_exp.axis("equal")
-    st.pyplot(fig_exp)
+    st.image(cost_breakdown_chart(values, value_labels, labels), width="stretch")
 
     st.markdown(
         """
@@ -418,32 +534,7 @@ _All slices shown as % of **annual** income — aligned with investor metrics._
     if sum(values_cap) == 0:
         st.warning("⚠️ Net Cap Rate cannot be computed — values are zero.")
     else:
-        fig_cap, ax_cap = plt.subplots(figsize=(6, 6))
-        wedges, _ = ax_cap.pie(
-            values_cap,
-            wedgeprops=dict(width=0.35),
-            startangle=90
-        )
-
-        # CENTER TEXT — 2 lines
-        ax_cap.text(
-            0, 0.05,
-            f"{net_cap_rate:.2f}%",
-            ha="center", va="center",
-            fontsize=20,
-            fontweight="bold"
-        )
-
-        ax_cap.text(
-            0, -0.12,
-            "earned from your property",
-            ha="center", va="center",
-            fontsize=11,
-            color="gray"
-        )
-
-        ax_cap.axis("equal")
-        st.pyplot(fig_cap)
+        st.image(cap_rate_donut_chart(values_cap, net_cap_rate), width="stretch")
 
         st.markdown(
             f"""
@@ -469,81 +560,22 @@ and personalized notes. All property numbers come from the same inputs
 on the left; this tab just adds your branding.
 """
     )
-    # 🔹 Agent inputs (now only visible in this tab)
-    st.markdown("### 👤 Agent Information")
-
-    agent_name = st.text_input("Agent Name")
-    brokerage_name = st.text_input("Brokerage Name")
-    client_name = st.text_input("Client Name")
-    agent_notes = st.text_area("Notes for Client")
-
-    # Generate Agent PDF using agent-specific fields
-    agent_pdf_bytes = generate_agent_pdf(
-        property_data=property_data,
-        metrics=metrics,
-        summary_text=summary_text,
-        agent_name=agent_name or "Agent",
-        brokerage_name=brokerage_name or "Your Brokerage",
-        client_name=client_name or "Client",
-        agent_notes=agent_notes or "",
-        #improvements=valid_df.to_dict(orient="records") # ⭐ NEW
-        #improvement_name=improvement_name,
-        #improvement_cost=improvement_cost
-        improvements_list=improvements_list  # ⭐ NEW
-    )
-
-    if agent_pdf_bytes is not None:
-        st.download_button(
-            label="📄 Download Agent PDF",
-            data=agent_pdf_bytes,
-            file_name="agent_property_report.pdf",
-            mime="application/pdf",
-            key="download_agent_pdf"
-        )
-    else:
-        st.error("⚠️ Agent PDF generation failed. Please check your inputs or logs.")
-
-    # =============================
-    # ✉️ Email Agent-Branded PDF
-    # =============================
-    st.markdown("### 📨 Email This Client-Branded Report")
-    agent_email = st.text_input(
-        "Enter email address to send the report",
-        placeholder="client@example.com"
-    )
+    agent_report_section(property_data, metrics, summary_text, improvements_list)
 
-    if st.button("Send Agent-Branded PDF") and agent_email:
-        if not re.match(r"[^@]+@[^@]+\.[^@]+", agent_email):
-            st.error("❌ Please enter a valid email address.")
-            st.stop()
-
-        try:
-            msg = EmailMessage()
-            msg["Subject"] = "Your Personalized Real Estate Report"
-            msg["From"] = os.getenv("EMAIL_USER")
-            msg["To"] = agent_email
-            msg.set_content(
-                f"Hi {client_name},\n\n"
-                "Please find attached your personalized real estate investment report.\n"
-                "Let me know if you'd like to walk through the numbers together.\n\n"
-                f"Best,\n{agent_name}"
-            )
+record_timing("full_run", (time.perf_counter() - _run_start) * 1000)
+profiling.stop(_profile_run, calc_inputs)
+end_rerun("single", _memory_token)
 
-            agent_pdf_bytes.seek(0)
-            msg.add_attachment(
-                agent_pdf_bytes.read(),
-                maintype='application',
-                subtype='pdf',
-                filename="client_real_estate_report.pdf"
-            )
-
-            with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
-                smtp.starttls()
-                smtp.login(os.getenv("EMAIL_USER"), os.getenv("EMAIL_PASSWORD"))
-                smtp.send_message(msg)
-
-            st.success(f"✅ Client-Branded Report sent to {agent_email}!")
-
-        except Exception as e:
-            st.error(f"❌ Failed to send email: {e}")
-        
+# ================================
+# 🔮 PRECOMPUTE NEXT SLIDER STEPS
+# ================================
+# Metrics one step away on the sliders people nudge most, computed in the
+# background so the next rerun finds them in the shared cache.
+speculate(session_id(), [calc_inputs], [
+    ("mortgage_rate", 0.1, 0.0, 15.0),
+    ("time_horizon", 1, 1, 30),
+    ("down_payment_pct", 1, 0, 100),
+    ("vacancy_rate", 1, 0, 100),
+    ("appreciation_rate", 1, 0, 10),
+    ("rent_growth_rate", 1, 0, 10),
+])
@@ -6,12 +6,6 @@ import sys  # ✅ Move this before using sys
 sys.path.append(os.path.abspath(".."))  # ✅ Now valid
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from dotenv import load_dotenv
-import smtplib
-from email.message import EmailMessage
-import matplotlib.pyplot as plt
-import pandas as pd
-from calc_engine import calculate_metrics
-from pdf_dual import generate_pdf , generate_comparison_pdf , generate_comparison_pdf_table_style
 load_dotenv()
 
 #from pdf_generator import generate_comparison_pdf_table_style
@@ -22,7 +16,6 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
-from pdf_dual import generate_ai_verdict
 
 # 🔐 Password Gate — load from .env or fallback
 load_dotenv()
@@ -45,6 +38,25 @@ if not st.session_state.authenticated:
         st.error("❌ Incorrect password. Please try again.")
     st.stop()  # 🔒 Block access until correct
 
+# 📦 App modules load past the password gate (numpy, reportlab, pandas & co.)
+# so the login screen stays fast; `python startup.py serve` preloads them.
+from email_queue import get_email_queue, report_message, status_text
+import pandas as pd
+from calc_engine import calculate_metrics
+from pdf_dual import generate_pdf , generate_comparison_pdf , generate_comparison_pdf_table_style
+from pdf_dual import generate_ai_verdict
+from pdf_compact import pdf_size_report, format_size_report
+from result_cache import shared_metrics, shared_verdict, shared_pdf
+from page_state import session_id, begin_rerun, end_rerun
+from asset_cache import user_guide
+from speculate import speculate
+import profiling
+from charts import dual_projection_chart, dual_projection_spec, CHART_MODES, default_chart_mode
+
+# 🔬 Sampled cProfile of the full run when PROFILE_RATE is set
+_profile_run = profiling.start("dual_page")
+_memory_token = begin_rerun()
+
     
 # ✅ Titles shown only after succesful login
 st.markdown("## 🏡 Home Ownership Cost & Comfort Check")
@@ -60,13 +72,16 @@ st.markdown(
     unsafe_allow_html=True
 )
 st.markdown("---")
-with open("Investment_Metrics_User_Guide.pdf", "rb") as f:
+guide = user_guide()
+if guide is not None:
     st.download_button(
         label="📘 Download User Manual (PDF)",
-        data=f,
-        file_name="Investment_Metrics_User_Guide.pdf",
+        data=guide.data,
+        file_name=guide.name,
         mime="application/pdf"
     )
+else:
+    st.caption("📄 User Manual is currently unavailable.")
 
     # Sidebar Title
 #sidebar.markdown("## 🧾 Shared Financial Inputs")
@@ -96,6 +111,14 @@ mortgage_rate = st.sidebar.slider("📈 Mortgage Rate (%)", 0.0, 15.0, 5.5, 0.1)
 mortgage_term = st.sidebar.slider("📆 Mortgage Term (years)", 5, 40, 30)
 vacancy_rate = st.sidebar.slider("🏠 Vacancy Rate (%)", 0.0, 20.0, 5.0, 0.5)
 
+chart_mode = st.sidebar.radio(
+    "📊 Projection Chart",
+    list(CHART_MODES),
+    index=list(CHART_MODES).index(default_chart_mode()),
+    format_func=CHART_MODES.get,
+    help="Interactive charts are drawn by your browser, so sliders respond faster.",
+)
+
 # 👇 DO NOT include shared Down Payment slider here
     
 
@@ -125,7 +148,7 @@ with col2:
 
 # Calculate metrics
 # ---- Property A Metrics ----
-metrics_a = calculate_metrics(
+calc_inputs_a = (
     purchase_price_a,
     rent_a,
     down_payment_pct_a,
@@ -137,9 +160,10 @@ metrics_a = calculate_metrics(
     rent_growth_rate_a,
     time_horizon_a
 )
+metrics_a = shared_metrics(*calc_inputs_a)
 
 # ---- Property B Metrics ----
-metrics_b = calculate_metrics(
+calc_inputs_b = (
     purchase_price_b,
     rent_b,
     down_payment_pct_b,
@@ -151,16 +175,22 @@ metrics_b = calculate_metrics(
     rent_growth_rate_b,
     time_horizon_b
 )
+metrics_b = shared_metrics(*calc_inputs_b)
 
 
 if metrics_a and metrics_b:
     # 🏠 Add address + zip support for dual PDF table
-    comparison_pdf = generate_comparison_pdf_table_style(
-        metrics_a, metrics_b,
-        address_a=address_a,
-        zip_a=zip_code_a,
-        address_b=address_b,
-        zip_b=zip_code_b
+    comparison_pdf = shared_pdf(
+        "comparison_table",
+        (metrics_a, metrics_b, address_a, zip_code_a, address_b, zip_code_b),
+        lambda: generate_comparison_pdf_table_style(
+            metrics_a, metrics_b,
+            address_a=address_a,
+            zip_a=zip_code_a,
+            address_b=address_b,
+            zip_b=zip_code_b,
+            compact=True,
+        ),
     )
 
     st.download_button(
@@ -188,13 +218,12 @@ verdict_input = {
     "Cash-on-Cash Return (%) B": metrics_b.get("Cash-on-Cash Return (%)", 0),
 }
 
-summary_text, grade = generate_ai_verdict(metrics_a, metrics_b)
+summary_text, _ = shared_verdict(generate_ai_verdict, metrics_a, metrics_b)
 
 # Add verdict to metrics so pdf_generator can consume it
+# (each property keeps its own "Grade" from calc_engine)
 metrics_a["AI Verdict"] = summary_text
-metrics_a["Grade"] = grade
 metrics_b["AI Verdict"] = summary_text
-metrics_b["Grade"] = grade
 
 
 # Prepare property_data
@@ -252,36 +281,43 @@ property_data_b = {
 
 # ✅ Now generate dual PDF
 # ✅ Now generate dual PDF with property address and zip
-pdf_bytes = generate_pdf(
-    property_data_a={
-        "Address": address_a,
-        "ZIP Code": zip_code_a,
-        "Purchase Price": purchase_price_a,
-        "Monthly Rent": rent_a,
-        "Monthly Expenses": monthly_expenses_a,
-        "Down Payment (%)": down_payment_pct_a,
-        "Appreciation Rate (%)": appreciation_rate_a,
-        "Rent Growth Rate (%)": rent_growth_rate_a,
-        "Mortgage Rate (%)": mortgage_rate,
-        "Mortgage Term (Years)": mortgage_term,
-        "Vacancy Rate (%)": vacancy_rate,
-    },
-    property_data_b={
-        "Address": address_b,
-        "ZIP Code": zip_code_b,
-        "Purchase Price": purchase_price_b,
-        "Monthly Rent": rent_b,
-        "Monthly Expenses": monthly_expenses_b,
-        "Down Payment (%)": down_payment_pct_b,
-        "Appreciation Rate (%)": appreciation_rate_b,
-        "Rent Growth Rate (%)": rent_growth_rate_b,
-        "Mortgage Rate (%)": mortgage_rate,
-        "Mortgage Term (Years)": mortgage_term,
-        "Vacancy Rate (%)": vacancy_rate,
-    },
-    metrics_a=metrics_a,
-    metrics_b=metrics_b,
-    summary_text=summary_text
+pdf_property_a = {
+    "Address": address_a,
+    "ZIP Code": zip_code_a,
+    "Purchase Price": purchase_price_a,
+    "Monthly Rent": rent_a,
+    "Monthly Expenses": monthly_expenses_a,
+    "Down Payment (%)": down_payment_pct_a,
+    "Appreciation Rate (%)": appreciation_rate_a,
+    "Rent Growth Rate (%)": rent_growth_rate_a,
+    "Mortgage Rate (%)": mortgage_rate,
+    "Mortgage Term (Years)": mortgage_term,
+    "Vacancy Rate (%)": vacancy_rate,
+}
+pdf_property_b = {
+    "Address": address_b,
+    "ZIP Code": zip_code_b,
+    "Purchase Price": purchase_price_b,
+    "Monthly Rent": rent_b,
+    "Monthly Expenses": monthly_expenses_b,
+    "Down Payment (%)": down_payment_pct_b,
+    "Appreciation Rate (%)": appreciation_rate_b,
+    "Rent Growth Rate (%)": rent_growth_rate_b,
+    "Mortgage Rate (%)": mortgage_rate,
+    "Mortgage Term (Years)": mortgage_term,
+    "Vacancy Rate (%)": vacancy_rate,
+}
+pdf_bytes = shared_pdf(
+    "dual",
+    (pdf_property_a, pdf_property_b, metrics_a, metrics_b, summary_text),
+    lambda: generate_pdf(
+        property_data_a=pdf_property_a,
+        property_data_b=pdf_property_b,
+        metrics_a=metrics_a,
+        metrics_b=metrics_b,
+        summary_text=summary_text,
+        compact=True,
+    ),
 )
 # ✅ Extract cash flow lists from metrics for plotting
 cf_a = metrics_a.get("Multi-Year Cash Flow", [])
@@ -325,8 +361,6 @@ roi_b = metrics_b.get("Annual ROI % (by year)", [])
 
 # Use longest time horizon
 #years = list(range(1, max(len(cf_a), len(cf_b)) + 1))
-fig, ax1 = plt.subplots()
-#fig, ax1 = plt.subplots(figsize=(10, 5))  # ✅ Create figure and axes
 years_a = list(range(1, len(cf_a) + 1))
 years_b = list(range(1, len(cf_b) + 1))
 
@@ -341,38 +375,23 @@ roi_a = roi_a[:len(years_a)]
 roi_b = roi_b[:len(years_b)]
 
 
-# Primary Y-axis: Cash Flow & Rent
-ax1.plot(years_a, cf_a, marker='o', label="Cash Flow A ($)", color='blue')
-ax1.plot(years_b, cf_b, marker='o', label="Cash Flow B ($)", color='skyblue')
-ax1.plot(years_a, rent_a, marker='s', linestyle='--', label="Rent A ($)", color='orange')
-ax1.plot(years_b, rent_b, marker='s', linestyle='--', label="Rent B ($)", color='goldenrod')
-ax1.set_xlabel("Year")
-ax1.set_ylabel("Cash Flow / Rent ($)")
-ax1.grid(True)
-
-# Secondary Y-axis: ROI
-ax2 = ax1.twinx()
-ax2.plot(years_a, roi_a, marker='^', linestyle='-', label="ROI A (%)", color='green')
-ax2.plot(years_b, roi_b, marker='^', linestyle='--', label="ROI B (%)", color='darkgreen')
-ax2.set_ylabel("ROI (%)", color='green')
-ax2.tick_params(axis='y', labelcolor='green')
-
-# Merge legends from both y-axes
-lines1, labels1 = ax1.get_legend_handles_labels()
-lines2, labels2 = ax2.get_legend_handles_labels()
-ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
-
-# Final layout
-ax1.set_title("Projected Cash Flow, Rent, and ROI Over Time")
-st.pyplot(fig)
+projection = (years_a, years_b, cf_a, cf_b, rent_a, rent_b, roi_a, roi_b)
+if chart_mode == "interactive":
+    st.vega_lite_chart(dual_projection_spec(*projection), width="stretch")
+else:
+    st.image(dual_projection_chart(*projection), width="stretch")
 
 
 # Email Section
 st.markdown("### 📨 Email This Report")
 recipient_email = st.text_input("Enter email address to send the report", placeholder="you@example.com")
+st.caption(f"📎 {format_size_report(pdf_size_report(pdf_bytes, 'Attachment'))}")
 
 # Debug diagnostics
 
+if "email_jobs" not in st.session_state:
+    st.session_state.email_jobs = []
+
 if st.button("Send Email Report") and recipient_email:
     # ✅ UI-level validation of malformed email inputs
     import re
@@ -380,26 +399,24 @@ if st.button("Send Email Report") and recipient_email:
         st.error("❌ Please enter a valid email address.")
         st.stop()
     try:
-        st.write("📤 Attempting to send email...")
-        msg = EmailMessage()
-        msg["Subject"] = "Your Real Estate Evaluation Report"
-        msg["From"] = os.getenv("EMAIL_USER")  # ✅ From address
-        msg["To"] = recipient_email
-        msg.set_content("Please find attached your real estate evaluation report.")
-        pdf_bytes.seek(0)
-        msg.add_attachment(pdf_bytes.read(), maintype='application', subtype='pdf', filename="real_estate_report.pdf")
-
-        with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
-            smtp.starttls()
-                # ✅ Debug prints BEFORE login
-            #st.write("🔐 EMAIL_USER:", os.getenv("EMAIL_USER"))
-            #st.write("🔐 EMAIL_PASSWORD present:", bool(os.getenv("EMAIL_PASSWORD")))
-            smtp.login(os.getenv("EMAIL_USER"), os.getenv("EMAIL_PASSWORD")) # GMAIL was changed to EMAIL!!!
-            smtp.send_message(msg)
-
-        st.success(f"✅ Report sent to {recipient_email}!")
+        msg = report_message(
+            recipient_email,
+            "Your Real Estate Evaluation Report",
+            "Please find attached your real estate evaluation report.",
+            pdf_bytes,
+            "real_estate_report.pdf",
+        )
+        # 📤 Delivered by the background worker; status shows below
+        st.session_state.email_jobs.append(get_email_queue().submit(msg))
+        st.info(f"📤 Report queued for {recipient_email}.")
     except Exception as e:
         st.error(f"❌ Failed to send email: {e}")
+
+# ✉️ Delivery status of this session's recent emails (refreshes on rerun)
+if st.session_state.email_jobs:
+    for job_id in st.session_state.email_jobs[-5:]:
+        st.caption(status_text(get_email_queue().status(job_id)))
+    st.button("🔄 Refresh delivery status", key="refresh_email_status")
 # =============================
 # 🔧 Optional Enhancements
 # =============================
@@ -445,6 +462,20 @@ with st.expander("🔧 Optional Enhancements", expanded=False):
     # Display Metrics
     st.success(f"📊 Weighted ROI from Capital Improvements: {weighted_roi:.2f}% (based on ${total_cost:,.0f} spent)")
 
-
-
-        
+profiling.stop(_profile_run, (calc_inputs_a, calc_inputs_b))
+end_rerun("dual", _memory_token)
+
+# ================================
+# 🔮 PRECOMPUTE NEXT SLIDER STEPS
+# ================================
+# Metrics one slider step away for both properties, computed in the
+# background so the next rerun finds them in the shared cache.
+speculate(session_id(), [calc_inputs_a, calc_inputs_b], [
+    ("mortgage_rate", 0.1, 0.0, 15.0),
+    ("time_horizon", 1, 1, 30),
+    ("down_payment_pct", 1.0, 0.0, 100.0),
+    ("appreciation_rate", 0.1, 0.0, 10.0),
+    ("rent_growth_rate", 0.1, 0.0, 10.0),
+    ("vacancy_rate", 0.5, 0.0, 20.0),
+    ("mortgage_term", 1, 5, 40),
+])
@@ -0,0 +1,239 @@
+import streamlit as st
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from dotenv import load_dotenv
+
+load_dotenv()
+
+st.set_page_config(page_title="Admin — Server Status", layout="wide")
+
+# ===================================
+# 🔐 ADMIN PASSWORD GATE
+# ===================================
+# Separate from the app password so agents can't clear server caches
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", os.getenv("APP_PASSWORD", "SmartInvest1!"))
+
+if "admin_authenticated" not in st.session_state:
+    st.session_state.admin_authenticated = False
+
+if not st.session_state.admin_authenticated:
+    st.title("🛠️ Admin")
+    password = st.text_input("🔒 Please enter admin password", type="password")
+    if password == ADMIN_PASSWORD:
+        st.session_state.admin_authenticated = True
+        st.rerun()
+    elif password:
+        st.error("❌ Incorrect password. Please try again.")
+    st.stop()
+
+# Loaded past the gate so the login screen doesn't wait on pandas/reportlab
+import pandas as pd
+
+from result_cache import cache_stats, clear_all, session_budget
+from asset_cache import branding_cache
+from speculate import get_speculator
+import instrumentation
+import applog
+import memory
+
+st.title("🛠️ Server Status")
+
+# ===================================
+# 🗄️ SHARED RESULT CACHE
+# ===================================
+st.subheader("🗄️ Shared Result Cache")
+st.caption("Metrics, verdicts, charts and PDFs shared by every session on this server.")
+
+rows = cache_stats()
+branding = branding_cache.stats()
+branding_lookups = branding["hits"] + branding["misses"] + branding["coalesced"]
+rows.append({
+    "cache": "branding images",
+    "entries": branding["entries"],
+    "bytes": branding["bytes"],
+    "max_bytes": branding["max_bytes"],
+    "hits": branding["hits"],
+    "misses": branding["misses"],
+    "coalesced": branding["coalesced"],
+    "hit_rate": (branding["hits"] + branding["coalesced"]) / branding_lookups if branding_lookups else 0.0,
+    "evictions": branding["evictions"],
+    "prefilled": 0,
+    "compute_seconds": None,
+})
+
+cache_df = pd.DataFrame(rows)
+total_mb = cache_df["bytes"].sum() / 1024 / 1024
+lookups = cache_df["hits"].sum() + cache_df["misses"].sum() + cache_df["coalesced"].sum()
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Memory Used (MB)", f"{total_mb:.1f}")
+col2.metric("Lookups", f"{lookups:,}")
+col3.metric("Overall Hit Rate (%)",
+            f"{(cache_df['hits'].sum() + cache_df['coalesced'].sum()) / lookups * 100:.1f}" if lookups else "—")
+
+cache_df["used (MB)"] = cache_df["bytes"] / 1024 / 1024
+cache_df["limit (MB)"] = cache_df["max_bytes"] / 1024 / 1024
+cache_df["hit rate (%)"] = cache_df["hit_rate"] * 100
+st.dataframe(
+    cache_df[["cache", "entries", "used (MB)", "limit (MB)", "hits", "misses", "coalesced",
+              "hit rate (%)", "evictions", "prefilled", "compute_seconds"]],
+    hide_index=True,
+    width="stretch",
+    column_config={
+        "used (MB)": st.column_config.NumberColumn(format="%.2f"),
+        "limit (MB)": st.column_config.NumberColumn(format="%.0f"),
+        "hit rate (%)": st.column_config.NumberColumn(format="%.1f"),
+        "compute_seconds": st.column_config.NumberColumn("compute (s)", format="%.2f"),
+    },
+)
+
+# ===================================
+# 🔮 SPECULATIVE PRECOMPUTE
+# ===================================
+st.subheader("🔮 Speculative Precompute")
+st.caption("Metrics for neighboring slider positions, computed in the background after each rerun.")
+spec = get_speculator().stats()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Scenarios Computed", f"{spec['computed']:,}")
+col2.metric("Already Cached", f"{spec['skipped']:,}")
+col3.metric("Stale Jobs Cancelled", f"{spec['cancelled']:,}")
+col4.metric("Background CPU (s)", f"{spec['cpu_seconds']:.2f}",
+            help=f"Capped at {spec['cpu_share']:.0%} of one core (SPECULATE_CPU_SHARE).")
+
+# ===================================
+# ⏱️ STAGE TIMINGS
+# ===================================
+st.subheader("⏱️ Stage Timings")
+st.caption("Where reruns spend their time, across all sessions since the server started "
+           f"(percentiles over the last {instrumentation.WINDOW} runs of each stage).")
+
+snap = instrumentation.snapshot()
+if snap["stages"]:
+    stage_df = pd.DataFrame([{"stage": name, **stats} for name, stats in snap["stages"].items()])
+    st.dataframe(
+        stage_df[["stage", "count", "p50_ms", "p95_ms", "max_ms", "total_ms", "errors"]],
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+            "max_ms": st.column_config.NumberColumn("max (ms)", format="%.1f"),
+            "total_ms": st.column_config.NumberColumn("total (ms)", format="%.0f"),
+        },
+    )
+else:
+    st.info("No stages recorded yet.")
+if snap["counters"]:
+    st.caption(" · ".join(f"{event}: {n:,}" for event, n in snap["counters"].items()))
+
+col1, col2, col3 = st.columns(3)
+col1.download_button("⬇️ Prometheus snapshot", instrumentation.prometheus_text(snap),
+                     file_name="app_metrics.prom", mime="text/plain", on_click="ignore")
+col2.download_button("⬇️ JSON snapshot", instrumentation.json_text(snap),
+                     file_name="app_metrics.json", mime="application/json", on_click="ignore")
+if col3.button("↺ Reset Timings"):
+    instrumentation.registry.reset()
+    st.rerun()
+
+# ===================================
+# 🧠 MEMORY
+# ===================================
+st.subheader("🧠 Memory")
+st.caption("Process memory after each page rerun, each session's share of the result caches, "
+           "and (with tracing on) which source lines keep allocating.")
+
+reruns = memory.tracker.recent()
+col1, col2, col3 = st.columns(3)
+col1.metric("Process RSS (MB)", f"{memory.rss_mb():.0f}")
+if memory.tracing():
+    traced, peak = memory.tracemalloc.get_traced_memory()
+    col2.metric("Traced Python (MB)", f"{traced / 1024 / 1024:.1f}", help=f"Peak {peak / 1024 / 1024:.1f} MB")
+else:
+    col2.metric("Traced Python (MB)", "off", help="Start tracing below or set MEMORY_TRACE=1.")
+col3.metric("Session Budget Evictions", f"{session_budget.evictions:,}",
+            help=f"Each session may hold {session_budget.max_bytes / 1024 / 1024:.0f} MB of cached "
+                 "results (SESSION_CACHE_MB).")
+
+sessions = session_budget.usage()
+if sessions:
+    session_df = pd.DataFrame(sessions)
+    session_df["used (MB)"] = session_df["bytes"] / 1024 / 1024
+    session_df["budget (%)"] = session_df["bytes"] / session_budget.max_bytes * 100
+    st.dataframe(
+        session_df[["session", "entries", "used (MB)", "budget (%)"]],
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "used (MB)": st.column_config.NumberColumn(format="%.2f"),
+            "budget (%)": st.column_config.NumberColumn(format="%.0f"),
+        },
+    )
+
+if reruns:
+    st.dataframe(
+        pd.DataFrame(reruns[::-1])[["time", "page", "session", "cpu_ms", "wall_ms", "rss_mb", "traced_mb",
+                                "retained_kb"]],
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "cpu_ms": st.column_config.NumberColumn("CPU (ms)", format="%.0f"),
+            "wall_ms": st.column_config.NumberColumn("wall (ms)", format="%.0f"),
+            "rss_mb": st.column_config.NumberColumn("RSS (MB)", format="%.1f"),
+            "traced_mb": st.column_config.NumberColumn("traced (MB)", format="%.1f"),
+            "retained_kb": st.column_config.NumberColumn("retained by rerun (KB)", format="%.0f"),
+        },
+    )
+
+growth = memory.tracker.top_growth()
+if growth:
+    st.markdown("**Largest growth since the first snapshot**")
+    st.dataframe(
+        pd.DataFrame(growth),
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "size_kb": st.column_config.NumberColumn("size (KB)", format="%.0f"),
+            "growth_kb": st.column_config.NumberColumn("growth (KB)", format="%+.0f"),
+        },
+    )
+
+col1, col2 = st.columns(2)
+if memory.tracing():
+    if col1.button("📸 Take Snapshot"):
+        memory.tracker.snapshot()
+        st.rerun()
+    if col2.button("⏹️ Stop Tracing"):
+        memory.stop_tracing()
+        st.rerun()
+elif col1.button("▶️ Start Tracing"):
+    memory.start_tracing()
+    memory.tracker.snapshot()
+    st.rerun()
+
+# ===================================
+# 📜 RECENT LOG EVENTS
+# ===================================
+st.subheader("📜 Recent Log Events")
+if applog.ring is None:
+    st.caption("In-memory log buffer is off. Set LOG_RING=500 (and LOG_RING_LEVEL) to keep recent events here.")
+else:
+    level = st.selectbox("Minimum level", ["DEBUG", "INFO", "WARNING", "ERROR"])
+    events = applog.recent_events(limit=200, level=getattr(applog, level))
+    if events:
+        log_df = pd.DataFrame(events[::-1])
+        log_df["fields"] = [" ".join(f"{k}={v}" for k, v in f.items()) for f in log_df["fields"]]
+        st.dataframe(
+            log_df[["time", "level", "logger", "message", "fields"]],
+            hide_index=True,
+            width="stretch",
+        )
+    else:
+        st.info("No events recorded yet.")
+
+if st.button("🧹 Clear Result Caches"):
+    clear_all()
+    branding_cache.clear()
+    st.toast("✅ Caches cleared.")
+    st.rerun()
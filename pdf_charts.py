@@ -0,0 +1,190 @@
+import math
+
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.legends import LineLegend
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+
+# ==========================================================
+#  NATIVE VECTOR CHARTS FOR PDF REPORTS
+# ==========================================================
+#
+# Same Cash Flow / Rent / ROI projection as the Streamlit pages, drawn with
+# ReportLab's graphics primitives so reports embed a few KB of vector paths
+# instead of a rasterized matplotlib PNG.
+
+CHART_WIDTH = 460
+CHART_HEIGHT = 230
+
+# Plot area inside the drawing (room for axis labels + legend)
+PLOT_X = 55
+PLOT_Y = 55
+PLOT_RIGHT_PAD = 50
+PLOT_TOP_PAD = 30
+
+DASHED = (4, 2)
+
+LEGEND_COLUMNS = 3
+LEGEND_ROW_HEIGHT = 10
+
+
+def _clean(values):
+    out = []
+    for v in values or []:
+        try:
+            out.append(float(v))
+        except (TypeError, ValueError):
+            out.append(0.0)
+    return out
+
+
+def _line_plot(series, width, height, plot_y, right_axis=False):
+    lp = LinePlot()
+    lp.x = PLOT_X
+    lp.y = plot_y
+    lp.width = width - PLOT_X - PLOT_RIGHT_PAD
+    lp.height = height - plot_y - PLOT_TOP_PAD
+    lp.data = [list(enumerate(values, start=1)) for _, values, _, _ in series]
+
+    for i, (_, _, color, dashed) in enumerate(series):
+        lp.lines[i].strokeColor = color
+        lp.lines[i].strokeWidth = 1.2
+        lp.lines[i].symbol = makeMarker("FilledSquare", size=2.5, fillColor=color, strokeColor=color)
+        if dashed:
+            lp.lines[i].strokeDashArray = DASHED
+
+    max_year = max((len(values) for _, values, _, _ in series), default=1)
+    lp.xValueAxis.valueMin = 1
+    lp.xValueAxis.valueMax = max(max_year, 2)
+    lp.xValueAxis.valueStep = max(1, max_year // 10)
+    lp.xValueAxis.labels.fontName = "Helvetica"
+    lp.xValueAxis.labels.fontSize = 7
+    lp.xValueAxis.labelTextFormat = "%d"
+    lp.yValueAxis.labels.fontName = "Helvetica"
+    lp.yValueAxis.labels.fontSize = 7
+    lp.yValueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+
+    if right_axis:
+        # Second scale shares the x range but draws its axis on the right
+        lp.yValueAxis.joinAxisMode = "right"
+        lp.yValueAxis.tickLeft = 0
+        lp.yValueAxis.tickRight = 3
+        lp.yValueAxis.labels.boxAnchor = "w"
+        lp.yValueAxis.labels.dx = 5
+        lp.yValueAxis.strokeColor = colors.green
+        lp.yValueAxis.labels.fillColor = colors.green
+        lp.xValueAxis.visible = 0
+    else:
+        lp.yValueAxis.visibleGrid = 1
+        lp.yValueAxis.gridStrokeColor = colors.HexColor("#DDDDDD")
+        lp.yValueAxis.gridStrokeWidth = 0.5
+    return lp
+
+
+def projection_chart(left_series, right_series=(), title="", width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Build a dual-axis line chart Drawing.
+
+    Each series is (label, values, color, dashed). Left-axis series are in
+    dollars (cash flow, rent); right-axis series are ROI percentages.
+    """
+    left_series = [(label, _clean(values), color, dashed)
+                   for label, values, color, dashed in left_series if values]
+    right_series = [(label, _clean(values), color, dashed)
+                    for label, values, color, dashed in right_series if values]
+
+    # Legend is laid out in up to LEGEND_COLUMNS columns; extra rows grow
+    # the drawing downwards so the plot area keeps its size.
+    pairs = [(color, label) for label, _, color, _ in left_series + right_series]
+    legend_rows = max(1, math.ceil(len(pairs) / LEGEND_COLUMNS))
+    extra = max(0, legend_rows - 2) * LEGEND_ROW_HEIGHT
+    height += extra
+    plot_y = PLOT_Y + extra
+
+    d = Drawing(width, height, initialFontName="Helvetica")
+    if title:
+        d.add(String(width / 2, height - 14, title, fontName="Helvetica-Bold",
+                     fontSize=10, textAnchor="middle"))
+    if not left_series and not right_series:
+        return d
+
+    if left_series:
+        d.add(_line_plot(left_series, width, height, plot_y))
+    if right_series:
+        d.add(_line_plot(right_series, width, height, plot_y, right_axis=True))
+
+    d.add(String(PLOT_X + (width - PLOT_X - PLOT_RIGHT_PAD) / 2, plot_y - 22, "Year",
+                 fontName="Helvetica", fontSize=7, textAnchor="middle"))
+
+    legend = LineLegend()
+    legend.x = PLOT_X
+    legend.y = 20 + extra
+    legend.fontName = "Helvetica"
+    legend.fontSize = 7
+    legend.alignment = "right"
+    legend.columnMaximum = 1 if len(pairs) <= LEGEND_COLUMNS else legend_rows
+    legend.deltax = (width - PLOT_X) / LEGEND_COLUMNS if len(pairs) > LEGEND_COLUMNS else 110
+    legend.deltay = LEGEND_ROW_HEIGHT
+    legend.dx = 14
+    legend.dy = 3
+    legend.colorNamePairs = pairs
+    d.add(legend)
+    return d
+
+
+def single_projection_chart(metrics, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Multi-Year Cash Flow, Rent and ROI chart for one property."""
+    return projection_chart(
+        left_series=[
+            ("Cash Flow ($)", metrics.get("Multi-Year Cash Flow", []), colors.HexColor("#1f77b4"), False),
+            ("Projected Rent ($)", metrics.get("Annual Rents $ (by year)", []), colors.HexColor("#ff7f0e"), True),
+        ],
+        right_series=[
+            ("ROI (%)", metrics.get("Annual ROI % (by year)", []), colors.green, False),
+        ],
+        title="Multi-Year Projected Cash Flow & ROI",
+        width=width,
+        height=height,
+    )
+
+
+def dual_projection_chart(metrics_a, metrics_b, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Six-curve A vs B chart matching the Dual Property page."""
+    return projection_chart(
+        left_series=[
+            ("Cash Flow A ($)", metrics_a.get("Multi-Year Cash Flow", []), colors.blue, False),
+            ("Cash Flow B ($)", metrics_b.get("Multi-Year Cash Flow", []), colors.skyblue, False),
+            ("Rent A ($)", metrics_a.get("Annual Rents $ (by year)", []), colors.orange, True),
+            ("Rent B ($)", metrics_b.get("Annual Rents $ (by year)", []), colors.goldenrod, True),
+        ],
+        right_series=[
+            ("ROI A (%)", metrics_a.get("Annual ROI % (by year)", []), colors.green, False),
+            ("ROI B (%)", metrics_b.get("Annual ROI % (by year)", []), colors.darkgreen, True),
+        ],
+        title="Projected Cash Flow, Rent, and ROI Over Time",
+        width=width,
+        height=height,
+    )
+
+
+# Cash flow / ROI colours for N-way comparisons (cycled)
+SERIES_PALETTE = [
+    colors.HexColor("#1f77b4"), colors.HexColor("#ff7f0e"), colors.HexColor("#2ca02c"),
+    colors.HexColor("#d62728"), colors.HexColor("#9467bd"), colors.HexColor("#8c564b"),
+]
+
+
+def multi_projection_chart(metrics_list, labels, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Cash flow (solid) and ROI (dashed) per property for N-way comparisons."""
+    left, right = [], []
+    for i, (metrics, label) in enumerate(zip(metrics_list, labels)):
+        color = SERIES_PALETTE[i % len(SERIES_PALETTE)]
+        left.append((f"Cash Flow {label} ($)", metrics.get("Multi-Year Cash Flow", []), color, False))
+        right.append((f"ROI {label} (%)", metrics.get("Annual ROI % (by year)", []), color, True))
+    return projection_chart(
+        left_series=left,
+        right_series=right,
+        title="Projected Cash Flow and ROI Over Time",
+        width=width,
+        height=height,
+    )
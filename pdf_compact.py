@@ -0,0 +1,80 @@
+import re
+from io import BytesIO
+
+from reportlab import rl_config
+
+# ==========================================================
+#  COMPACT PDF OUTPUT (EMAIL ATTACHMENTS)
+# ==========================================================
+#
+# Reports only use the standard 14 PDF fonts, so nothing is embedded.
+# Content streams are written as raw Flate instead of ASCII85 + Flate.
+# ASCII85 only exists to keep PDFs 7-bit clean, and MIME already
+# base64-encodes attachments, so it inflates every email for nothing.
+# useA85 is a ReportLab global with no per-document switch, so it is
+# turned off once here, for every report in the process; toggling it per
+# build would race between concurrent sessions.
+# Compact mode additionally:
+#   - turns on invariant output (no timestamps / random IDs), so identical
+#     reports are byte-identical and dedupe in caches and mail stores;
+#   - offers downsample_image() so logos/photos are stored at print size.
+# Fonts and images are already shared per document by ReportLab (one
+# resource object per font, images keyed by content digest).
+rl_config.useA85 = 0
+
+DEFAULT_IMAGE_DPI = 150
+DEFAULT_JPEG_QUALITY = 80
+
+
+def doc_options(compact):
+    """Extra keyword arguments for SimpleDocTemplate / canvas.Canvas."""
+    if not compact:
+        return {}
+    return {"pageCompression": 1, "invariant": 1}
+
+
+def downsample_image(data, width_pt, height_pt, dpi=DEFAULT_IMAGE_DPI, quality=DEFAULT_JPEG_QUALITY):
+    """Return image bytes scaled down to at most width_pt x height_pt at `dpi`.
+
+    Opaque images are re-encoded as JPEG (ReportLab embeds JPEG data as-is,
+    without decoding it again); images with transparency stay PNG. Images
+    already at or below the target size are only re-encoded.
+    """
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as img:
+        img.load()
+        max_px = (max(1, int(width_pt / 72.0 * dpi)), max(1, int(height_pt / 72.0 * dpi)))
+        if img.width > max_px[0] or img.height > max_px[1]:
+            img.thumbnail(max_px, Image.LANCZOS)
+
+        out = BytesIO()
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if has_alpha:
+            img.save(out, format="PNG", optimize=True)
+        else:
+            img.convert("RGB").save(out, format="JPEG", quality=quality, optimize=True)
+        return out.getvalue()
+
+
+def pdf_size_report(pdf, label="report"):
+    """Summarize where a generated PDF's bytes go."""
+    data = pdf.getvalue() if hasattr(pdf, "getvalue") else bytes(pdf)
+    streams = re.findall(rb"stream\r?\n(.*?)\r?\nendstream", data, re.S)
+    return {
+        "label": label,
+        "bytes": len(data),
+        "pages": len(re.findall(rb"/Type /Page\b", data)),
+        "fonts": sorted({f.decode() for f in re.findall(rb"/BaseFont /([\w+-]+)", data)}),
+        "images": len(re.findall(rb"/Subtype /Image", data)),
+        "streams": len(streams),
+        "stream_bytes": sum(len(s) for s in streams),
+        "ascii85": b"/ASCII85Decode" in data,
+    }
+
+
+def format_size_report(report):
+    return (
+        f"{report['label']}: {report['bytes'] / 1024:.1f} KB, {report['pages']} page(s), "
+        f"{len(report['fonts'])} standard font(s), {report['images']} image(s)"
+    )
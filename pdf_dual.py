@@ -4,7 +4,16 @@ from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet , ParagraphStyle
-#from reportlab.pdfgen import canvas
+from reportlab.pdfgen import canvas
+from reportlab.lib.utils import simpleSplit
+from reportlab.graphics import renderPDF
+from pdf_charts import dual_projection_chart, multi_projection_chart
+from pdf_compact import doc_options
+from applog import DEBUG, fields, get_logger
+import grading
+from instrumentation import instrumented
+
+log = get_logger(__name__)
 
 # ✅ Keys to skip (prevent duplicates like "10yr Cash Flow")
 skip_keys = {"10Yr Cash Flow", "10yr Cash Flow"}
@@ -49,82 +58,31 @@ def format_display_value(key, value):
 
 # ✅ Define AI Verdict function BEFORE generate_pdf
 
-def parse_numeric(value):
-    try:
-        return float(str(value).replace(",", "").strip())
-    except:
-        return 0.0
+@instrumented("verdict_dual")
 def generate_ai_verdict(metrics_a: dict, metrics_b: dict) -> tuple[str, str]:
-    print("🗝️ Property A keys:", list(metrics_a.keys()))
-    print("🗝️ Property B keys:", list(metrics_b.keys()))
-
-    roi_a = parse_numeric(metrics_a.get("Final Year ROI (%)") or metrics_a.get("ROI (%)", 0))
-    roi_b = parse_numeric(metrics_b.get("Final Year ROI (%)") or metrics_b.get("ROI (%)", 0))
-
-    coc_a = parse_numeric(metrics_a.get("Cash-on-Cash Return (%)", 0))
-    coc_b = parse_numeric(metrics_b.get("Cash-on-Cash Return (%)", 0))
+    """Combined verdict text and the better property ("A" or "B")."""
+    roi, cash_flow, coc = grading.metric_columns([metrics_a, metrics_b])
+    grade_a, grade_b = grading.grade(roi, cash_flow, coc).tolist()
+    metrics_a["Grade"], metrics_b["Grade"] = grade_a, grade_b
 
     # Example combined verdict
     verdict = f"""
     📊 AI Verdict:
-    • Property A → ROI: {roi_a}%, CoC: {coc_a}%
-    • Property B → ROI: {roi_b}%, CoC: {coc_b}%
+    • Property A → ROI: {roi[0]}%, CoC: {coc[0]}%, Grade: {grade_a}
+    • Property B → ROI: {roi[1]}%, CoC: {coc[1]}%, Grade: {grade_b}
     """
 
-    grade = "A" if roi_a > roi_b else "B"
-
-    return verdict.strip(), grade
-
-    #roi = parse_numeric(metrics.get("Final Year ROI (%)") or metrics.get("ROI (%)", 0))
-    roi = parse_numeric(metrics.get("Final Year ROI (%)"))
-    if roi == 0.0:
-        roi = parse_numeric(metrics.get("ROI (%)", 0))
-    #cash_flow = parse_numeric(metrics.get("Annual Cash Flow ($)", 0))
-    coc_return = parse_numeric(metrics.get("Cash-on-Cash Return (%)", 0))
-
-    # ✅ Use Multi-Year Cash Flow to sum total
-    raw_cash_flow = metrics.get("Multi-Year Cash Flow", [])
-    print("🧾 Raw cash flow data (before processing):", raw_cash_flow)
-
-    #print("🧾 Raw cash flow data (before processing):", raw_cash_flow)  # Debug line
-
-   # ✅ Step 1: Handle case where it's a comma-separated string
-    if isinstance(raw_cash_flow, str):
-        try:
-            raw_cash_flow = [parse_numeric(x) for x in raw_cash_flow.split(",")]
-        except:
-            raw_cash_flow = []
-
-    elif isinstance(raw_cash_flow, list):
-        raw_cash_flow = [parse_numeric(x) for x in raw_cash_flow]
-    else:
-        raw_cash_flow = []
-
-    cash_flow = sum(raw_cash_flow)
+    # Better grade wins; ROI breaks a tie
+    winner = "AB"[grading.rank(roi, cash_flow, coc)[0]]
+    if log.isEnabledFor(DEBUG):
+        log.debug("dual verdict inputs", extra=fields(roi_a=roi[0], roi_b=roi[1], coc_a=coc[0], coc_b=coc[1],
+                                                      grade_a=grade_a, grade_b=grade_b))
 
-    print("🧾 Parsed cash flow list:", raw_cash_flow)
-    print(f"🧪 Debug: ROI={roi}, CashFlow={cash_flow}, CoC Return={coc_return}")
-    
-    # Sample grading logic
-    if roi > 200 and cash_flow > 20000 and coc_return >= 5:
-        grade = "A"
-        summary = "This is an A-grade investment with high returns and strong cash flow."
-    elif roi > 100 and cash_flow > 10000 and coc_return >= 0:
-        grade = "B"
-        summary = "This is a B-grade investment with solid performance and good ROI."
-    elif roi > 50 and cash_flow > 5000 and coc_return >= -5:
-        grade = "C"
-        summary = "This is a C-grade investment with modest returns."
-    elif roi > 0 and cash_flow > 0 and coc_return >= 6:
-        grade = "D"
-        summary = "This is a D-grade investment with marginal upside potential."
-    else:
-        grade = "F"
-        summary = "This is an F-grade rental with upside potential."
-
-    return summary, grade
+    return verdict.strip(), winner
 
-def generate_pdf(property_data_a, property_data_b, metrics_a, metrics_b, summary_text):
+@instrumented("pdf_dual")
+def generate_pdf(property_data_a, property_data_b, metrics_a, metrics_b, summary_text, include_chart=True,
+                 compact=False):
     address_a = property_data_a.get("Address A", "")
     zip_a = property_data_a.get("ZIP Code A", "")
     address_b = property_data_b.get("Address B", "")
@@ -132,7 +90,7 @@ def generate_pdf(property_data_a, property_data_b, metrics_a, metrics_b, summary
   # ... then use in your PDF table rows
     
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc = SimpleDocTemplate(buffer, pagesize=letter, **doc_options(compact))
     elements = []
 
     styles = getSampleStyleSheet()
@@ -173,6 +131,11 @@ def generate_pdf(property_data_a, property_data_b, metrics_a, metrics_b, summary
     elements.append(verdict_para)
     elements.append(Spacer(1, 24))
 
+    # 📈 Multi-Year Cash Flow / Rent / ROI chart (vector, no matplotlib)
+    if include_chart:
+        elements.append(dual_projection_chart(metrics_a, metrics_b))
+        elements.append(Spacer(1, 12))
+
     # ✅ Metrics for A and B, cleaned and ordered
     preferred_order = [
         "Cap Rate (%)", "Cash-on-Cash Return (%)", "Final Year ROI (%)",
@@ -220,46 +183,218 @@ def generate_pdf(property_data_a, property_data_b, metrics_a, metrics_b, summary
 generate_pdf_report = generate_pdf
 
 
-#### ***** Full generate_comparison_pdf()  ******
-
-def generate_comparison_pdf(metrics_a, metrics_b):
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, 770, "📊 Side-by-Side Deal Comparison Report")
-
-    y = 730
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(50, y, "Metric")
-    c.drawString(250, y, "Property A")
-    c.drawString(400, y, "Property B")
-    y -= 20
-
-    c.setFont("Helvetica", 11)
-    for key in metrics_a:
-        value_a = str(metrics_a.get(key, "-"))
-        value_b = str(metrics_b.get(key, "-"))
-
-        c.drawString(50, y, f"{key}")
-        c.drawString(250, y, value_a)
-        c.drawString(400, y, value_b)
-        y -= 20
+#### ***** Comparison report content (shared by table-style + canvas renderers) ******
 
-        if y < 50:  # Add a new page if needed
+COMPARISON_TITLE = "📊 Property Comparison Summary"
+COMPARISON_KEYS = [
+    "Cap Rate (%)",
+    "Final Year ROI (%)",
+    "Cash-on-Cash Return (%)",
+    "First Year Cash Flow ($)",
+    "Monthly Mortgage ($)",
+    "Mortgage Rate (%)",            # ✅ Optional new line
+    "Mortgage Term (Years)",        # ✅ Optional new line
+    "Grade",
+    "Multi-Year Cash Flow"  # Now handled in a single place
+]
+VERDICT_COLORS = {
+    "A": colors.darkgreen,
+    "B": colors.green,
+    "C": colors.orange,
+    "D": colors.red,
+    "F": colors.red,
+}
+VERDICT_DISCLAIMER = "(AI-generated grade based on estimated ROI, cash flow, and risk factors. Informational only.)"
+
+
+def comparison_value(value):
+    """Format one comparison cell (lists joined as whole dollars, floats to 2dp)."""
+    if isinstance(value, list):
+        return ", ".join([str(int(x)) for x in value])
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return value
+
+
+#### ***** Direct-canvas comparison renderer (fast path) ******
+#
+# Fixed-shape grid, so column positions and row heights are computed once
+# up front and pagination is explicit — no platypus flow layout. Used for
+# batch runs and N-way comparisons; generate_comparison_pdf() is the
+# two-property entry point and produces the same content as
+# generate_comparison_pdf_table_style().
+
+CANVAS_MARGIN = 72
+CANVAS_FONT_SIZE = 9
+CANVAS_PADDING = 6
+CANVAS_LABEL_WIDTH = 200
+CANVAS_VALUE_WIDTH = 150
+CANVAS_WRAP_FONT_SIZE = 10
+CANVAS_WRAP_LEADING = 12
+
+
+def _canvas_columns(n_properties, page_width):
+    """Return (x positions, widths) for the label column + one per property."""
+    usable = page_width - 2 * 36
+    value_width = CANVAS_VALUE_WIDTH
+    label_width = CANVAS_LABEL_WIDTH
+    if label_width + n_properties * value_width > usable:
+        label_width = 150
+        value_width = (usable - label_width) / n_properties
+    widths = [label_width] + [value_width] * n_properties
+    x = (page_width - sum(widths)) / 2
+    xs = []
+    for w in widths:
+        xs.append(x)
+        x += w
+    return xs, widths
+
+
+def _canvas_rows(metrics_list, labels, addresses, zip_codes, widths):
+    """Precompute (cells, wrapped, height) for every grid row."""
+    rows = [(["Metric"] + list(labels), False),
+            (["Address"] + list(addresses), False),
+            (["ZIP Code"] + list(zip_codes), False)]
+    for key in COMPARISON_KEYS:
+        cells = [key] + [str(comparison_value(m.get(key, "N/A"))) for m in metrics_list]
+        rows.append((cells, key == "Multi-Year Cash Flow"))
+
+    plain_height = CANVAS_FONT_SIZE * 1.2 + 2 * CANVAS_PADDING
+    laid_out = []
+    for cells, wrapped in rows:
+        if wrapped:
+            lines = [simpleSplit(text, "Helvetica", CANVAS_WRAP_FONT_SIZE, w - 2 * CANVAS_PADDING)
+                     for text, w in zip(cells, widths)]
+            height = max(len(l) for l in lines) * CANVAS_WRAP_LEADING + 2 * CANVAS_PADDING
+            laid_out.append((lines, True, height))
+        else:
+            laid_out.append((cells, False, plain_height))
+    return laid_out
+
+
+def _draw_canvas_row(c, row, xs, widths, top, header=False):
+    cells, wrapped, height = row
+    if header:
+        c.setFillColor(colors.lightgrey)
+        c.rect(xs[0], top - height, sum(widths), height, stroke=0, fill=1)
+    c.setFillColor(colors.black)
+    c.setStrokeColor(colors.grey)
+    c.setLineWidth(0.5)
+    for x, w in zip(xs, widths):
+        c.rect(x, top - height, w, height, stroke=1, fill=0)
+
+    if wrapped:
+        c.setFont("Helvetica", CANVAS_WRAP_FONT_SIZE)
+        for lines, x in zip(cells, xs):
+            y = top - height / 2 + (len(lines) * CANVAS_WRAP_LEADING) / 2 - CANVAS_WRAP_FONT_SIZE
+            for line in lines:
+                c.drawString(x + CANVAS_PADDING, y, line)
+                y -= CANVAS_WRAP_LEADING
+    else:
+        c.setFont("Helvetica-Bold" if header else "Helvetica", CANVAS_FONT_SIZE)
+        baseline = top - height / 2 - CANVAS_FONT_SIZE * 0.35
+        for text, x, w in zip(cells, xs, widths):
+            c.drawCentredString(x + w / 2, baseline, str(text))
+
+
+def render_comparison_canvas(output, metrics_list, labels=None, addresses=None, zip_codes=None,
+                             include_chart=True, compact=False):
+    """Draw an N-way comparison report onto `output` (path or binary stream)."""
+    n = len(metrics_list)
+    labels = labels or [f"Property {chr(ord('A') + i)}" for i in range(n)]
+    addresses = addresses or [""] * n
+    zip_codes = zip_codes or [""] * n
+
+    page_width, page_height = letter
+    xs, widths = _canvas_columns(n, page_width)
+    rows = _canvas_rows(metrics_list, labels, addresses, zip_codes, widths)
+    bottom = CANVAS_MARGIN
+
+    c = canvas.Canvas(output, pagesize=letter, **doc_options(compact))
+    y = page_height - CANVAS_MARGIN
+
+    # Title row
+    c.setFont("Helvetica", 14)
+    c.setFillColor(colors.darkblue)
+    c.drawCentredString(page_width / 2, y - 14, COMPARISON_TITLE)
+    y -= 14 * 1.2 + 3 + 12
+
+    # Grid, repeating the header row after each page break
+    for i, row in enumerate(rows):
+        if y - row[2] < bottom:
+            c.showPage()
+            y = page_height - CANVAS_MARGIN
+            _draw_canvas_row(c, rows[0], xs, widths, y, header=True)
+            y -= rows[0][2]
+        _draw_canvas_row(c, row, xs, widths, y, header=(i == 0))
+        y -= row[2]
+    y -= 12
+
+    # Chart
+    if include_chart:
+        if n == 2:
+            chart = dual_projection_chart(metrics_list[0], metrics_list[1])
+        else:
+            chart = multi_projection_chart(metrics_list, labels)
+        if y - chart.height < bottom:
             c.showPage()
-            y = 750
-            c.setFont("Helvetica", 11)
+            y = page_height - CANVAS_MARGIN
+        renderPDF.draw(chart, c, CANVAS_MARGIN, y - chart.height)
+        y -= chart.height + 12
 
+    # Verdicts
+    for label, metrics in zip(labels, metrics_list):
+        if y - 28 < bottom:
+            c.showPage()
+            y = page_height - CANVAS_MARGIN
+        grade = metrics.get("Grade", "N/A")
+        c.setFillColor(VERDICT_COLORS.get(grade, colors.black))
+        c.setFont("Helvetica", 10)
+        c.drawString(CANVAS_MARGIN, y - 10, f"■ AI Verdict for {label}:")
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(CANVAS_MARGIN, y - 22, f"This is a {grade}-grade investment.")
+        y -= 28
+    if y - 18 < bottom:
+        c.showPage()
+        y = page_height - CANVAS_MARGIN
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica", 10)
+    c.drawString(CANVAS_MARGIN, y - 16, VERDICT_DISCLAIMER)
+
+    c.showPage()
     c.save()
+
+
+@instrumented("pdf_comparison")
+def generate_comparison_pdf(metrics_a, metrics_b, address_a="", zip_a="", address_b="", zip_b="",
+                            include_chart=True, compact=False):
+    buffer = BytesIO()
+    render_comparison_canvas(
+        buffer, [metrics_a, metrics_b],
+        addresses=[address_a, address_b],
+        zip_codes=[zip_a, zip_b],
+        include_chart=include_chart,
+        compact=compact,
+    )
     buffer.seek(0)
     return buffer
 
+
+@instrumented("pdf_comparison_batch")
+def generate_comparison_pdfs_batch(comparisons, include_chart=True, compact=False):
+    """Yield PDF bytes for each comparison dict (metrics_list, labels, addresses, zip_codes)."""
+    for comparison in comparisons:
+        buffer = BytesIO()
+        render_comparison_canvas(buffer, include_chart=include_chart, compact=compact, **comparison)
+        yield buffer.getvalue()
+
 # Existing PDF generation logic...
 
-def generate_comparison_pdf_table_style(metrics_a, metrics_b, address_a="", zip_a="", address_b="", zip_b=""):
+@instrumented("pdf_comparison_table")
+def generate_comparison_pdf_table_style(metrics_a, metrics_b, address_a="", zip_a="", address_b="", zip_b="",
+                                        include_chart=True, compact=False):
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc = SimpleDocTemplate(buffer, pagesize=letter, **doc_options(compact))
     elements = []
 
     styles = getSampleStyleSheet()
@@ -273,7 +408,7 @@ def generate_comparison_pdf_table_style(metrics_a, metrics_b, address_a="", zip_
     }
 
     # Title Row
-    title_data = [["📊 Property Comparison Summary", "", ""]]
+    title_data = [[COMPARISON_TITLE, "", ""]]
     title_table = Table(title_data, colWidths=[200, 150, 150])
     title_table.setStyle(TableStyle([
         ('SPAN', (0, 0), (-1, 0)),
@@ -285,17 +420,7 @@ def generate_comparison_pdf_table_style(metrics_a, metrics_b, address_a="", zip_
     elements.append(title_table)
 
     # Comparison Table
-    keys_to_compare = [
-        "Cap Rate (%)",
-        "Final Year ROI (%)",
-        "Cash-on-Cash Return (%)",
-        "First Year Cash Flow ($)",
-        "Monthly Mortgage ($)",
-        "Mortgage Rate (%)",            # ✅ Optional new line
-        "Mortgage Term (Years)",        # ✅ Optional new line
-        "Grade",
-        "Multi-Year Cash Flow"  # Now handled in a single place
-    ]
+    keys_to_compare = COMPARISON_KEYS
 
     table_data = [["Metric", "Property A", "Property B"]]
 
@@ -314,15 +439,8 @@ def generate_comparison_pdf_table_style(metrics_a, metrics_b, address_a="", zip_
         val_b = metrics_b.get(key, "N/A")
 
         # Format long lists
-        if isinstance(val_a, list):
-            val_a = ", ".join([str(int(x)) for x in val_a])
-        elif isinstance(val_a, float):
-            val_a = f"{val_a:.2f}"
-
-        if isinstance(val_b, list):
-            val_b = ", ".join([str(int(x)) for x in val_b])
-        elif isinstance(val_b, float):
-            val_b = f"{val_b:.2f}"
+        val_a = comparison_value(val_a)
+        val_b = comparison_value(val_b)
 
         # Use extra padding for Multi-Year Cash Flow
         if key == "Multi-Year Cash Flow":
@@ -355,10 +473,15 @@ def generate_comparison_pdf_table_style(metrics_a, metrics_b, address_a="", zip_
     elements.append(comparison_table)
     elements.append(Spacer(1, 12))
 
+    # 📈 Multi-Year Cash Flow / Rent / ROI chart (vector, no matplotlib)
+    if include_chart:
+        elements.append(dual_projection_chart(metrics_a, metrics_b))
+        elements.append(Spacer(1, 12))
+
     # Verdict Section
     grade_a = metrics_a.get("Grade", "N/A")
     grade_b = metrics_b.get("Grade", "N/A")
-    verdict_text = "(AI-generated grade based on estimated ROI, cash flow, and risk factors. Informational only.)"
+    verdict_text = VERDICT_DISCLAIMER
 
     verdicts = [
         Paragraph(f"■ AI Verdict for Property A:<br/><b>This is a {grade_a}-grade investment.</b>", verdict_styles.get(grade_a, normal_style)),
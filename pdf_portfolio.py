@@ -0,0 +1,229 @@
+import csv
+import os
+import sys
+from datetime import datetime
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from calc_engine import INPUT_FIELDS, calculate_metrics
+from pdf_single import format_display_value
+from pdf_compact import doc_options
+from instrumentation import instrumented
+import profiling
+
+# ==========================================================
+#  PORTFOLIO REPORT (ONE LINE PER PROPERTY + TOTALS)
+# ==========================================================
+#
+# Properties are consumed lazily from any iterable and drawn straight onto
+# the canvas; each page is closed with showPage() as soon as it fills, so
+# no per-property flowables or metrics dicts are kept around. Only the
+# running totals survive until the summary block at the end.
+
+PAGE_SIZE = landscape(letter)
+MARGIN = 40
+ROW_HEIGHT = 16
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONT_SIZE = 9
+
+# (header, width, value getter) — x positions are precomputed below
+COLUMNS = [
+    ("Property", 190, lambda p, m: _address(p)),
+    ("Purchase Price ($)", 90, lambda p, m: p.get("purchase_price", "N/A")),
+    ("Cap Rate (%)", 65, lambda p, m: m.get("Cap Rate (%)", "N/A")),
+    ("CoC (%)", 70, lambda p, m: m.get("Cash-on-Cash Return (%)", "N/A")),
+    ("Year 1 Cash Flow ($)", 100, lambda p, m: m.get("First Year Cash Flow ($)", "N/A")),
+    ("Final ROI (%)", 70, lambda p, m: m.get("Final Year ROI (%)", "N/A")),
+    ("IRR (%)", 55, lambda p, m: m.get("IRR (Total incl. Sale) (%)", "N/A")),
+    ("Grade", 45, lambda p, m: m.get("Grade", "N/A")),
+]
+COLUMN_X = []
+_x = MARGIN
+for _header, _width, _getter in COLUMNS:
+    COLUMN_X.append(_x)
+    _x += _width
+TABLE_WIDTH = _x - MARGIN
+
+
+def _address(property_data):
+    street = property_data.get("street_address") or property_data.get("address") or ""
+    zip_code = property_data.get("zip_code") or property_data.get("zip") or ""
+    return " ".join(str(p) for p in (street, zip_code) if p) or "N/A"
+
+
+def _fit(text, width, font=FONT, size=FONT_SIZE):
+    """Clip text with an ellipsis so it stays inside its column."""
+    text = str(text)
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + "...", font, size) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+class PortfolioTotals:
+    """Running aggregates, updated one property at a time."""
+
+    def __init__(self):
+        self.count = 0
+        self.purchase_price = 0.0
+        self.first_year_cash_flow = 0.0
+        self.monthly_mortgage = 0.0
+        self.cap_rate_sum = 0.0
+        self.coc_sum = 0.0
+        self.roi_sum = 0.0
+        self.grades = {}
+
+    def add(self, property_data, metrics):
+        self.count += 1
+        self.purchase_price += float(property_data.get("purchase_price", 0) or 0)
+        self.first_year_cash_flow += float(metrics.get("First Year Cash Flow ($)", 0) or 0)
+        self.monthly_mortgage += float(metrics.get("Monthly Mortgage ($)", 0) or 0)
+        self.cap_rate_sum += float(metrics.get("Cap Rate (%)", 0) or 0)
+        self.coc_sum += float(metrics.get("Cash-on-Cash Return (%)", 0) or 0)
+        self.roi_sum += float(metrics.get("Final Year ROI (%)", 0) or 0)
+        grade = metrics.get("Grade", "N/A")
+        self.grades[grade] = self.grades.get(grade, 0) + 1
+
+    def rows(self):
+        n = self.count or 1
+        grade_mix = ", ".join(f"{g}: {c}" for g, c in sorted(self.grades.items())) or "N/A"
+        return [
+            ("Properties", self.count),
+            ("Total Purchase Price ($)", self.purchase_price),
+            ("Total First Year Cash Flow ($)", self.first_year_cash_flow),
+            ("Total Monthly Mortgage ($)", self.monthly_mortgage),
+            ("Average Cap Rate (%)", self.cap_rate_sum / n),
+            ("Average Cash-on-Cash Return (%)", self.coc_sum / n),
+            ("Average Final Year ROI (%)", self.roi_sum / n),
+            ("Grade Mix", grade_mix),
+        ]
+
+
+class _PortfolioCanvas:
+    """Explicit page/row cursor over a ReportLab canvas."""
+
+    def __init__(self, output, title, compact=False):
+        options = {"pageCompression": 1}
+        options.update(doc_options(compact))
+        self.c = canvas.Canvas(output, pagesize=PAGE_SIZE, **options)
+        self.c.setTitle(title)
+        self.title = title
+        self.width, self.height = PAGE_SIZE
+        self.page = 0
+        self.y = None
+        self.date = datetime.now().strftime("%B %d, %Y")
+
+    def start_page(self, with_header=True):
+        self.page += 1
+        c = self.c
+        c.setFont(FONT_BOLD, 14)
+        c.setFillColor(colors.HexColor("#003366"))
+        c.drawString(MARGIN, self.height - MARGIN, self.title)
+        c.setFillColor(colors.black)
+        c.setFont(FONT, 8)
+        c.drawRightString(self.width - MARGIN, self.height - MARGIN, self.date)
+        c.drawRightString(self.width - MARGIN, MARGIN / 2, f"Page {self.page}")
+        self.y = self.height - MARGIN - 28
+        if with_header:
+            self.draw_header()
+
+    def draw_header(self):
+        c = self.c
+        c.setFillColor(colors.lightgrey)
+        c.rect(MARGIN, self.y - 4, TABLE_WIDTH, ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+        c.setFont(FONT_BOLD, FONT_SIZE)
+        for (header, width, _), x in zip(COLUMNS, COLUMN_X):
+            c.drawString(x + 2, self.y, _fit(header, width - 4, FONT_BOLD))
+        self.y -= ROW_HEIGHT
+
+    def end_page(self):
+        self.c.showPage()
+        self.y = None
+
+    def ensure_room(self, rows=1, with_header=True):
+        if self.y is None:
+            self.start_page(with_header)
+        elif self.y - rows * ROW_HEIGHT < MARGIN:
+            self.end_page()
+            self.start_page(with_header)
+
+    def draw_property(self, property_data, metrics):
+        self.ensure_room()
+        c = self.c
+        c.setFont(FONT, FONT_SIZE)
+        for (header, width, getter), x in zip(COLUMNS, COLUMN_X):
+            value = getter(property_data, metrics)
+            if header != "Property":
+                value = format_display_value(header, value)
+            c.drawString(x + 2, self.y, _fit(value, width - 4))
+        c.setStrokeColor(colors.lightgrey)
+        c.line(MARGIN, self.y - 5, MARGIN + TABLE_WIDTH, self.y - 5)
+        c.setStrokeColor(colors.black)
+        self.y -= ROW_HEIGHT
+
+    def draw_totals(self, totals):
+        rows = totals.rows()
+        self.ensure_room(len(rows) + 2, with_header=False)
+        c = self.c
+        self.y -= ROW_HEIGHT / 2
+        c.setFont(FONT_BOLD, 12)
+        c.drawString(MARGIN, self.y, "Portfolio Totals")
+        self.y -= ROW_HEIGHT + 2
+        for label, value in rows:
+            c.setFont(FONT_BOLD, FONT_SIZE)
+            c.drawString(MARGIN + 2, self.y, label)
+            c.setFont(FONT, FONT_SIZE)
+            c.drawString(MARGIN + 220, self.y, format_display_value(label, value))
+            self.y -= ROW_HEIGHT
+
+    def save(self):
+        if self.y is not None:
+            self.end_page()
+        self.c.save()
+
+
+@instrumented("pdf_portfolio")
+def generate_portfolio_pdf(properties, output, title="Portfolio Investment Summary", compact=False):
+    """Write a portfolio report to `output` (a file path or binary stream).
+
+    `properties` is any iterable of (property_data, metrics) pairs, e.g. a
+    generator over iter_portfolio_metrics(); it is consumed exactly once.
+    Returns the PortfolioTotals for the rows that were written.
+    """
+    doc = _PortfolioCanvas(output, title, compact)
+    totals = PortfolioTotals()
+
+    for property_data, metrics in properties:
+        doc.draw_property(property_data, metrics)
+        totals.add(property_data, metrics)
+
+    doc.draw_totals(totals)
+    doc.save()
+    return totals
+
+
+def iter_portfolio_metrics(rows):
+    """Lazily compute metrics for input rows (dicts keyed by INPUT_FIELDS)."""
+    for row in rows:
+        values = [float(row[k]) for k in INPUT_FIELDS]
+        values[INPUT_FIELDS.index("time_horizon")] = int(values[INPUT_FIELDS.index("time_horizon")])
+        property_data = dict(row)
+        property_data["purchase_price"] = values[0]
+        yield property_data, calculate_metrics(*values)
+
+
+if __name__ == "__main__":
+    # python pdf_portfolio.py portfolio.csv portfolio_report.pdf
+    if len(sys.argv) != 3:
+        print("Usage: python pdf_portfolio.py <portfolio.csv> <output.pdf>")
+        sys.exit(1)
+    stat = os.stat(sys.argv[1])
+    with open(sys.argv[1], newline="") as f, \
+            profiling.profiled("portfolio", (os.path.abspath(sys.argv[1]), stat.st_size, stat.st_mtime)):
+        totals = generate_portfolio_pdf(iter_portfolio_metrics(csv.DictReader(f)), sys.argv[2])
+    print(f"✅ Portfolio report written: {sys.argv[2]} ({totals.count} properties)")
@@ -5,6 +5,13 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.pdfgen import canvas
+from pdf_charts import single_projection_chart
+from pdf_compact import doc_options
+from applog import DEBUG, fields, get_logger
+from grading import SUMMARIES, grade_inputs, grade_of
+from instrumentation import instrumented
+
+log = get_logger(__name__)
 
 # ✅ Keys to skip (prevent duplicates like "10yr Cash Flow")
 skip_keys = {"10Yr Cash Flow", "10yr Cash Flow"}
@@ -49,70 +56,27 @@ def format_display_value(key, value):
 
 # ✅ Define AI Verdict function BEFORE generate_pdf
 
-def parse_numeric(value):
-    try:
-        return float(str(value).replace(",", "").strip())
-    except:
-        return 0.0
+@instrumented("verdict_single")
 def generate_ai_verdict(metrics: dict) -> tuple[str, str]:
-    print("🗝️ Available metric keys:", list(metrics.keys()))
-
-    #roi = parse_numeric(metrics.get("Final Year ROI (%)") or metrics.get("ROI (%)", 0))
-    roi = parse_numeric(metrics.get("Final Year ROI (%)"))
-    if roi == 0.0:
-        roi = parse_numeric(metrics.get("ROI (%)", 0))
-    #cash_flow = parse_numeric(metrics.get("Annual Cash Flow ($)", 0))
-    coc_return = parse_numeric(metrics.get("Cash-on-Cash Return (%)", 0))
-
-    # ✅ Use Multi-Year Cash Flow to sum total
-    raw_cash_flow = metrics.get("Multi-Year Cash Flow", [])
-    print("🧾 Raw cash flow data (before processing):", raw_cash_flow)
-
-    #print("🧾 Raw cash flow data (before processing):", raw_cash_flow)  # Debug line
+    roi, cash_flow, coc_return = grade_inputs(metrics)
 
-   # ✅ Step 1: Handle case where it's a comma-separated string
-    if isinstance(raw_cash_flow, str):
-        try:
-            raw_cash_flow = [parse_numeric(x) for x in raw_cash_flow.split(",")]
-        except:
-            raw_cash_flow = []
+    if log.isEnabledFor(DEBUG):
+        log.debug("single verdict inputs", extra=fields(
+            roi=roi, cash_flow=cash_flow, coc_return=coc_return, cash_flows=metrics.get("Multi-Year Cash Flow")))
 
-    elif isinstance(raw_cash_flow, list):
-        raw_cash_flow = [parse_numeric(x) for x in raw_cash_flow]
-    else:
-        raw_cash_flow = []
+    # Grading thresholds live in grading.GRADE_TABLE
+    grade = grade_of(roi, cash_flow, coc_return)
 
-    cash_flow = sum(raw_cash_flow)
-
-    print("🧾 Parsed cash flow list:", raw_cash_flow)
-    print(f"🧪 Debug: ROI={roi}, CashFlow={cash_flow}, CoC Return={coc_return}")
-    
-    # Sample grading logic
-    if roi > 200 and cash_flow > 20000 and coc_return >= 5:
-        grade = "A"
-        summary = "This is an A-grade investment with high returns and strong cash flow."
-    elif roi > 100 and cash_flow > 10000 and coc_return >= 0:
-        grade = "B"
-        summary = "This is a B-grade investment with solid performance and good ROI."
-    elif roi > 50 and cash_flow > 5000 and coc_return >= -5:
-        grade = "C"
-        summary = "This is a C-grade investment with modest returns."
-    elif roi > 0 and cash_flow > 0 and coc_return >= 6:
-        grade = "D"
-        summary = "This is a D-grade investment with marginal upside potential."
-    else:
-        grade = "F"
-        summary = "This is an F-grade rental with upside potential."
-
-    # ✅ Keep PDF table grade in sync with AI Verdict
+    # ✅ Keep PDF table grade in sync with AI Verdict (metrics built outside calc_engine)
     metrics["Grade"] = grade
-    return summary, grade
+    return SUMMARIES[grade], grade
 
 
 
-def generate_pdf(property_data, metrics, summary_text):
+@instrumented("pdf_single")
+def generate_pdf(property_data, metrics, summary_text, include_chart=True, compact=False):
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc = SimpleDocTemplate(buffer, pagesize=letter, **doc_options(compact))
     elements = []
     styles = getSampleStyleSheet()
 
@@ -221,6 +185,11 @@ def generate_pdf(property_data, metrics, summary_text):
     ]))
     elements.append(table_metrics)
 
+    # Multi-Year Cash Flow / Rent / ROI chart (vector, no matplotlib)
+    if include_chart and metrics.get("Multi-Year Cash Flow"):
+        elements.append(Spacer(1, 12))
+        elements.append(single_projection_chart(metrics))
+
     # Build PDF
     doc.build(elements)
     buffer.seek(0)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import (
@@ -5,12 +6,21 @@ from reportlab.platypus import (
     Paragraph,
     Spacer,
     Table,
+    LongTable,
     TableStyle,
     KeepTogether,
 )
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from datetime import datetime
+import numpy as np
+from pdf_charts import single_projection_chart
+from pdf_compact import doc_options
+from asset_cache import brand_image
+from applog import get_logger
+from instrumentation import instrumented
+
+log = get_logger(__name__)
 
 def fmt_money(v):
     try:
@@ -28,151 +38,217 @@ def fmt_pct(v):
 # ==========================================================
 #  DYNAMIC NARRATIVE ENGINE FOR AGENT PDF
 # ==========================================================
-
-def generate_dynamic_executive_summary(metrics):
-    cashflow = metrics.get("First Year Cash Flow ($)", 0)
-    coc = metrics.get("Cash-on-Cash Return (%)", 0)
-    roi = metrics.get("Final Year ROI (%)", 0)
-    grade = metrics.get("Grade", "C")
-
-    # Interpret performance tiers
-    strong_cf = cashflow > 0
-    premium_roi = roi >= 12
-    moderate_cf = -100 < cashflow < 0
-
-    # Start narrative
-    summary = ""
-
+#
+# Each narrative is a list of parts; a part reads one metric and picks the
+# first row of its tier table whose test passes (a None test is the
+# fallback). The sentence fragments of the chosen rows, joined in order,
+# are the narrative, so a tier combination always resolves to the same
+# text: narrative_text() caches it by (narrative, tier indices).
+#
+# Tests are plain comparisons that work on a scalar or on a numpy array,
+# so generate_narratives() classifies a whole batch of deals in one numpy
+# pass per part and only resolves each distinct combination once.
+
+
+def _grade_in(*grades):
+    def test(grade):
+        # One dict's grade, or a whole column of them
+        return grade in grades if isinstance(grade, str) else np.isin(grade, grades)
+    return test
+
+
+# (metric, default, ((test, fragment), ...))
+EXECUTIVE_SUMMARY = (
     # CASH FLOW ANALYSIS
-    if strong_cf:
-        summary += (
+    ("First Year Cash Flow ($)", 0, (
+        (lambda cashflow: cashflow > 0, (
             "This investment demonstrates positive and stable cash flow, indicating "
             "healthy income performance even under conservative operating assumptions. "
-        )
-    elif moderate_cf:
-        summary += (
+        )),
+        (lambda cashflow: (cashflow > -100) & (cashflow < 0), (
             "The investment presents slightly negative cash flow in the early years, "
             "but the deficit is narrow enough that modest rent growth or expense "
             "optimization can bring the property into positive territory. "
-        )
-    else:
-        summary += (
+        )),
+        (None, (
             "Current projections indicate negative cash flow, suggesting higher "
             "leverage sensitivity or an elevated expense profile. This position may "
             "still suit appreciation-focused buyers or long-term investors. "
-        )
-
+        )),
+    )),
     # ROI ANALYSIS
-    if premium_roi:
-        summary += (
+    ("Final Year ROI (%)", 0, (
+        (lambda roi: roi >= 12, (
             "The long-term return outlook is notably strong, signaling above-average value "
             "growth relative to the purchase price. "
-        )
-    elif roi >= 7:
-        summary += (
+        )),
+        (lambda roi: roi >= 7, (
             "The expected long-term return appears well-balanced, combining predictable income "
             "with steady appreciation potential. "
-        )
-    else:
-        summary += (
+        )),
+        (None, (
             "The long-term return outlook is softer, meaning future appreciation is likely to be "
             "the primary driver of value rather than monthly income. "
-        )
+        )),
+    )),
     # RISK & GRADE INTERPRETATION
-    grade_map = {
-        "A": (
-            "low-risk, high-quality opportunity suitable for both conservative and "
-            "growth-oriented buyers."
-        ),
-        "B": (
-            "strong overall profile with balanced risk and reward characteristics."
-        ),
-        "C": (
-            "moderate performance typical of mid-market investment properties."
-        ),
-        "D": (
-            "property with higher monthly costs relative to income, making it more "
-            "sensitive to financing terms and timing, and potentially better suited "
-            "for buyers with a longer hold horizon or lifestyle priorities beyond cash flow."
-        ),
-        "F": (
-            "scenario where monthly costs exceed projected income in the early years. "
-            "Best suited for buyers prioritizing long-term equity growth, future value, "
-            "or lifestyle considerations."
-        ),
-    }
-
-    #summary +=  (f" Overall, this property represents a {grade_map.get(grade, 'moderate investment profile.')}"
-
-
-    #}
-
-    summary += (
-        f" Overall, this property represents a "
-        f"{grade_map.get(grade, 'moderate investment profile.')}"
-    )             
-                 
-
-    return summary.strip()
-
-
-def generate_dynamic_agent_perspective(metrics):
-    cashflow = metrics.get("First Year Cash Flow ($)", 0)
-    roi = metrics.get("Final Year ROI (%)", 0)
-    grade = metrics.get("Grade", "C")
-
-    text = ""
+    ("Grade", "C", (
+        (_grade_in("A"), (
+            " Overall, this property represents a low-risk, high-quality opportunity suitable "
+            "for both conservative and growth-oriented buyers."
+        )),
+        (_grade_in("B"), (
+            " Overall, this property represents a strong overall profile with balanced risk "
+            "and reward characteristics."
+        )),
+        (_grade_in("C"), (
+            " Overall, this property represents a moderate performance typical of mid-market "
+            "investment properties."
+        )),
+        (_grade_in("D"), (
+            " Overall, this property represents a property with higher monthly costs relative "
+            "to income, making it more sensitive to financing terms and timing, and potentially "
+            "better suited for buyers with a longer hold horizon or lifestyle priorities beyond cash flow."
+        )),
+        (_grade_in("F"), (
+            " Overall, this property represents a scenario where monthly costs exceed projected "
+            "income in the early years. Best suited for buyers prioritizing long-term equity growth, "
+            "future value, or lifestyle considerations."
+        )),
+        (None, " Overall, this property represents a moderate investment profile."),
+    )),
+)
 
+AGENT_PERSPECTIVE = (
     # PERFORMANCE POSITIONING
-    if cashflow > 0:
-        text += (
+    ("First Year Cash Flow ($)", 0, (
+        (lambda cashflow: cashflow > 0, (
             "Based on the current assumptions, this property projects positive cash flow, "
             "which can support a more income-oriented strategy from day one. "
-        )
-    elif cashflow > -150:
-        text += (
+        )),
+        (lambda cashflow: cashflow > -150, (
             "Based on the current assumptions, this property is close to break-even cash flow. "
             "That typically means the outcome depends more on time horizon, rent growth, and cost control "
             "than immediate monthly income. "
-        )
-    else:
-        text += (
+        )),
+        (None, (
             "Based on the current assumptions, this property starts cash-flow negative, "
             "so the outcome is more dependent on long-term appreciation and rent growth than near-term income. "
-        )
-
+        )),
+    )),
     # RETURN PROFILE (client - facing)
-    if roi >= 12:
-        text += (
+    ("Final Year ROI (%)", 0, (
+        (lambda roi: roi >= 12, (
             "The ROI profile is especially compelling for long-horizon investors seeking "
             "predictable compounding returns. "
-        )
-    elif roi >= 7:
-        text += (
+        )),
+        (lambda roi: roi >= 7, (
             "With balanced ROI performance, this deal is appropriate for clients looking "
             "to strengthen their portfolio with steady, inflation-resilient returns. "
-        )
-    else:
-        text += (
+        )),
+        (None, (
             "Given the softer ROI, this property may work best as a land-banking or "
             "appreciation-driven position rather than a cash-flow engine. "
-        )
-
+        )),
+    )),
     # GRADE INTERPRETATION
-    if grade in ("A", "B"):
-        text += (
+    ("Grade", "C", (
+        (_grade_in("A", "B"), (
             " Overall, the risk/return profile appears relatively favorable compared to many comparable scenarios."
-        )
-    elif grade in ("C", "D"):
-        text += (
-            " Overall, the risk/return profile looks mixed, so it may be worth reviewing assumptions like rent, expenses, and financing."
-        )
-    else:
-        text += (
-            " Overall, this scenario appears higher-risk under the current assumptions, so it may be worth stress-testing rent, expenses, and financing inputs."
-        )
+        )),
+        (_grade_in("C", "D"), (
+            " Overall, the risk/return profile looks mixed, so it may be worth reviewing assumptions like rent, "
+            "expenses, and financing."
+        )),
+        (None, (
+            " Overall, this scenario appears higher-risk under the current assumptions, so it may be worth "
+            "stress-testing rent, expenses, and financing inputs."
+        )),
+    )),
+)
 
-    return text.strip()
+NARRATIVES = {
+    "executive_summary": EXECUTIVE_SUMMARY,
+    "agent_perspective": AGENT_PERSPECTIVE,
+}
+
+
+def _first_row(rows, value):
+    for i, (test, _) in enumerate(rows):
+        if test is None or test(value):
+            return i
+    return len(rows) - 1
+
+
+def narrative_tiers(name, metrics):
+    """Row index chosen in each part of a narrative, for one metrics dict."""
+    return tuple(_first_row(rows, metrics.get(key, default)) for key, default, rows in NARRATIVES[name])
+
+
+def narrative_tiers_batch(name, columns):
+    """(deals, parts) array of row indices; columns maps each metric to an array."""
+    parts = []
+    for key, _, rows in NARRATIVES[name]:
+        values = np.asarray(columns[key])
+        chosen = np.full(values.shape, len(rows) - 1)
+        # Last row first, so earlier rows win where several tests pass
+        for i in range(len(rows) - 1, -1, -1):
+            test = rows[i][0]
+            if test is not None:
+                chosen = np.where(test(values), i, chosen)
+        parts.append(chosen)
+    return np.stack(parts, axis=-1)
+
+
+@lru_cache(maxsize=None)
+def narrative_text(name, tiers):
+    """Resolved text for one tier combination."""
+    return "".join(rows[i][1] for (_, _, rows), i in zip(NARRATIVES[name], tiers)).strip()
+
+
+@lru_cache(maxsize=None)
+def _narrative_lookup(name):
+    # Every tier combination's text, flat in np.ravel_multi_index order
+    shape = tuple(len(rows) for _, _, rows in NARRATIVES[name])
+    return shape, np.array([narrative_text(name, tiers) for tiers in np.ndindex(shape)], dtype=object)
+
+
+def generate_narratives(name, metrics_list):
+    """[narrative text for m in metrics_list], classified in one pass per part."""
+    if not metrics_list:
+        return []
+    columns = {}
+    for key, default, _ in NARRATIVES[name]:
+        values = [m.get(key, default) for m in metrics_list]
+        # Missing numbers become NaN and fall through to the fallback row
+        columns[key] = np.array(values, dtype=str if isinstance(default, str) else float)
+    shape, texts = _narrative_lookup(name)
+    return texts[np.ravel_multi_index(narrative_tiers_batch(name, columns).T, shape)].tolist()
+
+
+def generate_dynamic_executive_summary(metrics):
+    return narrative_text("executive_summary", narrative_tiers("executive_summary", metrics))
+
+
+def generate_dynamic_agent_perspective(metrics):
+    return narrative_text("agent_perspective", narrative_tiers("agent_perspective", metrics))
+
+
+# Single-upgrade sentence per PAYBACK_TIERS tier
+IMPROVEMENT_PAYBACK_TEXT = {
+    "strong": (
+        "This produces a strong payback period of approximately {payback:.1f} years, "
+        "making it a high-value enhancement for both ROI and long-term cash flow. "
+    ),
+    "mid": (
+        "The resulting payback period of roughly {payback:.1f} years positions this "
+        "upgrade as a reasonable mid-term value-add opportunity. "
+    ),
+    "long": (
+        "With a payback period near {payback:.1f} years, this upgrade is best suited "
+        "for buyers prioritizing long-term appreciation rather than short-term income gains. "
+    ),
+}
 
 
 def generate_dynamic_improvement_commentary(improvement_cost, improvement_rent_impact, metrics):
@@ -187,22 +263,7 @@ def generate_dynamic_improvement_commentary(improvement_cost, improvement_rent_i
         f"The proposed upgrade requires an investment of ${improvement_cost:,.0f} "
         f"and yields an estimated rent increase of ${improvement_rent_impact:,.0f} per month. "
     )
-
-    if payback <= 3:
-        text += (
-            f"This produces a strong payback period of approximately {payback:.1f} years, "
-            "making it a high-value enhancement for both ROI and long-term cash flow. "
-        )
-    elif payback <= 5:
-        text += (
-            f"The resulting payback period of roughly {payback:.1f} years positions this "
-            "upgrade as a reasonable mid-term value-add opportunity. "
-        )
-    else:
-        text += (
-            f"With a payback period near {payback:.1f} years, this upgrade is best suited "
-            "for buyers prioritizing long-term appreciation rather than short-term income gains. "
-        )
+    text += IMPROVEMENT_PAYBACK_TEXT[payback_tier(payback)].format(payback=payback)
 
     roi = metrics.get("Expected Annual Return", None)
     if roi is not None:
@@ -218,9 +279,121 @@ def generate_dynamic_improvement_commentary(improvement_cost, improvement_rent_i
     return text.strip()
 
 
+# ==========================================================
+#  IMPROVEMENT ROWS + TIERED COMMENTARY
+# ==========================================================
+
+# Estimated monthly rent lift = cost / 65 (the "65x rule")
+RENT_IMPACT_DIVISOR = 65
+# Fixed height for single-line improvement rows (10pt font + padding)
+IMPROVEMENT_ROW_HEIGHT = 18
+
+# Printed size (points) of the optional branding images
+LOGO_BOX = (160, 50)
+HEADSHOT_BOX = (64, 64)
+
+# (tier, max payback years, commentary) — evaluated in order
+PAYBACK_TIERS = [
+    ("strong", 3, (
+        "a strong payback period of approximately {payback:.1f} years, "
+        "making them high-value enhancements for both ROI and long-term cash flow."
+    )),
+    ("mid", 5, (
+        "a payback period of roughly {payback:.1f} years, positioning them "
+        "as reasonable mid-term value-add opportunities."
+    )),
+    ("long", None, (
+        "a payback period near {payback:.1f} years, so they are best suited "
+        "for buyers prioritizing long-term appreciation rather than short-term income gains."
+    )),
+]
+
+
+def estimate_rent_impact(cost):
+    return round(cost / RENT_IMPACT_DIVISOR) if cost > 0 else 0
+
+
+def improvement_rows(improvements_list):
+    """Normalize improvement records to (name, cost, est_rent) tuples."""
+    rows = []
+    for imp in improvements_list:
+        name = str(imp.get("Description", ""))
+        cost = float(imp.get("Amount ($)", 0) or 0)
+        rows.append((name, cost, estimate_rent_impact(cost)))
+    return rows
+
+
+# Upper payback bound of each tier but the last (ascending)
+PAYBACK_LIMITS = [max_years for _, max_years, _ in PAYBACK_TIERS if max_years is not None]
+
+
+def payback_tier(payback):
+    for tier, max_years, _ in PAYBACK_TIERS:
+        if max_years is None or payback <= max_years:
+            return tier
+    return PAYBACK_TIERS[-1][0]
+
+
+def payback_tiers(paybacks):
+    """Index into PAYBACK_TIERS for an array of payback periods."""
+    return np.searchsorted(PAYBACK_LIMITS, paybacks, side="left")
+
+
+def summarize_improvement_commentary(rows, metrics):
+    """Return one commentary paragraph per payback tier.
+
+    A single improvement keeps the original per-item sentence; larger
+    plans are grouped so the text stays a few lines long no matter how
+    many rows were entered.
+    """
+    valid = [(name, cost, rent) for name, cost, rent in rows if cost > 0 and rent > 0]
+    if not valid:
+        return ["No improvement scenario provided."]
+    if len(valid) == 1:
+        _, cost, rent = valid[0]
+        return [generate_dynamic_improvement_commentary(cost, rent, metrics)]
+
+    costs = np.array([cost for _, cost, _ in valid], dtype=float)
+    rents = np.array([rent for _, _, rent in valid], dtype=float)
+    tiers = payback_tiers(costs / (rents * 12))
+    size = len(PAYBACK_TIERS)
+    groups = {
+        PAYBACK_TIERS[i][0]: group
+        for i, group in enumerate(zip(np.bincount(tiers, minlength=size).tolist(),
+                                      np.bincount(tiers, weights=costs, minlength=size).tolist(),
+                                      np.bincount(tiers, weights=rents, minlength=size).tolist()))
+        if group[0]
+    }
+
+    comments = []
+    for tier, _, template in PAYBACK_TIERS:
+        if tier not in groups:
+            continue
+        count, total_cost, total_rent = groups[tier]
+        payback = total_cost / (total_rent * 12)
+        comments.append(
+            f"{count} upgrades totaling ${total_cost:,.0f} add an estimated "
+            f"${total_rent:,.0f} per month combined, with "
+            + template.format(payback=payback)
+        )
+
+    roi = metrics.get("Expected Annual Return", None)
+    if roi is not None:
+        try:
+            comments[-1] += (
+                f" Relative to the property's projected {float(roi):.1f}% long-term ROI, "
+                "this improvement plan can shift the investment profile meaningfully for value-add buyers."
+            )
+        except (TypeError, ValueError):
+            pass
+
+    return comments
+
+
 # ==============================================
 #  MAIN PDF GENERATOR (NO ICONS)
 # ==============================================
+@instrumented("pdf_agent")
 def generate_pdf(
     property_data: dict,
     metrics: dict,
@@ -230,10 +403,14 @@ def generate_pdf(
     client_name: str,
     agent_notes: str = "",
     improvements_list=None,
+    include_chart=True,
+    compact=False,
+    logo_image=None,
+    headshot_image=None,
 ):
-    print("🔥 USING pdf_single_agent.py (dynamic, icon-free version)")
+    log.debug("building agent report for %s", client_name)
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    doc = SimpleDocTemplate(buffer, pagesize=letter, **doc_options(compact))
     elements = []
     styles = getSampleStyleSheet()
 
@@ -282,6 +459,23 @@ def generate_pdf(
         spaceBefore=8,
     )
 
+    # ---------------------------------------
+    # BRANDING (OPTIONAL LOGO + HEADSHOT, CACHED AT PRINT SIZE)
+    # ---------------------------------------
+    logo = brand_image(logo_image, *LOGO_BOX, hAlign="LEFT")
+    headshot = brand_image(headshot_image, *HEADSHOT_BOX, hAlign="RIGHT")
+    if logo or headshot:
+        branding = Table([[logo or "", headshot or ""]], colWidths=[300, 160])
+        branding.setStyle(TableStyle([
+            ("ALIGN", (0, 0), (0, 0), "LEFT"),
+            ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ]))
+        elements.append(branding)
+        elements.append(Spacer(1, 8))
+
     # ---------------------------------------
     # TITLE + HEADER
     # ---------------------------------------
@@ -403,6 +597,11 @@ def generate_pdf(
     elements.append(table)
     elements.append(Spacer(1, 10))
 
+    # Multi-Year Cash Flow / Rent / ROI chart (vector, no matplotlib)
+    if include_chart and metrics.get("Multi-Year Cash Flow"):
+        elements.append(single_projection_chart(metrics))
+        elements.append(Spacer(1, 6))
+
     # ---------------------------------------
     # AGENT PERSPECTIVE (DYNAMIC WITH OVERRIDE)
     # ---------------------------------------
@@ -413,7 +612,7 @@ def generate_pdf(
     elements.append(Paragraph(agent_text, body_style))
     
     # ---------------------------------------
-    # OPTIONAL IMPROVEMENTS (MULTI-ROW TABLE + DYNAMIC COMMENT)
+    # OPTIONAL IMPROVEMENTS (LONG TABLE + TIERED COMMENT)
     # ---------------------------------------
     if improvements_list and len(improvements_list) > 0:
 
@@ -423,44 +622,39 @@ def generate_pdf(
         table_data = [["Upgrade", "Cost", "Est. Monthly Rent Impact"]]
 
         # Add one row per improvement
-        for imp in improvements_list:
-            name = str(imp.get("Description", ""))
-            cost = float(imp.get("Amount ($)", 0) or 0)
-
-            # Preserve 65× rule
-            est_rent = round(cost / 65) if cost > 0 else 0
-
+        rows = improvement_rows(improvements_list)
+        for name, cost, est_rent in rows:
             table_data.append([
                 name,
                 f"${cost:,.0f}",
                 f"+${est_rent:,.0f}",
             ])
 
-        improv_table = Table(table_data, colWidths=[170, 110, 160])
+        # LongTable + fixed row heights keeps page splitting linear for
+        # long capital plans; the header row repeats on every page.
+        improv_table = LongTable(
+            table_data,
+            colWidths=[170, 110, 160],
+            rowHeights=IMPROVEMENT_ROW_HEIGHT,
+            repeatRows=1,
+        )
         improv_table.setStyle(TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
             ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
             ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
             ("ALIGN", (0, 1), (-1, -1), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
             ("FONTSIZE", (0, 0), (-1, -1), 10),
         ]))
 
         elements.append(improv_table)
         elements.append(Spacer(1, 8))
 
-        # Combine commentary
-        commentary_parts = []
-        for imp in improvements_list:
-            cost = float(imp.get("Amount ($)", 0) or 0)
-            est_rent = round(cost / 65) if cost > 0 else 0
-
-            commentary_parts.append(
-                generate_dynamic_improvement_commentary(cost, est_rent, metrics)
-            )
-
-        final_comment = " ".join(commentary_parts)
-        elements.append(Paragraph(final_comment, body_style))
-        elements.append(Spacer(1, 8))
+        # One paragraph per payback tier instead of one sentence per row
+        for comment in summarize_improvement_commentary(rows, metrics):
+            elements.append(Paragraph(comment, body_style))
+            elements.append(Spacer(1, 4))
+        elements.append(Spacer(1, 4))
     
     # ---------------------------------------
     # DISCLAIMER (SHORT, 1 LINE, NO EMOJI)
@@ -0,0 +1,263 @@
+import argparse
+import cProfile
+import hashlib
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from applog import get_logger
+
+log = get_logger(__name__)
+
+# ==========================================================
+#  OPT-IN PROFILING OF PAGE RERUNS AND BATCH JOBS
+# ==========================================================
+#
+# Off unless PROFILE_RATE is set. Then a sampled share of full page
+# reruns (and every batch job run: mail merge, portfolio report) runs under
+# cProfile and leaves, in PROFILE_DIR:
+#   <timestamp>_<name>_<input key>.prof   load with pstats / snakeviz
+#   <timestamp>_<name>_<input key>.txt    time per app component, top N
+#                                         app functions and top N overall
+#   index.jsonl                           one line per profile, to find
+#                                         the runs for given inputs
+# The input key is a short hash of the calculation inputs, so a report of
+# "slow with these numbers" maps to its profiles.
+#
+#     PROFILE_RATE=0.1        profile 1 in 10 reruns (1 = every rerun)
+#     PROFILE_DIR=profiles
+#     PROFILE_TOP=25          functions in the text summary
+#
+# Disabled, start() returns None after one attribute check and stop(None)
+# returns immediately. cProfile sees one thread, so only one run per
+# process is profiled at a time; overlapping reruns are skipped. A rerun
+# that never reached stop() (st.stop(), an interrupted or failed script)
+# is dropped once its thread has ended.
+#
+#     python profiling.py top [--key KEY] [--name NAME]   merge matching profiles
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+RATE = float(os.getenv("PROFILE_RATE", "0") or 0)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+TOP_N = int(os.getenv("PROFILE_TOP", "25"))
+
+# Files of each app component, for the per-component times in summaries
+COMPONENTS = {
+    "calc": ("calc_engine.py",),
+    "pdf": ("pdf_single.py", "pdf_single_agent.py", "pdf_dual.py", "pdf_portfolio.py", "pdf_compact.py"),
+    "charts": ("charts.py", "pdf_charts.py"),
+    "email": ("email_queue.py",),
+}
+
+_seen = itertools.count()
+_active = threading.Lock()
+_current = None
+skipped = 0
+
+
+def input_key(inputs):
+    """Short stable hash of a run's calculation inputs."""
+    return hashlib.sha1(repr(inputs).encode()).hexdigest()[:12]
+
+
+class ProfileRun:
+    def __init__(self, name):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.thread = threading.current_thread()
+        self.started = time.time()
+        self.start = time.perf_counter()
+
+
+def start(name, rate=None):
+    """Begin profiling one run of `name` if sampled; returns the run or None."""
+    global skipped, _current
+    rate = RATE if rate is None else rate
+    if rate <= 0:
+        return None
+    every = max(1, round(1 / rate))
+    if next(_seen) % every:
+        return None
+    if not _active.acquire(blocking=False):
+        stale = _current
+        if stale is None or stale.thread.is_alive():
+            skipped += 1
+            return None
+        _current = None
+        stale.profile.disable()
+        _active.release()
+        if not _active.acquire(blocking=False):
+            skipped += 1
+            return None
+    run = ProfileRun(name)
+    try:
+        run.profile.enable()
+    except ValueError:
+        # Another profiler (a debugger, an outer cProfile) owns the hook
+        _active.release()
+        skipped += 1
+        return None
+    _current = run
+    return run
+
+
+def stop(run, inputs=None, directory=None):
+    """Finish `run` and write its files; returns the .prof path or None."""
+    global _current
+    if run is None or run is not _current:
+        return None
+    try:
+        run.profile.disable()
+    finally:
+        _current = None
+        _active.release()
+    wall = time.perf_counter() - run.start
+    try:
+        return write_profile(run.profile, run.name, input_key(inputs) if inputs is not None else "-",
+                             wall, run.started, directory or PROFILE_DIR)
+    except OSError as e:
+        # A full disk or bad PROFILE_DIR must not break the page
+        log.warning("Could not write profile for %s: %s", run.name, e)
+        return None
+
+
+@contextmanager
+def _profiled(name, inputs, rate):
+    run = start(name, rate)
+    try:
+        yield run
+    finally:
+        stop(run, inputs)
+
+
+def profiled(name, inputs=None, rate=None):
+    """Context manager profiling one run of a batch job."""
+    if (RATE if rate is None else rate) <= 0:
+        return nullcontext()
+    return _profiled(name, inputs, rate)
+
+
+# ==========================================================
+#  SUMMARIES
+# ==========================================================
+
+def component_times(stats):
+    """{component: inclusive seconds} from a pstats.Stats.
+
+    Time is counted where a call enters the component from outside it:
+    callers that are in the component, or run inside it (directly or via
+    other modules, e.g. charts -> result_cache -> charts), don't add more.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    out = {}
+    for component, files in COMPONENTS.items():
+        members = [func for func in stats.stats if os.path.basename(func[0]) in files]
+        # Everything that runs inside the component
+        within, todo = set(members), list(members)
+        while todo:
+            for callee in callees.get(todo.pop(), ()):
+                if callee not in within:
+                    within.add(callee)
+                    todo.append(callee)
+        total = 0.0
+        for func in members:
+            _, _, _, cumulative, callers = stats.stats[func]
+            if not callers:
+                total += cumulative
+            total += sum(timing[3] for caller, timing in callers.items() if caller not in within)
+        out[component] = total
+    return out
+
+
+def summary_text(stats, title, top=TOP_N):
+    out = io.StringIO()
+    out.write(f"{title}\n\ninclusive time per component (nested calls count in both):\n")
+    for component, seconds in component_times(stats).items():
+        out.write(f"  {component:<8} {seconds * 1000:>10.1f} ms\n")
+    stats.stream = out
+    stats.sort_stats("cumulative")
+    out.write("\napp functions:")
+    stats.print_stats(re.escape(ROOT + os.sep), top)
+    out.write("\nall functions:")
+    stats.print_stats(top)
+    return out.getvalue()
+
+
+def write_profile(profile, name, key, wall, started, directory):
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started)) + f"-{int(started * 1000) % 1000:03d}"
+    base = os.path.join(directory, f"{stamp}_{name}_{key}")
+    profile.dump_stats(base + ".prof")
+
+    stats = pstats.Stats(base + ".prof")
+    with open(base + ".txt", "w") as f:
+        f.write(summary_text(stats, f"{name}  key={key}  wall={wall * 1000:.1f} ms  {stamp}"))
+    entry = {
+        "file": os.path.basename(base) + ".prof", "name": name, "key": key, "time": started,
+        "wall_ms": round(wall * 1000, 1),
+        "components_ms": {c: round(s * 1000, 1) for c, s in component_times(stats).items()},
+    }
+    with open(os.path.join(directory, "index.jsonl"), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    return base + ".prof"
+
+
+def read_index(directory=PROFILE_DIR):
+    path = os.path.join(directory, "index.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def merged_summary(directory=PROFILE_DIR, key=None, name=None, top=TOP_N):
+    """Top-N over every profile matching key / name, or None if none match."""
+    entries = [e for e in read_index(directory)
+               if (key is None or e["key"] == key) and (name is None or e["name"] == name)]
+    paths = [os.path.join(directory, e["file"]) for e in entries]
+    paths = [p for p in paths if os.path.exists(p)]
+    if not paths:
+        return None
+    stats = pstats.Stats(*paths)
+    wall = sum(e["wall_ms"] for e in entries)
+    return summary_text(stats, f"{len(paths)} profile(s)  key={key or '*'}  name={name or '*'}  "
+                               f"wall={wall:.1f} ms", top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize profiles written with PROFILE_RATE set.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    top = sub.add_parser("top", help="merged top-N over matching profiles")
+    top.add_argument("--dir", default=PROFILE_DIR)
+    top.add_argument("--key", help="input key (see index.jsonl)")
+    top.add_argument("--name", help="page or job name")
+    top.add_argument("--top", type=int, default=TOP_N)
+    sub.add_parser("index", help="list recorded profiles").add_argument("--dir", default=PROFILE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "index":
+        for e in read_index(args.dir):
+            parts = " ".join(f"{c}={ms:.0f}" for c, ms in e["components_ms"].items())
+            print(f"{e['file']:<60} {e['wall_ms']:>9.1f} ms  {parts}")
+        return 0
+    text = merged_summary(args.dir, args.key, args.name, args.top)
+    if text is None:
+        print("No matching profiles.")
+        return 1
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+import contextvars
+import copy
+import hashlib
+import numbers
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+# ==========================================================
+#  SERVER-WIDE RESULT CACHE (SHARED BY ALL SESSIONS)
+# ==========================================================
+#
+# Agents often evaluate the same listing with the same defaults, so metrics,
+# verdicts, chart images and rendered PDFs are cached once per server
+# process instead of once per session.
+#   - Keys are hashes of *normalized* inputs: 300000 and 300000.0 match,
+#     floats are rounded, strings stripped, dicts order-independent and
+#     uploaded bytes reduced to a digest.
+#   - Each cache is an LRU bounded by approximate bytes.
+#   - Concurrent misses on the same key wait for the first computation
+#     ("single flight"), so N identical requests cost one computation.
+#   - Values are stored immutable-ish: metrics are deep-copied on the way
+#     out (pages add keys to them), PDFs are kept as bytes and handed out
+#     as fresh BytesIO objects. Chart images are cached by charts.py.
+#   - Per-session budget: entries a session computes or reads are charged
+#     to it (current_session, set by page_state for each rerun / fragment).
+#     Past SESSION_CACHE_MB, the session's least recently used entries that
+#     no other session uses are evicted, so one agent sweeping hundreds of
+#     scenarios can't push everyone else's PDFs and charts out.
+
+FLOAT_DIGITS = 6
+SESSION_CACHE_BYTES = int(float(os.getenv("SESSION_CACHE_MB", "48")) * 1024 * 1024)
+
+# Owner (session id) of the work on this thread / context; None for
+# background workers, batch tools and tests
+current_session = contextvars.ContextVar("current_session", default=None)
+
+
+def normalize(value):
+    """Canonical, hashable form of a cache key input."""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, numbers.Number):
+        return round(float(value), FLOAT_DIGITS) + 0.0   # + 0.0 turns -0.0 into 0.0
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "sha256:" + hashlib.sha256(value).hexdigest()
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(v) for v in value)
+    if hasattr(value, "getvalue"):
+        return normalize(value.getvalue())
+    if hasattr(value, "tolist"):   # numpy arrays / scalars
+        return normalize(value.tolist())
+    return repr(value)
+
+
+def make_key(*parts):
+    return hashlib.sha256(repr(normalize(parts)).encode()).hexdigest()
+
+
+def approx_size(value):
+    """Rough in-memory size of a cached value, in bytes."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + 33
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class SessionBudget:
+    """Bytes of cached entries charged to each session, capped per session.
+
+    An entry used by several sessions counts fully against each of them;
+    going over budget drops the session's oldest entries from its share and
+    evicts those nobody else holds.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sessions = {}   # owner -> OrderedDict((cache, key) -> size), oldest first
+        self._bytes = {}      # owner -> charged bytes
+        self._holders = {}    # (cache, key) -> owners
+        self.evictions = 0
+
+    def charge(self, owner, cache, key, size):
+        """Record that `owner` used `key`; returns [(cache, key)] to evict."""
+        item = (cache, key)
+        victims = []
+        with self._lock:
+            entries = self._sessions.setdefault(owner, OrderedDict())
+            if item in entries:
+                entries.move_to_end(item)
+                return victims
+            entries[item] = size
+            self._bytes[owner] = self._bytes.get(owner, 0) + size
+            self._holders.setdefault(item, set()).add(owner)
+            while self._bytes[owner] > self.max_bytes and len(entries) > 1:
+                old, old_size = entries.popitem(last=False)
+                self._bytes[owner] -= old_size
+                holders = self._holders[old]
+                holders.discard(owner)
+                if not holders:
+                    del self._holders[old]
+                    victims.append(old)
+            self.evictions += len(victims)
+        return victims
+
+    def forget(self, cache, keys):
+        """Entries that left `cache` no longer count against anyone."""
+        with self._lock:
+            for key in keys:
+                for owner in self._holders.pop((cache, key), ()):
+                    entries = self._sessions[owner]
+                    self._bytes[owner] -= entries.pop((cache, key))
+                    if not entries:
+                        del self._sessions[owner], self._bytes[owner]
+
+    def usage(self):
+        """[{"session", "entries", "bytes"}], largest first."""
+        with self._lock:
+            rows = [{"session": owner, "entries": len(entries), "bytes": self._bytes[owner]}
+                    for owner, entries in self._sessions.items()]
+        return sorted(rows, key=lambda row: -row["bytes"])
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._bytes.clear()
+            self._holders.clear()
+
+
+class ResultCache:
+    """Thread-safe, byte-bounded LRU with single-flight computation."""
+
+    def __init__(self, name, max_bytes, budget=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.budget = budget
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._inflight = {}             # key -> threading.Event
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.prefilled = 0
+        self.compute_seconds = 0.0
+
+    def get_or_compute(self, key, compute):
+        """Cached value for `key`, computing it (once) on a miss.
+
+        A compute() that returns None is not cached.
+        """
+        waited = False
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    if not waited:
+                        self.hits += 1
+                    break
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    if not waited:
+                        self.misses += 1
+                    break
+                if not waited:
+                    self.coalesced += 1
+                waited = True
+            # Someone else is computing this key; use their result (or take
+            # over if they failed)
+            event.wait()
+
+        if entry is not None:
+            self._charge(key, entry[1])
+            return entry[0]
+
+        start = time.perf_counter()
+        try:
+            value = compute()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.compute_seconds += elapsed
+                del self._inflight[key]
+            event.set()
+
+        if value is not None:
+            self._charge(key, self._store(key, value))
+        return value
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def prefill(self, key, value):
+        """Store a value computed ahead of time (not counted as a lookup)."""
+        if value is not None:
+            self._store(key, value)
+            with self._lock:
+                self.prefilled += 1
+
+    def _store(self, key, value):
+        """Insert `value`; returns its size if it is (now) cached, else None."""
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return None
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                old_key, (_, old_size) = self._entries.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_key)
+        if evicted and self.budget is not None:
+            self.budget.forget(self, evicted)
+        return size
+
+    def _charge(self, key, size):
+        owner = current_session.get()
+        if owner is None or size is None or self.budget is None:
+            return
+        for cache, victim in self.budget.charge(owner, self, key, size):
+            cache.discard(victim)
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+                self.evictions += 1
+        if entry is not None and self.budget is not None:
+            self.budget.forget(self, [key])
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+        if self.budget is not None:
+            self.budget.forget(self, keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "cache": self.name,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "prefilled": self.prefilled,
+                "compute_seconds": self.compute_seconds,
+            }
+
+
+session_budget = SessionBudget(SESSION_CACHE_BYTES)
+
+metrics_cache = ResultCache("metrics", 16 * 1024 * 1024, session_budget)
+verdict_cache = ResultCache("verdicts", 4 * 1024 * 1024, session_budget)
+chart_cache = ResultCache("charts", 64 * 1024 * 1024, session_budget)
+pdf_cache = ResultCache("pdfs", 128 * 1024 * 1024, session_budget)
+
+CACHES = [metrics_cache, verdict_cache, chart_cache, pdf_cache]
+
+
+def shared_metrics(*inputs):
+    """calculate_metrics(*inputs), computed once per distinct input set."""
+    from calc_engine import calculate_metrics   # lazy: numpy_financial & co.
+
+    metrics = metrics_cache.get_or_compute(
+        make_key("calculate_metrics", inputs), lambda: calculate_metrics(*inputs))
+    return copy.deepcopy(metrics)
+
+
+def shared_verdict(verdict_fn, *metrics):
+    """verdict_fn(*metrics) (pdf_single / pdf_dual generate_ai_verdict)."""
+    key = make_key(verdict_fn.__module__, verdict_fn.__name__, metrics)
+    return verdict_cache.get_or_compute(key, lambda: verdict_fn(*metrics))
+
+
+def shared_pdf(kind, deps, build):
+    """BytesIO for a rendered PDF; build() returns a BytesIO, bytes or None."""
+    def render():
+        pdf = build()
+        if pdf is None:
+            return None
+        return pdf.getvalue() if hasattr(pdf, "getvalue") else bytes(pdf)
+
+    data = pdf_cache.get_or_compute(make_key("pdf", kind, deps), render)
+    return BytesIO(data) if data is not None else None
+
+
+def cache_stats():
+    return [cache.stats() for cache in CACHES]
+
+
+def clear_all():
+    for cache in CACHES:
+        cache.clear()
@@ -0,0 +1,141 @@
+import socketserver
+import sys
+import threading
+import time
+from email import message_from_bytes, policy
+
+# ==========================================================
+#  LOCAL STAND-IN SMTP SERVER (TESTS / BENCHMARKS)
+# ==========================================================
+#
+# Just enough SMTP to exercise the email queue without a real mail server:
+# EHLO/HELO, AUTH (any credentials), MAIL/RCPT/DATA, RSET, NOOP, QUIT.
+# No STARTTLS, so point the app at it with EMAIL_STARTTLS=0.
+# Received messages are kept in memory; failures and latency can be
+# injected to test retries and reconnects.
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost SMTP stub ready")
+        mail_from, rcpts = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            cmd = line[:4].upper()
+
+            if cmd in ("EHLO", "HELO"):
+                if cmd == "EHLO":
+                    self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n")
+                self.reply("250 OK")
+            elif cmd == "AUTH":
+                with server.lock:
+                    server.logins += 1
+                self.reply("235 Authentication successful")
+            elif cmd == "MAIL":
+                mail_from, rcpts = line[10:].strip(), []
+                self.reply("250 OK")
+            elif cmd == "RCPT":
+                rcpts.append(line[8:].strip().strip("<>"))
+                self.reply("250 OK")
+            elif cmd == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                if server.delay:
+                    time.sleep(server.delay)
+                with server.lock:
+                    if server.fail_next > 0:
+                        server.fail_next -= 1
+                        self.reply("451 Temporary failure, try again")
+                        continue
+                    if server.drop_next > 0:
+                        server.drop_next -= 1
+                        return  # hang up mid-transaction
+                    server.messages.append((mail_from, rcpts, b"".join(data)))
+                self.reply("250 OK queued")
+            elif cmd == "RSET":
+                mail_from, rcpts = None, []
+                self.reply("250 OK")
+            elif cmd == "NOOP":
+                self.reply("250 OK")
+            elif cmd == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPStubServer(socketserver.ThreadingTCPServer):
+    """In-process SMTP server on 127.0.0.1; use as a context manager."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0):
+        super().__init__((host, port), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.delay = delay
+        self.fail_next = 0   # reply 451 to the next N messages
+        self.drop_next = 0   # drop the connection on the next N messages
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def settings(self, **overrides):
+        """Keyword arguments for SMTPSettings pointing at this server."""
+        options = dict(host="127.0.0.1", port=self.port, user="stub", password="stub", starttls=False)
+        options.update(overrides)
+        return options
+
+    def parsed_messages(self):
+        with self.lock:
+            return [message_from_bytes(data, policy=policy.default) for _, _, data in self.messages]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # python smtp_stub.py [port]  →  then run the app with
+    # EMAIL_HOST=127.0.0.1 EMAIL_PORT=<port> EMAIL_STARTTLS=0
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 2525
+    server = SMTPStubServer(port=port)
+    print(f"📬 SMTP stub listening on 127.0.0.1:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📬 {len(server.messages)} message(s) received over {server.connections} connection(s)")
+        server.server_close()
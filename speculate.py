@@ -0,0 +1,203 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from applog import get_logger
+from calc_engine import INPUT_FIELDS, calculate_metrics_batch
+from result_cache import metrics_cache, make_key
+
+log = get_logger(__name__)
+
+# ==========================================================
+#  SPECULATIVE METRICS FOR NEIGHBORING SLIDER POSITIONS
+# ==========================================================
+#
+# People mostly step one slider at a time (rate ±0.1, horizon ±1, down
+# payment ±1). After each rerun a page hands the inputs it just used to
+# speculate(); a background thread computes the metrics one slider step
+# away with the batched engine and stores them in the shared metrics cache
+# under the same key shared_metrics() looks up, so the next step is a hit.
+#   - One worker thread per process, throttled to CPU_SHARE of one core:
+#     after each chunk it sleeps long enough to keep its duty cycle there.
+#   - Each session (owner) has at most one job. New inputs cancel the old
+#     job between chunks, so stale neighbors are never worked through.
+#   - At most MAX_SCENARIOS neighbors per rerun, in the page's priority
+#     order; positions that are already cached are skipped.
+
+CPU_SHARE = float(os.getenv("SPECULATE_CPU_SHARE", "0.25"))
+MAX_SCENARIOS = int(os.getenv("SPECULATE_MAX_SCENARIOS", "12"))
+CHUNK = 4
+
+
+def _step(value, delta):
+    stepped = round(value + delta, 6)
+    return int(stepped) if isinstance(value, int) and isinstance(delta, int) else stepped
+
+
+def neighbor_inputs(inputs, steps):
+    """calculate_metrics() inputs one slider step away from `inputs`.
+
+    steps: [(field, step, lo, hi), ...] in priority order, field being a
+    calculate_metrics() argument name (calc_engine.INPUT_FIELDS).
+    """
+    inputs = tuple(inputs)
+    out = []
+    for field, step, lo, hi in steps:
+        i = INPUT_FIELDS.index(field)
+        for delta in (step, -step):
+            value = _step(inputs[i], delta)
+            if lo <= value <= hi:
+                neighbor = inputs[:i] + (value,) + inputs[i + 1:]
+                if neighbor not in out:
+                    out.append(neighbor)
+    return out
+
+
+def metrics_key(inputs):
+    # Same key as result_cache.shared_metrics()
+    return make_key("calculate_metrics", tuple(inputs))
+
+
+class SpeculationJob:
+    def __init__(self, owner, scenarios):
+        self.owner = owner
+        self.scenarios = list(scenarios)
+        self.computed = 0
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class Speculator:
+    """Background thread precomputing metrics at a capped CPU share."""
+
+    def __init__(self, cpu_share=CPU_SHARE, max_scenarios=MAX_SCENARIOS, chunk=CHUNK, cache=metrics_cache):
+        self.cpu_share = min(max(cpu_share, 0.01), 1.0)
+        self.max_scenarios = max_scenarios
+        self.chunk = chunk
+        self.cache = cache
+        self._queue = OrderedDict()  # owner -> SpeculationJob waiting, oldest first
+        self._latest = {}            # owner -> its queued or running job
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread = None
+        self.submitted = 0
+        self.cancelled = 0
+        self.computed = 0
+        self.skipped = 0
+        self.cpu_seconds = 0.0
+        self.throttle_seconds = 0.0
+
+    def submit(self, owner, scenarios):
+        """Replace `owner`'s queued or running work with `scenarios`."""
+        job = SpeculationJob(owner, list(scenarios)[:self.max_scenarios])
+        with self._lock:
+            self._cancel_locked(owner)
+            self._latest[owner] = job
+            self._queue[owner] = job
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="speculate-worker", daemon=True)
+                self._thread.start()
+            self._wake.notify()
+        return job
+
+    def cancel(self, owner):
+        with self._lock:
+            self._cancel_locked(owner)
+
+    def _cancel_locked(self, owner):
+        self._queue.pop(owner, None)
+        job = self._latest.pop(owner, None)
+        if job is not None and not job.done.is_set():
+            job.cancel()
+            self.cancelled += 1
+
+    def _next_job(self):
+        with self._lock:
+            while not self._queue:
+                self._wake.wait()
+            _, job = self._queue.popitem(last=False)
+            return job
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            try:
+                self._run(job)
+            except Exception:
+                # One bad job must not end speculation for every session
+                log.exception("speculation job for %s failed", job.owner)
+            finally:
+                job.done.set()
+                with self._lock:
+                    if self._latest.get(job.owner) is job:
+                        del self._latest[job.owner]
+
+    def _run(self, job):
+        pending = job.scenarios
+        while pending and not job.cancelled.is_set():
+            chunk, pending = pending[:self.chunk], pending[self.chunk:]
+            todo = [s for s in chunk if not self.cache.contains(metrics_key(s))]
+            with self._lock:
+                self.skipped += len(chunk) - len(todo)
+            if not todo:
+                continue
+
+            start = time.thread_time()
+            for scenario, metrics in zip(todo, calculate_metrics_batch(todo)):
+                self.cache.prefill(metrics_key(scenario), metrics)
+            cpu = time.thread_time() - start
+            job.computed += len(todo)
+
+            # Duty cycle: cpu / (cpu + pause) == cpu_share
+            pause = cpu * (1 - self.cpu_share) / self.cpu_share
+            with self._lock:
+                self.computed += len(todo)
+                self.cpu_seconds += cpu
+                self.throttle_seconds += pause
+            if job.cancelled.wait(pause):
+                break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": len(self._queue),
+                "submitted": self.submitted,
+                "cancelled": self.cancelled,
+                "computed": self.computed,
+                "skipped": self.skipped,
+                "cpu_seconds": self.cpu_seconds,
+                "cpu_share": self.cpu_share,
+            }
+
+
+_shared_speculator = None
+_shared_lock = threading.Lock()
+
+
+def get_speculator():
+    """Process-wide speculator shared by every Streamlit session."""
+    global _shared_speculator
+    with _shared_lock:
+        if _shared_speculator is None:
+            _shared_speculator = Speculator()
+        return _shared_speculator
+
+
+def speculate(owner, inputs, steps):
+    """Precompute metrics one step away from each input tuple in `inputs`.
+
+    Neighbors of several properties (Dual page) are interleaved so the
+    scenario cap cuts the least likely steps of each, not one property.
+    """
+    scenarios = []
+    for neighbor in itertools.chain.from_iterable(
+            itertools.zip_longest(*(neighbor_inputs(one, steps) for one in inputs))):
+        if neighbor is not None and neighbor not in scenarios:
+            scenarios.append(neighbor)
+    return get_speculator().submit(owner, scenarios)
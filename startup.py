@@ -0,0 +1,171 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+
+# ==========================================================
+#  STARTUP: PREWARM + IMPORT-TIME REPORT
+# ==========================================================
+#
+# The entry points (main.py, pages/) only import streamlit and dotenv before
+# the password gate; calc, PDF, chart and email modules load past it, and
+# their heaviest dependencies (scipy, matplotlib, smtplib) on first use.
+# That keeps cold starts and the login screen fast, but the first real
+# request after a deploy pays for the imports. To pay at boot instead:
+#
+#     python startup.py serve [streamlit run options]
+#
+# imports everything, warms matplotlib's font cache and reads the user
+# guide before starting the Streamlit server in the same process. To see
+# what each entry point imports and what it costs, per top-level package:
+#
+#     python startup.py report
+#     python startup.py report --max-login-ms 150    # exit 1 over budget
+
+ENTRY_POINTS = [
+    "main.py",
+    "pages/1_Main_Single_Property.py",
+    "pages/2_Main_Dual_Property.py",
+    "pages/3_Admin.py",
+]
+
+PREWARM_MODULES = [
+    "numpy", "numpy_financial", "pandas", "scipy.optimize", "smtplib",
+    "matplotlib.figure", "matplotlib.backends.backend_agg", "matplotlib.backends.backend_svg",
+    "calc_engine", "result_cache", "speculate", "charts", "email_queue", "asset_cache",
+    "pdf_compact", "pdf_charts", "pdf_single", "pdf_single_agent", "pdf_dual", "pdf_portfolio",
+]
+
+
+def prewarm(modules=PREWARM_MODULES, verbose=True):
+    """Import the app's heavy modules now; returns {module: seconds}."""
+    import importlib
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - start
+
+    # Read the user guide now, so a missing file is reported at boot
+    import asset_cache
+    asset_cache.user_guide()
+
+    # First matplotlib render loads the font list; do it once here
+    start = time.perf_counter()
+    import charts
+    charts.render_chart(lambda fig: fig.subplots().plot([0, 1]), figsize=(1, 1), dpi=10)
+    timings["(first chart render)"] = time.perf_counter() - start
+
+    if verbose:
+        total = sum(timings.values())
+        print(f"🔥 Prewarmed {len(modules)} modules in {total:.2f}s")
+    return timings
+
+
+def serve(streamlit_args):
+    prewarm()
+    from streamlit.web import cli as stcli
+
+    sys.argv = ["streamlit", "run", os.path.join(ROOT, "main.py"), *streamlit_args]
+    sys.exit(stcli.main())
+
+
+# ==========================================================
+#  IMPORT-TIME REPORT
+# ==========================================================
+
+def _probe(script, login):
+    """Run one entry point in AppTest (called under python -X importtime)."""
+    import logging
+
+    from streamlit.testing.v1 import AppTest
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    if script == "-":
+        return
+    os.chdir(ROOT)
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=300)
+    if login:
+        at.session_state["authenticated"] = True
+        at.session_state["admin_authenticated"] = True
+    at.run()
+
+
+def _import_times(script, login):
+    """{module: self import time in µs} for a fresh interpreter."""
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "_probe", script]
+    if login:
+        cmd.append("--login")
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def _by_package(times, baseline):
+    packages = {}
+    for name, us in times.items():
+        if name not in baseline:
+            top = name.split(".")[0]
+            packages[top] = packages.get(top, 0) + us
+    return packages
+
+
+def report(top=6, max_login_ms=None):
+    baseline = _import_times("-", login=False)
+    print(f"Import cost per entry point, on top of streamlit itself "
+          f"({sum(baseline.values()) / 1000:.0f} ms), fresh interpreter each:\n")
+    print(f"{'entry point':<34} {'login screen':>13} {'after login':>12}   heaviest packages after login")
+
+    over_budget = []
+    for script in ENTRY_POINTS:
+        login_screen = _by_package(_import_times(script, login=False), baseline)
+        after_login = _by_package(_import_times(script, login=True), baseline)
+        login_ms = sum(login_screen.values()) / 1000
+        heaviest = sorted(after_login.items(), key=lambda kv: -kv[1])[:top]
+        print(f"{script:<34} {login_ms:>10.0f} ms {sum(after_login.values()) / 1000:>9.0f} ms   "
+              + ", ".join(f"{name} {us / 1000:.0f}" for name, us in heaviest))
+        if max_login_ms is not None and login_ms > max_login_ms:
+            over_budget.append((script, login_ms))
+
+    for script, login_ms in over_budget:
+        print(f"❌ {script}: login screen imports {login_ms:.0f} ms (budget {max_login_ms:.0f} ms)")
+    return not over_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarm the app or report its import costs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="import time per entry point and package")
+    rep.add_argument("--top", type=int, default=6)
+    rep.add_argument("--max-login-ms", type=float, help="fail if a login screen imports take longer")
+    sub.add_parser("prewarm", help="import everything and print per-module timings")
+    sub.add_parser("serve", help="prewarm, then `streamlit run main.py` in this process")
+    probe = sub.add_parser("_probe")
+    probe.add_argument("script")
+    probe.add_argument("--login", action="store_true")
+    args, rest = parser.parse_known_args()
+
+    if args.command == "serve":
+        serve(rest)
+    elif args.command == "prewarm":
+        for name, seconds in prewarm().items():
+            print(f"  {name:<34} {seconds * 1000:>8.1f} ms")
+    elif args.command == "_probe":
+        _probe(args.script, args.login)
+    else:
+        sys.exit(0 if report(args.top, args.max_login_ms) else 1)
+
+
+if __name__ == "__main__":
+    main()
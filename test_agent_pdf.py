@@ -36,9 +36,11 @@ buffer = generate_pdf(
     brokerage_name="Intero Real Estate",
     client_name="John & Mary Smith",
     agent_notes="This deal works well for a long-term hold given current rental demand.",
-    improvement_name="Kitchen Remodel",
-    improvement_cost=24000,
-    improvement_rent_impact=350
+    improvements_list=[
+        {"Description": "Kitchen Remodel", "Amount ($)": 24000},
+        {"Description": "HVAC Replacement", "Amount ($)": 9000},
+        {"Description": "Roof", "Amount ($)": 15000},
+    ]
 )
 
 # --- Write to file so you can open it
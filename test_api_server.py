@@ -0,0 +1,108 @@
+import asyncio
+import http.client
+import json
+import os
+import sys
+
+import pytest
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import api_server
+from calc_engine import INPUT_FIELDS, calculate_metrics
+
+INPUTS = [300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10]
+OTHER = [425000, 2650, 25, 6.5, 30, 420, 5, 3.5, 2.5, 10]
+
+
+@pytest.fixture(scope="module")
+def server():
+    server, stop = api_server.serve_in_thread(port=0, workers=1, max_in_flight=2, timeout=60)
+    yield server
+    stop()
+
+
+def _request(server, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=60)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_metrics_match_the_engine(server):
+    status, _, body = _request(server, "POST", "/v1/metrics", {"inputs": dict(zip(INPUT_FIELDS, INPUTS))})
+    assert status == 200
+    assert json.loads(body) == json.loads(api_server.dumps(calculate_metrics(*INPUTS)))
+
+
+def test_batch_streams_one_line_per_scenario_in_order(server):
+    scenarios = [INPUTS, OTHER] * 130
+    status, headers, body = _request(server, "POST", "/v1/metrics/batch", {"scenarios": scenarios})
+    assert status == 200 and headers["Transfer-Encoding"] == "chunked"
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert len(lines) == len(scenarios)
+    assert lines[1] == json.loads(api_server.dumps(calculate_metrics(*OTHER)))
+    assert lines[-1] == lines[1]
+
+
+def test_verdicts_and_reports(server):
+    status, _, body = _request(server, "POST", "/v1/verdict", {"inputs": INPUTS})
+    assert status == 200 and json.loads(body)["grade"]
+    status, _, body = _request(server, "POST", "/v1/verdict", {"inputs_a": INPUTS, "inputs_b": OTHER})
+    verdict = json.loads(body)
+    assert status == 200 and "Property A" in verdict["summary"] and verdict["winner"] in ("A", "B")
+    assert verdict["grade_a"] == calculate_metrics(*INPUTS)["Grade"]
+
+    requests = {
+        "investor": {"inputs": INPUTS, "property": {"street_address": "12 Elm St"}},
+        "agent": {"inputs": INPUTS, "agent_name": "Dana", "improvements": [{"Description": "Roof", "Amount ($)": 9000}]},
+        "comparison": {"inputs_a": INPUTS, "inputs_b": OTHER, "address_a": "12 Elm St"},
+    }
+    for report, body in requests.items():
+        status, headers, pdf = _request(server, "POST", f"/v1/reports/{report}", body)
+        assert status == 200 and headers["Content-Type"] == "application/pdf"
+        assert pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF")
+
+
+def test_bad_requests_are_rejected(server):
+    assert _request(server, "POST", "/v1/metrics", {"inputs": INPUTS[:9]})[0] == 400
+    assert _request(server, "POST", "/v1/metrics", {"inputs": INPUTS[:9] + [2.5]})[0] == 400
+    assert _request(server, "POST", "/v1/metrics", {"inputs": INPUTS[:9] + [True]})[0] == 400
+    assert _request(server, "POST", "/v1/metrics/batch", {"scenarios": []})[0] == 400
+    assert _request(server, "GET", "/v1/metrics")[0] == 405
+    assert _request(server, "GET", "/nope")[0] == 404
+    status, _, body = _request(server, "POST", "/v1/metrics/batch",
+                               {"scenarios": [INPUTS] * (api_server.MAX_BATCH + 1)})
+    assert status == 413 and "error" in json.loads(body)
+
+
+def test_full_pool_answers_503(server):
+    slots = server.max_in_flight
+    for _ in range(slots):
+        asyncio.run_coroutine_threadsafe(server._slots.acquire(), server._loop).result()
+    try:
+        status, headers, _ = _request(server, "POST", "/v1/metrics", {"inputs": INPUTS})
+        assert status == 503 and headers["Retry-After"] == "1"
+        assert _request(server, "GET", "/health")[0] == 200
+    finally:
+        for _ in range(slots):
+            server._loop.call_soon_threadsafe(server._slots.release)
+    assert _request(server, "POST", "/v1/metrics", {"inputs": INPUTS})[0] == 200
+
+
+def test_slow_request_times_out():
+    server, stop = api_server.serve_in_thread(port=0, workers=1, timeout=0.05)
+    try:
+        plan = [{"Description": f"Upgrade {i}", "Amount ($)": 1000 + i} for i in range(2000)]
+        status, _, body = _request(server, "POST", "/v1/reports/agent", {"inputs": INPUTS, "improvements": plan})
+        assert status == 504 and "error" in json.loads(body)
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,112 @@
+import io
+import json
+import os
+import sys
+import warnings
+
+import pytest
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import applog
+import calc_engine
+import instrumentation
+from applog import fields, get_logger
+from calc_engine import calculate_metrics, calculate_metrics_batch
+from pdf_single import generate_ai_verdict
+
+BASE = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+
+
+class Loud:
+    """Counts how often a log call formats it."""
+    formatted = 0
+
+    def __repr__(self):
+        Loud.formatted += 1
+        return "loud"
+
+    __str__ = __repr__
+
+
+@pytest.fixture
+def stderr():
+    stream = io.StringIO()
+    yield stream
+    applog.configure()
+
+
+def test_default_config_does_no_formatting_on_the_hot_path(stderr):
+    applog.configure(level="WARNING", levels="", sample="", ring_size=0, stream=stderr)
+    Loud.formatted = 0
+    log = get_logger("calc_engine")
+    log.debug("value %s", Loud())
+    log.info("value %s", Loud())
+    generate_ai_verdict(calculate_metrics(*BASE))
+
+    assert Loud.formatted == 0
+    assert stderr.getvalue() == ""
+    assert applog.recent_events() == []
+
+
+def test_module_levels_and_structured_output(stderr):
+    applog.configure(level="WARNING", levels="calc_engine=DEBUG", fmt="json", stream=stderr)
+    calculate_metrics(*BASE)
+    get_logger("pdf_single").debug("hidden")
+    get_logger("pdf_single").warning("shown %d", 1)
+
+    lines = [json.loads(line) for line in stderr.getvalue().splitlines()]
+    assert [(e["logger"], e["level"]) for e in lines] == [("app.calc_engine", "DEBUG"), ("app.pdf_single", "WARNING")]
+    assert lines[0]["time_horizon"] == 10 and len(lines[0]["first_cash_flows"]) == 3
+    assert lines[1]["msg"] == "shown 1"
+
+    applog.configure(level="DEBUG", stream=stderr)
+    get_logger("test").info("text", extra=fields(a=1, b="x"))
+    assert stderr.getvalue().splitlines()[-1].endswith("app.test: text a=1 b='x'")
+
+
+def test_sampling_keeps_a_share_below_warning(stderr):
+    applog.configure(level="DEBUG", sample="noisy=0.1", stream=stderr)
+    log = get_logger("noisy")
+    for i in range(100):
+        log.debug("step %d", i)
+    for i in range(5):
+        log.warning("problem %d", i)
+
+    lines = stderr.getvalue().splitlines()
+    assert sum("step" in line for line in lines) == 10
+    assert sum("problem" in line for line in lines) == 5
+
+
+def test_ring_buffer_keeps_recent_debug_events_off_stderr(stderr):
+    applog.configure(level="WARNING", ring_size=3, ring_level="DEBUG", stream=stderr)
+    log = get_logger("ring")
+    for i in range(5):
+        log.debug("event %d", i, extra=fields(i=i))
+    log.warning("careful")
+
+    assert stderr.getvalue().count("careful") == 1 and "event" not in stderr.getvalue()
+    events = applog.recent_events()
+    assert [e["message"] for e in events] == ["event 3", "event 4", "careful"]
+    assert events[0]["logger"] == "ring" and events[0]["fields"] == {"i": 3}
+    assert [e["message"] for e in applog.recent_events(level=applog.WARNING)] == ["careful"]
+
+
+def test_irr_fallback_failures_are_counted_and_warned_once(stderr, monkeypatch):
+    applog.configure(level="WARNING", stream=stderr)
+    monkeypatch.setattr(calc_engine, "_irr_failure_warned", False)
+    failed = instrumentation.snapshot()["counters"].get("irr_fallback_failed", 0)
+    # Zero rent: cash flows never turn positive, so no IRR exists
+    sweep = [(250000, 0, 20, 6.5, 30, 300 + i, 5, 3, 3, 10) for i in range(20)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        metrics = calculate_metrics_batch(sweep)
+
+    assert all(m["IRR (Operational) (%)"] == 0 for m in metrics)
+    assert instrumentation.snapshot()["counters"]["irr_fallback_failed"] - failed >= 20
+    assert stderr.getvalue().count("IRR calculation failed") == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,109 @@
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import applog
+import asset_cache
+from asset_cache import AssetCache
+
+
+def _png(color, size=(600, 300), mode="RGBA"):
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new(mode, size, color).save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_branding_images_are_decoded_once_at_print_size():
+    cache = AssetCache()
+    logo = _png((200, 30, 30, 128))
+    first = cache.get(logo, 120, 40)
+    assert cache.get(logo, 120, 40) is first
+    assert first.jpeg.startswith(b"\xff\xd8")   # flattened to JPEG
+    assert first.width_px <= 120 / 72 * 150 and first.height_px <= 40 / 72 * 150
+    assert (round(first.width_pt), round(first.height_pt)) == (80, 40)   # 2:1, fit in the box
+    assert cache.stats()["decodes"] == 1 and cache.stats()["hits"] == 1
+
+    cache.get(logo, 60, 20)   # another print size is its own entry
+    assert cache.stats()["entries"] == 2
+
+
+def test_concurrent_misses_share_one_decode(monkeypatch):
+    cache = AssetCache()
+    logo = _png((30, 30, 200, 255))
+    prepare = asset_cache._prepare
+
+    def slow_prepare(*args):
+        time.sleep(0.2)
+        return prepare(*args)
+
+    monkeypatch.setattr(asset_cache, "_prepare", slow_prepare)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(logo, 120, 40))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = cache.stats()
+    assert stats["decodes"] == 1 and stats["misses"] == 1
+    assert stats["coalesced"] + stats["hits"] == 7
+    assert all(r is results[0] for r in results)
+
+
+def test_failed_decode_does_not_wedge_waiters():
+    cache = AssetCache()
+    with pytest.raises(Exception):
+        cache.get(b"not an image", 120, 40)
+    with pytest.raises(Exception):
+        cache.get(b"not an image", 120, 40)
+    assert cache.stats()["entries"] == 0 and cache.stats()["misses"] == 2
+
+
+def test_branding_cache_is_bounded_by_bytes():
+    logos = [_png((i * 40, 0, 0, 255), mode="RGB") for i in range(4)]
+    one = AssetCache().get(logos[0], 120, 40)
+    cache = AssetCache(max_bytes=2 * (len(one.jpeg) + len(one.rgb)) + 100)
+    for logo in logos:
+        cache.get(logo, 120, 40)
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 2 and stats["bytes"] <= cache.max_bytes
+
+
+def test_user_guide_is_read_once_from_the_package_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # not where the guide lives
+    monkeypatch.setattr(asset_cache, "_user_guide", None)
+    monkeypatch.setattr(asset_cache, "_user_guide_loaded", False)
+
+    guide = asset_cache.user_guide()
+    assert guide.data.startswith(b"%PDF")
+    assert guide.sha256 == hashlib.sha256(guide.data).hexdigest()
+    with mock.patch("builtins.open", side_effect=AssertionError("disk read on rerun")):
+        assert asset_cache.user_guide() is guide
+
+
+def test_missing_user_guide_is_reported_once(tmp_path, monkeypatch):
+    stderr = io.StringIO()
+    applog.configure(level="WARNING", stream=stderr)
+    monkeypatch.setattr(asset_cache, "USER_GUIDE_PATH", str(tmp_path / "missing.pdf"))
+    monkeypatch.setattr(asset_cache, "_user_guide", None)
+    monkeypatch.setattr(asset_cache, "_user_guide_loaded", False)
+
+    assert asset_cache.user_guide() is None
+    assert asset_cache.user_guide() is None
+    applog.configure()
+    assert stderr.getvalue().count("missing.pdf unavailable") == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
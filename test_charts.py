@@ -0,0 +1,66 @@
+import gc
+import os
+import sys
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from matplotlib.figure import Figure
+
+import charts
+from result_cache import chart_cache
+
+
+def _live_figures():
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def test_page_charts_render_and_are_cached():
+    chart_cache.clear()
+    years = [1, 2, 3]
+    png = charts.projection_chart(years, [100, 200, 300], [24000, 24500, 25000], [5, 6, 7])
+    assert png.startswith(b"\x89PNG")
+    assert charts.projection_chart(years, [100.0, 200.0, 300.0], [24000, 24500, 25000], [5, 6, 7]) is png
+
+    svg = charts.cap_rate_donut_chart([12000, 288000], 4.0, fmt="svg")
+    assert b"<svg" in svg[:500]
+    charts.cost_breakdown_chart([3600, 16000, 4400], ["$3,600", "$16,000", "$4,400"], ["A", "B", "C"])
+    charts.dual_projection_chart(years, years, [1, 2, 3], [3, 2, 1], [4, 5, 6], [6, 5, 4], [1, 1, 1], [2, 2, 2])
+    assert chart_cache.stats()["misses"] == 4
+    assert _live_figures() == 0
+
+
+def test_figures_are_released_when_drawing_fails():
+    def broken(fig):
+        fig.subplots()
+        raise ValueError("bad data")
+
+    try:
+        charts.render_chart(broken)
+    except ValueError:
+        pass
+    assert _live_figures() == 0
+
+
+def test_vega_lite_specs_keep_roi_on_its_own_axis():
+    import json
+    import numpy as np
+
+    spec = charts.projection_spec([1, 2], np.array([100.0, 200.0]), [24000, 24500], [5, 6])
+    json.dumps(spec)   # numpy values must be converted for the browser
+    assert spec["resolve"]["scale"]["y"] == "independent"
+    assert [layer["transform"][0]["filter"]["equal"] for layer in spec["layer"]] == ["money", "roi"]
+    assert len(spec["data"]["values"]) == 6
+
+    dual = charts.dual_projection_spec([1, 2], [1], [1, 2], [3], [4, 5], [6], [1, 1], [2])
+    series = {row["Series"] for row in dual["data"]["values"]}
+    assert len(series) == 6
+    assert len(dual["data"]["values"]) == 9
+
+
+if __name__ == "__main__":
+    test_page_charts_render_and_are_cached()
+    test_figures_are_released_when_drawing_fails()
+    test_vega_lite_specs_keep_roi_on_its_own_axis()
+    print("✅ chart tests passed")
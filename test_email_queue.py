@@ -0,0 +1,114 @@
+import os
+import smtplib
+import sys
+import time
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from email_queue import EmailQueue, SMTPSettings, report_message, is_transient, SENT, FAILED, RETRYING
+from smtp_stub import SMTPStubServer
+
+PDF = b"%PDF-1.4 test attachment"
+
+
+def _message(i):
+    return report_message(f"client{i}@example.com", "Your Report", f"Hi client {i}", PDF, "report.pdf")
+
+
+def test_reuses_pooled_sessions():
+    with SMTPStubServer() as server:
+        q = EmailQueue(SMTPSettings(**server.settings()), workers=2)
+        job_ids = [q.submit(_message(i)) for i in range(20)]
+        assert q.wait(timeout=10)
+        q.stop()
+
+        assert all(q.status(j)["state"] == SENT for j in job_ids)
+        assert len(server.messages) == 20
+        assert server.connections <= 2 and server.logins <= 2
+        attachment = next(server.parsed_messages()[0].iter_attachments())
+        assert attachment.get_content() == PDF
+
+
+def test_retries_transient_failures_and_reconnects():
+    with SMTPStubServer() as server:
+        server.fail_next = 1   # 451 reply
+        server.drop_next = 1   # connection dropped mid-DATA
+        q = EmailQueue(SMTPSettings(**server.settings()), workers=1, backoff=0.01)
+        job_id = q.submit(_message(1))
+        assert q.wait(timeout=10)
+        q.stop()
+
+        status = q.status(job_id)
+        assert status["state"] == SENT and status["attempts"] == 3
+        assert len(server.messages) == 1
+        assert server.connections == 2
+
+
+def test_gives_up_after_max_attempts():
+    with SMTPStubServer() as server:
+        server.fail_next = 10
+        q = EmailQueue(SMTPSettings(**server.settings()), workers=1, max_attempts=2, backoff=0.01)
+        job_id = q.submit(_message(1))
+        assert q.wait(timeout=10)
+        q.stop()
+
+        status = q.status(job_id)
+        assert status["state"] == FAILED and status["attempts"] == 2
+        assert "451" in status["error"]
+
+
+def test_permanent_errors_are_not_retried():
+    assert is_transient(smtplib.SMTPServerDisconnected("gone"))
+    assert is_transient(smtplib.SMTPDataError(451, b"try later"))
+    assert not is_transient(smtplib.SMTPDataError(554, b"rejected"))
+    assert not is_transient(smtplib.SMTPAuthenticationError(535, b"bad credentials"))
+    assert not is_transient(smtplib.SMTPNotSupportedError("no AUTH"))
+    assert not is_transient(smtplib.SMTPException("malformed"))
+    assert is_transient(smtplib.SMTPConnectError(421, b"busy"))
+    assert is_transient(ConnectionResetError())
+
+
+def test_failing_callbacks_do_not_kill_workers():
+    def boom(*_):
+        raise RuntimeError("callback bug")
+
+    with SMTPStubServer() as server:
+        q = EmailQueue(SMTPSettings(**server.settings()), workers=1)
+        done_fails = q.submit(_message(1), on_done=boom)
+        sending_fails = q.submit(_message(2), on_sending=boom)
+        fine = q.submit(_message(3))
+        assert q.wait(timeout=10)
+        q.stop()
+
+        assert q.status(done_fails)["state"] == SENT
+        assert q.status(sending_fails)["state"] == FAILED and "callback bug" in q.status(sending_fails)["error"]
+        assert q.status(fine)["state"] == SENT
+        assert len(server.messages) == 2
+
+
+def test_stop_without_waiting_fails_pending_retries():
+    with SMTPStubServer() as server:
+        server.fail_next = 1
+        q = EmailQueue(SMTPSettings(**server.settings()), workers=1, backoff=0.2)
+        job_id = q.submit(_message(1))
+        deadline = time.monotonic() + 10
+        while q.status(job_id)["state"] != RETRYING and time.monotonic() < deadline:
+            time.sleep(0.01)
+        q.stop(wait=False)
+
+        status = q.status(job_id)
+        assert status["state"] == FAILED and status["error"] == "queue stopped"
+        assert q.wait(timeout=1)
+        time.sleep(0.3)   # the cancelled retry timer never requeues the job
+        assert q.status(job_id)["state"] == FAILED and server.messages == []
+
+
+if __name__ == "__main__":
+    test_reuses_pooled_sessions()
+    test_retries_transient_failures_and_reconnects()
+    test_gives_up_after_max_attempts()
+    test_permanent_errors_are_not_retried()
+    test_failing_callbacks_do_not_kill_workers()
+    test_stop_without_waiting_fails_pending_retries()
+    print("✅ email queue tests passed")
@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import grading
+import pdf_dual
+import pdf_single
+from calc_engine import calculate_metrics, calculate_metrics_batch
+
+BASE = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+OTHER = (425000, 2650, 25, 6.5, 30, 420, 5, 3.5, 2.5, 10)
+
+
+def test_vectorized_grades_match_the_table_row_by_row():
+    rng = random.Random(7)
+    deals = [(rng.uniform(-50, 400), rng.uniform(-40000, 60000), rng.uniform(-15, 25)) for _ in range(2000)]
+    # Exactly on every threshold: ROI / cash flow must be above, CoC at least
+    deals += [(row[1] + d, row[2] + d, row[3] + e) for row in grading.GRADE_TABLE for d in (0, 1) for e in (-1, 0)]
+    roi, cash_flow, coc = zip(*deals)
+    assert grading.grade(roi, cash_flow, coc).tolist() == [grading.grade_of(*deal) for deal in deals]
+    assert grading.grade_of(200, 20001, 5) == "B" and grading.grade_of(201, 20001, 5) == "A"
+    assert grading.grade([], [], []).tolist() == []
+
+
+def test_engine_verdicts_and_batch_agree_on_every_grade():
+    scenarios = [BASE, OTHER, (250000, 1800, 0, 0, 30, 300, 5, 3, 3, 10), (400000, 1500, 25, 7.5, 15, 900, 10, 0, 0, 1)]
+    scenarios += [BASE[:1] + (1500 + 150 * i,) + BASE[2:9] + (5 + i,) for i in range(20)]
+    metrics = calculate_metrics_batch(scenarios)
+    grades = [m["Grade"] for m in metrics]
+    assert grades == [calculate_metrics(*s)["Grade"] for s in scenarios]
+    assert calculate_metrics(*BASE, grader=None)["Grade"] is None
+    assert len(set(grades)) > 2
+    assert grading.grade_metrics_batch(metrics) == grades
+    assert [pdf_single.generate_ai_verdict(dict(m))[1] for m in metrics] == grades
+
+    metrics_a, metrics_b = calculate_metrics(*BASE), calculate_metrics(*OTHER)
+    summary, winner = pdf_dual.generate_ai_verdict(metrics_a, metrics_b)
+    assert (metrics_a["Grade"], metrics_b["Grade"]) == (grades[0], grades[1])
+    assert f"Grade: {grades[0]}" in summary and winner in ("A", "B")
+
+
+def test_rank_puts_better_grades_first_then_higher_roi():
+    roi = [60, 250, 120, 300, 250]
+    cash_flow = [6000, 25000, 12000, 1000, 25000]
+    coc = [0, 6, 1, 8, 6]
+    assert grading.grade(roi, cash_flow, coc).tolist() == ["C", "A", "B", "D", "A"]
+    assert grading.rank(roi, cash_flow, coc) == [1, 4, 2, 0, 3]
+
+
+if __name__ == "__main__":
+    test_vectorized_grades_match_the_table_row_by_row()
+    test_engine_verdicts_and_batch_agree_on_every_grade()
+    test_rank_puts_better_grades_first_then_higher_roi()
+    print("✅ grading tests passed")
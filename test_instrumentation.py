@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import time
+import urllib.request
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import instrumentation
+from instrumentation import Registry, instrumented
+
+
+def test_timers_record_percentiles_and_errors():
+    reg = Registry()
+    for ms in range(1, 101):
+        reg.observe("pdf_single", ms / 1000)
+    try:
+        with reg.timer("pdf_single"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    reg.count("email_sent", 3)
+
+    stats = reg.snapshot()["stages"]["pdf_single"]
+    assert stats["count"] == 101 and stats["errors"] == 1
+    assert 49 <= stats["p50_ms"] <= 52 and 94 <= stats["p95_ms"] <= 97
+    assert reg.snapshot()["counters"] == {"email_sent": 3}
+
+
+def test_prometheus_and_json_exports(tmp_path):
+    instrumentation.registry.reset()
+    with instrumentation.timed('chart "render"'):
+        pass
+    instrumentation.count("email_failed")
+
+    text = instrumentation.prometheus_text()
+    assert '# TYPE app_stage_duration_seconds summary' in text
+    assert 'app_stage_duration_seconds_count{stage="chart \\"render\\""} 1' in text
+    assert 'app_events_total{event="email_failed"} 1' in text
+
+    path = str(tmp_path / "metrics.json")
+    instrumentation.write_snapshot(path)
+    with open(path) as f:
+        assert json.load(f)["counters"] == {"email_failed": 1}
+
+    server = instrumentation.serve_metrics(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        assert urllib.request.urlopen(url).read().decode() == instrumentation.prometheus_text()
+    finally:
+        server.shutdown()
+    instrumentation.registry.reset()
+
+
+def test_decorator_is_cheap_and_keeps_function_identity():
+    @instrumented("noop")
+    def noop(x):
+        return x
+
+    assert noop.__name__ == "noop" and noop(5) == 5
+    start = time.perf_counter()
+    for i in range(20000):
+        noop(i)
+    per_call_us = (time.perf_counter() - start) / 20000 * 1e6
+    assert per_call_us < 50
+    instrumentation.registry.reset()
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
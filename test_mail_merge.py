@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from email_queue import SMTPSettings
+from mail_merge import SendLog, run_merge, row_key, SENDING_STATE
+from smtp_stub import SMTPStubServer
+
+PROPERTY = {
+    "purchase_price": "300000", "monthly_rent": "2000", "down_payment_pct": "20",
+    "mortgage_rate": "6.5", "mortgage_term": "30", "monthly_expenses": "300",
+    "vacancy_rate": "5", "appreciation_rate": "3", "rent_growth_rate": "3", "time_horizon": "10",
+}
+
+
+def _rows(n):
+    return [dict(PROPERTY, email=f"client{i}@example.com", client_name=f"Client {i}",
+                 street_address=f"{i} Main St") for i in range(n)]
+
+
+def test_merge_renders_and_sends_each_row():
+    rows = _rows(6)
+    with tempfile.TemporaryDirectory() as tmp, SMTPStubServer() as server:
+        summary = run_merge(rows, SMTPSettings(**server.settings()), os.path.join(tmp, "log.jsonl"),
+                            agent_name="Jane Agent", concurrency=2)
+        assert summary["sent"] == 6 and summary["failed"] == 0
+        assert server.connections <= 2
+
+        msg = next(m for m in server.parsed_messages() if m["To"] == "client3@example.com")
+        assert "Hi Client 3," in msg.get_body().get_content()
+        assert "Jane Agent" in msg.get_body().get_content()
+        assert next(msg.iter_attachments()).get_content().startswith(b"%PDF")
+
+
+def test_resume_never_double_sends():
+    rows = _rows(4)
+    with tempfile.TemporaryDirectory() as tmp, SMTPStubServer() as server:
+        log_path = os.path.join(tmp, "log.jsonl")
+        # Simulate a crash: row 0 delivered, row 1 interrupted mid-send
+        with open(log_path, "w") as f:
+            f.write(json.dumps({"key": row_key(rows[0]), "email": rows[0]["email"], "state": "sent"}) + "\n")
+            f.write(json.dumps({"key": row_key(rows[1]), "email": rows[1]["email"], "state": SENDING_STATE}) + "\n")
+            f.write('{"key": "torn')
+
+        summary = run_merge(rows, SMTPSettings(**server.settings()), log_path)
+        assert (summary["sent"], summary["skipped"], summary["uncertain"]) == (2, 1, 1)
+        assert sorted(m["To"] for m in server.parsed_messages()) == ["client2@example.com", "client3@example.com"]
+
+        # Running again sends nothing new
+        summary = run_merge(rows, SMTPSettings(**server.settings()), log_path)
+        assert summary["sent"] == 0 and summary["skipped"] == 3
+        assert len(server.messages) == 2
+
+
+def test_duplicate_rows_in_one_manifest_are_sent_once():
+    rows = _rows(3)
+    rows += [dict(rows[1]), dict(rows[1])]
+    with tempfile.TemporaryDirectory() as tmp, SMTPStubServer() as server:
+        summary = run_merge(rows, SMTPSettings(**server.settings()), os.path.join(tmp, "log.jsonl"), concurrency=2)
+        assert (summary["sent"], summary["skipped"]) == (3, 2)
+        assert sorted(m["To"] for m in server.parsed_messages()) == [f"client{i}@example.com" for i in range(3)]
+
+
+def test_send_log_failure_aborts_the_merge():
+    rows = _rows(6)
+    real_record = SendLog.record
+    broken = []
+
+    def record(self, key, email, state, error=None):
+        if broken or (state == SENDING_STATE and key == row_key(rows[2])):
+            broken.append(key)
+            raise OSError(28, "No space left on device")
+        return real_record(self, key, email, state, error)
+
+    with tempfile.TemporaryDirectory() as tmp, SMTPStubServer() as server, \
+            mock.patch.object(SendLog, "record", record):
+        summary = run_merge(rows, SMTPSettings(**server.settings()), os.path.join(tmp, "log.jsonl"), concurrency=1)
+        assert "No space left on device" in summary["aborted"]
+        # The row whose attempt couldn't be recorded is never sent
+        assert "client2@example.com" not in {m["To"] for m in server.parsed_messages()}
+
+
+if __name__ == "__main__":
+    test_merge_renders_and_sends_each_row()
+    test_resume_never_double_sends()
+    test_duplicate_rows_in_one_manifest_are_sent_once()
+    test_send_log_failure_aborts_the_merge()
+    print("✅ mail merge tests passed")
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import memory
+
+
+def test_reruns_record_rss_and_retained_memory():
+    tracker = memory.RerunTracker(history=3, snapshot_every=2)
+    was_tracing = memory.tracing()
+    memory.start_tracing()
+    try:
+        kept = []
+        for _ in range(4):
+            token = tracker.begin()
+            kept.append(bytearray(256 * 1024))
+            record = tracker.end(token, "single", "session-1")
+            assert record["rss_mb"] > 0 and record["retained_kb"] >= 250
+        assert len(tracker.recent()) == 3
+        growth = tracker.top_growth()
+        assert growth and growth[0]["location"].startswith(__file__)
+        # Baseline after the first rerun, latest snapshot after the third
+        assert growth[0]["growth_kb"] >= 2 * 250
+    finally:
+        if not was_tracing:
+            memory.stop_tracing()
+
+
+def test_reruns_record_their_own_thread_cpu():
+    tracker = memory.RerunTracker()
+    token = tracker.begin()
+    sum(i * i for i in range(300000))
+    record = tracker.end(token, "dual")
+    assert record["cpu_ms"] > 0
+    assert record["wall_ms"] >= record["cpu_ms"] * 0.9
+
+
+if __name__ == "__main__":
+    test_reruns_record_rss_and_retained_memory()
+    test_reruns_record_their_own_thread_cpu()
+    print("✅ memory tests passed")
@@ -0,0 +1,60 @@
+import itertools
+import os
+import sys
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import pdf_single_agent
+from pdf_single_agent import (NARRATIVES, PAYBACK_TIERS, generate_dynamic_agent_perspective,
+                              generate_dynamic_executive_summary, generate_narratives, payback_tier, payback_tiers,
+                              summarize_improvement_commentary)
+
+
+def _grid():
+    # Every tier boundary, on and either side, plus missing metrics
+    deals = []
+    for cashflow, roi, grade in itertools.product((-151, -150, -100, -99, 0, 1, None), (6.9, 7, 12, None),
+                                                  ("A", "B", "C", "D", "F", "N/A", None)):
+        metrics = {"First Year Cash Flow ($)": cashflow, "Final Year ROI (%)": roi, "Grade": grade}
+        deals.append({k: v for k, v in metrics.items() if v is not None})
+    return deals
+
+
+def test_batch_narratives_match_one_at_a_time():
+    deals = _grid()
+    assert generate_narratives("executive_summary", deals) == [generate_dynamic_executive_summary(m) for m in deals]
+    assert generate_narratives("agent_perspective", deals) == [generate_dynamic_agent_perspective(m) for m in deals]
+    assert generate_narratives("executive_summary", []) == []
+    # Every row of every part is reachable from the grid
+    for name, parts in NARRATIVES.items():
+        seen = {pdf_single_agent.narrative_tiers(name, m) for m in deals}
+        for part, (_, _, rows) in enumerate(parts):
+            assert {tiers[part] for tiers in seen} == set(range(len(rows)))
+
+
+def test_narrative_text():
+    text = generate_dynamic_executive_summary({"First Year Cash Flow ($)": -50, "Final Year ROI (%)": 12, "Grade": "N/A"})
+    assert text.startswith("The investment presents slightly negative cash flow")
+    assert "notably strong" in text and text.endswith("represents a moderate investment profile.")
+    text = generate_dynamic_agent_perspective({"Grade": "D"})
+    assert "close to break-even" in text and "looks mixed" in text
+
+
+def test_grouped_improvements_use_the_payback_tiers():
+    paybacks = [0.5, 3, 3.01, 5, 5.01, 40]
+    assert [PAYBACK_TIERS[i][0] for i in payback_tiers(paybacks)] == [payback_tier(p) for p in paybacks]
+
+    rows = [("Paint", 1200, 100), ("Roof", 6000, 100), ("Pool", 30000, 100), ("Deck", 2400, 100), ("None", 0, 0)]
+    comments = summarize_improvement_commentary(rows, {"Expected Annual Return": 7})
+    assert len(comments) == 3
+    assert comments[0].startswith("2 upgrades totaling $3,600 add an estimated $200 per month combined")
+    assert "strong payback period of approximately 1.5 years" in comments[0]
+    assert comments[-1].endswith("meaningfully for value-add buyers.")
+
+
+if __name__ == "__main__":
+    test_batch_narratives_match_one_at_a_time()
+    test_narrative_text()
+    test_grouped_improvements_use_the_payback_tiers()
+    print("✅ narrative tests passed")
@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import pdf_single
+from calc_engine import calculate_metrics
+from pdf_compact import pdf_size_report
+
+BASE = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+PROPERTY = {"street_address": "12 Elm St", "zip_code": "94566"}
+
+
+def _report(compact):
+    metrics = calculate_metrics(*BASE)
+    summary, _ = pdf_single.generate_ai_verdict(metrics)
+    return pdf_single.generate_pdf(PROPERTY, dict(metrics), summary, compact=compact).getvalue()
+
+
+def test_compact_reports_are_invariant():
+    compact, regular = _report(True), _report(False)
+    assert compact == _report(True)
+    # No report spends bytes on ASCII85, compact or not
+    assert not pdf_size_report(compact)["ascii85"]
+    assert not pdf_size_report(regular)["ascii85"]
+
+
+def test_concurrent_builds_render_the_same_reports():
+    expected = _report(True)
+    results = {True: [], False: []}
+
+    def build(compact):
+        for _ in range(3):
+            results[compact].append(_report(compact))
+
+    threads = [threading.Thread(target=build, args=(compact,)) for compact in (True, False, True, False)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results[True] == [expected] * 6
+    assert not any(pdf_size_report(pdf)["ascii85"] for pdf in results[False])
+
+
+if __name__ == "__main__":
+    test_compact_reports_are_invariant()
+    test_concurrent_builds_render_the_same_reports()
+    print("✅ compact PDF tests passed")
@@ -0,0 +1,79 @@
+import itertools
+import json
+import os
+import sys
+import threading
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import profiling
+from calc_engine import calculate_metrics
+from charts import projection_chart
+from pdf_single import generate_ai_verdict, generate_pdf
+
+BASE = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+
+
+def _page_like_run():
+    metrics = calculate_metrics(*BASE)
+    summary, _ = generate_ai_verdict(metrics)
+    generate_pdf({"purchase_price": BASE[0]}, metrics, summary, include_chart=False)
+    years = list(range(1, 11))
+    projection_chart(years, [1000 + 7 * y for y in years], [24000 + y for y in years], [5 + y for y in years])
+
+
+def test_disabled_mode_does_nothing(tmp_path):
+    assert profiling.start("page", rate=0) is None
+    assert profiling.stop(None, BASE, directory=str(tmp_path)) is None
+    with profiling.profiled("job", BASE, rate=0) as run:
+        assert run is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_profile_files_are_keyed_by_inputs_and_split_by_component(tmp_path):
+    run = profiling.start("single_page", rate=1)
+    _page_like_run()
+    path = profiling.stop(run, BASE, directory=str(tmp_path))
+
+    key = profiling.input_key(BASE)
+    assert path.endswith(f"_single_page_{key}.prof") and os.path.exists(path)
+    summary = open(path[:-len(".prof")] + ".txt").read()
+    assert "calculate_metrics" in summary and f"key={key}" in summary
+
+    [entry] = [json.loads(line) for line in open(tmp_path / "index.jsonl")]
+    assert entry["key"] == key and entry["name"] == "single_page"
+    components = entry["components_ms"]
+    assert components["calc"] > 0 and components["pdf"] > 0 and components["charts"] > 0
+    assert components["pdf"] <= entry["wall_ms"] and components["charts"] <= entry["wall_ms"]
+    assert "calculate_metrics" in profiling.merged_summary(str(tmp_path), key=key)
+    assert profiling.merged_summary(str(tmp_path), key="nope") is None
+
+
+def test_runs_are_sampled(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_seen", itertools.count())
+    profiled = 0
+    for _ in range(8):
+        run = profiling.start("page", rate=0.25)
+        profiled += run is not None
+        profiling.stop(run, BASE, directory=str(tmp_path))
+    assert profiled == 2
+
+
+def test_run_abandoned_by_a_finished_thread_is_dropped(tmp_path):
+    abandoned = []
+    worker = threading.Thread(target=lambda: abandoned.append(profiling.start("page", rate=1)))
+    worker.start()
+    worker.join()
+    assert abandoned[0] is not None
+
+    run = profiling.start("page", rate=1)
+    assert run is not None
+    assert profiling.stop(abandoned[0], directory=str(tmp_path)) is None
+    assert profiling.stop(run, BASE, directory=str(tmp_path)).endswith(".prof")
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
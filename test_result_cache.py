@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+import numpy as np
+
+from result_cache import ResultCache, SessionBudget, current_session, make_key, shared_metrics, metrics_cache
+
+
+def test_keys_match_normalized_inputs():
+    assert make_key(300000, 6.5, "94566 ") == make_key(300000.0, np.float64(6.5), "94566")
+    assert make_key({"a": 1, "b": [1, 2]}) == make_key({"b": (1.0, 2.0), "a": 1.0})
+    assert make_key(b"logo-bytes") == make_key(b"logo-bytes")
+    assert make_key(300000, 6.5) != make_key(300000, 6.25)
+
+
+def test_identical_concurrent_requests_compute_once():
+    cache = ResultCache("test", 1024 * 1024)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"x" * 100
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=("k", slow)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 7
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = ResultCache("test", 3000)
+    for key in "abc":
+        cache.get_or_compute(key, lambda: b"x" * 900)
+    cache.get_or_compute("a", lambda: None)          # touch "a"
+    cache.get_or_compute("d", lambda: b"x" * 900)    # evicts "b"
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_compute("b", lambda: None) is None
+    assert cache.get_or_compute("a", lambda: None) is not None
+
+
+def test_shared_metrics_returns_independent_copies():
+    metrics_cache.clear()
+    inputs = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+    first = shared_metrics(*inputs)
+    first["Grade"] = "changed by a page"
+    second = shared_metrics(*[float(v) for v in inputs])
+    assert second["Grade"] != "changed by a page"
+    assert metrics_cache.stats()["misses"] == 1
+
+
+def _as_session(owner, fn):
+    token = current_session.set(owner)
+    try:
+        return fn()
+    finally:
+        current_session.reset(token)
+
+
+def test_session_over_budget_evicts_only_its_own_entries():
+    budget = SessionBudget(2500)
+    pdfs = ResultCache("pdfs", 1024 * 1024, budget)
+    charts = ResultCache("charts", 1024 * 1024, budget)
+    blob = lambda: b"x" * 900    # ~933 bytes charged
+
+    _as_session("other", lambda: pdfs.get_or_compute("shared", blob))
+    for key in ("shared", "own-1", "own-2"):
+        _as_session("sweeper", lambda: pdfs.get_or_compute(key, blob))
+    _as_session("sweeper", lambda: charts.get_or_compute("own-3", blob))
+
+    # Over 2500 bytes: "shared" leaves the sweeper's share but stays cached
+    # for "other"; "own-1" is evicted outright
+    assert pdfs.contains("shared") and not pdfs.contains("own-1")
+    assert pdfs.contains("own-2") and charts.contains("own-3")
+    usage = {row["session"]: row for row in budget.usage()}
+    assert usage["sweeper"]["entries"] == 2 and usage["sweeper"]["bytes"] <= 2500
+    assert usage["other"]["entries"] == 1
+    assert budget.evictions == 1
+
+    # Global eviction / clear release the charges, so ended sessions vanish
+    pdfs.clear()
+    charts.clear()
+    assert budget.usage() == []
+
+
+if __name__ == "__main__":
+    test_keys_match_normalized_inputs()
+    test_identical_concurrent_requests_compute_once()
+    test_evicts_least_recently_used_by_size()
+    test_shared_metrics_returns_independent_copies()
+    test_session_over_budget_evicts_only_its_own_entries()
+    print("✅ result cache tests passed")
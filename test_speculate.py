@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import warnings
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from calc_engine import calculate_metrics, calculate_metrics_batch
+from result_cache import ResultCache, shared_metrics, metrics_cache
+from speculate import Speculator, neighbor_inputs, metrics_key, speculate
+
+BASE = (300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10)
+
+
+def test_batch_matches_scalar_engine():
+    scenarios = [BASE, (250000, 1800, 0, 0, 30, 300, 5, 3, 3, 10), (400000, 1500, 25, 7.5, 15, 900, 10, 0, 0, 1)]
+    scenarios += [BASE[:3] + (round(5 + i * 0.1, 1),) + BASE[4:9] + (5 + i,) for i in range(20)]
+    # Edge rows: no loan, zero rent, a fractional term shorter than the horizon, zero term
+    scenarios += [(300000, 2000, 100, 6.5, 30, 300, 5, 3, 3, 10), (250000, 0, 20, 6.5, 30, 0, 0, 0, 0, 3),
+                  (300000, 2000, 20, 0.0, 12.5, 300, 100, 3, 3, 20), (300000, 2000, 20, 6.5, 0, 300, 5, 3, 3, 10)]
+    with warnings.catch_warnings():
+        # Newton overflows on the zero-rent row's fallback IRR (both paths)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        assert calculate_metrics_batch(scenarios) == [calculate_metrics(*s) for s in scenarios]
+    assert calculate_metrics_batch([]) == []
+
+
+def test_neighbors_stay_within_slider_bounds():
+    steps = [("mortgage_rate", 0.1, 0.0, 15.0), ("time_horizon", 1, 1, 30)]
+    low = BASE[:3] + (0.0,) + BASE[4:9] + (1,)
+    assert neighbor_inputs(low, steps) == [low[:3] + (0.1,) + low[4:], low[:9] + (2,)]
+    assert len(neighbor_inputs(BASE, steps)) == 4
+    assert isinstance(neighbor_inputs(BASE, steps)[2][9], int)
+
+
+def test_speculated_step_is_a_cache_hit():
+    metrics_cache.clear()
+    job = speculate("test-session", [BASE], [("mortgage_rate", 0.1, 0.0, 15.0)])
+    assert job.done.wait(30) and job.computed == 2
+
+    hits = metrics_cache.hits
+    assert shared_metrics(*BASE[:3], 6.6, *BASE[4:]) == calculate_metrics(*BASE[:3], 6.6, *BASE[4:])
+    assert metrics_cache.hits == hits + 1
+
+
+def test_new_inputs_cancel_stale_work_and_cpu_is_capped():
+    cache = ResultCache("test", 16 * 1024 * 1024)
+    speculator = Speculator(cpu_share=0.2, max_scenarios=40, chunk=2, cache=cache)
+    many = [BASE[:9] + (h,) for h in range(1, 31)]
+
+    stale = speculator.submit("session", many)
+    time.sleep(0.05)
+    fresh = speculator.submit("session", [BASE])
+    assert fresh.done.wait(30)
+    assert stale.cancelled.is_set() and stale.done.is_set()
+    assert stale.computed < len(many)
+    assert cache.contains(metrics_key(BASE))
+
+    # Every computed chunk is followed by a pause of cpu * (1 - share) / share
+    stats = speculator.stats()
+    assert stats["cancelled"] == 1
+    assert speculator.throttle_seconds >= 3.9 * stats["cpu_seconds"]
+
+
+def test_failed_job_keeps_the_worker_alive():
+    cache = ResultCache("test", 16 * 1024 * 1024)
+    speculator = Speculator(cache=cache)
+    bad = speculator.submit("a", [("not", "a", "scenario")])
+    assert bad.done.wait(30) and bad.computed == 0
+    good = speculator.submit("b", [BASE])
+    assert good.done.wait(30) and good.computed == 1
+    assert speculator.stats()["computed"] == 1
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar_engine()
+    test_neighbors_stay_within_slider_bounds()
+    test_speculated_step_is_a_cache_hit()
+    test_new_inputs_cancel_stale_work_and_cpu_is_capped()
+    test_failed_job_keeps_the_worker_alive()
+    print("✅ speculation tests passed")
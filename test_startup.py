@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Load modules from THIS folder first
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from startup import _import_times
+
+HEAVY = ("scipy", "matplotlib", "reportlab", "pandas", "numpy_financial", "smtplib")
+
+
+def test_login_screens_skip_heavy_imports():
+    for script in ("pages/1_Main_Single_Property.py", "pages/2_Main_Dual_Property.py", "pages/3_Admin.py"):
+        imported = {name.split(".")[0] for name in _import_times(script, login=False)}
+        assert not imported & set(HEAVY), (script, imported & set(HEAVY))
+
+
+def test_calc_loads_scipy_only_when_needed():
+    import subprocess
+
+    code = ("import sys, calc_engine; calc_engine.calculate_metrics(300000, 2000, 20, 6.5, 30, 300, 5, 3, 3, 10); "
+            "print('scipy' in sys.modules, 'smtplib' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         capture_output=True, text=True).stdout.split()
+    assert out[-2:] == ["False", "False"]
+
+
+if __name__ == "__main__":
+    test_login_screens_skip_heavy_imports()
+    test_calc_loads_scipy_only_when_needed()
+    print("✅ startup tests passed")